@@ -0,0 +1,259 @@
+import argparse
+import os
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from constants import LEVELS, PROVINCES
+
+
+class CareerMatrix:
+    """百科补充结果的列式表示：人物 × 年份 的职级、地点编码矩阵
+    职级按 constants.LEVELS 编码（0 为正国级，数值越小级别越高），地点按出现顺序编码，缺失均为 -1；
+    各项统计都是整块数组运算，不逐行循环
+    """
+    LEVELS = LEVELS
+    _YEAR_COLUMN = re.compile(r'^(\d{4})职位$')
+
+    def __init__(self, people: pd.DataFrame, years: List[int], positions: np.ndarray,
+                 levels: np.ndarray, locations: np.ndarray, location_names: List[str]):
+        self.people = people.reset_index(drop=True)  # 姓名、省份、部门
+        self.years = np.asarray(years)
+        self.positions = positions  # (人数, 年数) 职位文本
+        self.levels = levels  # (人数, 年数) int8
+        self.locations = locations  # (人数, 年数) int32
+        self.location_names = location_names
+        self.provinces = self._location_provinces()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'CareerMatrix':
+        years = sorted(int(m.group(1)) for m in map(cls._YEAR_COLUMN.match, df.columns) if m)
+        if not years:
+            raise ValueError("输入中没有“XXXX职位”列，请确认是 baike_crawler 的输出")
+        shape = (len(df), len(years))
+
+        def block(suffix):
+            columns = [f"{year}{suffix}" for year in years]
+            return df.reindex(columns=columns).fillna('').astype(str).to_numpy()
+
+        positions = block('职位')
+
+        # 职级：只对不重复的写法统一（“正厅” -> “正厅级”），再按固定顺序查表编码，空值和无法识别的记为 -1
+        raw_codes, raw_levels = pd.factorize(block('职级').ravel())
+        lookup = np.full(len(raw_levels) + 1, -1, dtype=np.int8)
+        for code, level in enumerate(raw_levels):
+            level = level.strip()
+            level = level if not level or level.endswith('级') else level + '级'
+            if level in cls.LEVELS:
+                lookup[code] = cls.LEVELS.index(level)
+        level_codes = lookup[raw_codes].reshape(shape)
+
+        raw_codes, raw_locations = pd.factorize(block('地点').ravel())
+        stripped = pd.Series(raw_locations).str.strip()
+        merged_codes, location_names = pd.factorize(stripped.replace('', None))
+        merged_codes = np.append(merged_codes, -1)  # 下标 -1 对应缺失
+        location_codes = merged_codes[raw_codes].reshape(shape)
+
+        people = df.reindex(columns=['姓名', '省份', '部门']).fillna('').astype(str)
+        return cls(people, years, positions, level_codes,
+                   location_codes.astype(np.int32), list(location_names))
+
+    @classmethod
+    def load(cls, path: str, table: str = 'baike_results') -> 'CareerMatrix':
+        """读取 baike_crawler 的输出（.csv、.db/.sqlite 或 .parquet 目录）"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.db', '.sqlite', '.sqlite3'):
+            conn = sqlite3.connect(path)
+            try:
+                df = pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
+            finally:
+                conn.close()
+        elif ext == '.parquet':
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        return cls.from_frame(df)
+
+    def _location_provinces(self) -> np.ndarray:
+        """地点所属省份编码（constants.PROVINCES 下标），只对不重复的地点计算一次"""
+        provinces = sorted(PROVINCES, key=len, reverse=True)
+        lookup = np.full(len(self.location_names) + 1, -1, dtype=np.int16)
+        for code, name in enumerate(self.location_names):
+            for province in provinces:
+                if name.startswith(province):
+                    lookup[code] = PROVINCES.index(province)
+                    break
+        # 下标 -1 取到末尾的 -1，缺失地点仍为 -1
+        return lookup[self.locations]
+
+    @staticmethod
+    def _previous_observed(codes: np.ndarray) -> np.ndarray:
+        """每个单元格之前最近一个非缺失值（中间缺失的年份跳过），没有则为 -1"""
+        n, m = codes.shape
+        columns = np.where(codes >= 0, np.arange(m), -1)
+        last = np.maximum.accumulate(columns, axis=1)
+        previous = np.full_like(last, -1)
+        previous[:, 1:] = last[:, :-1]
+        rows = np.arange(n)[:, None]
+        return np.where(previous >= 0, codes[rows, np.maximum(previous, 0)], -1)
+
+    def _changes(self, codes: np.ndarray):
+        """返回 (前值, 后值, 是否为有效变动对) 三个与矩阵同形的数组"""
+        previous = self._previous_observed(codes)
+        valid = (codes >= 0) & (previous >= 0)
+        return previous, codes, valid
+
+    def level_changes(self) -> pd.DataFrame:
+        """每人的晋升、降级次数，以及首末与最高职级"""
+        previous, current, valid = self._changes(self.levels)
+        promotions = (valid & (current < previous)).sum(axis=1)
+        demotions = (valid & (current > previous)).sum(axis=1)
+
+        observed = self.levels >= 0
+        has_level = observed.any(axis=1)
+        first = np.where(has_level, self.levels[np.arange(len(self.levels)), observed.argmax(axis=1)], -1)
+        last_index = self.levels.shape[1] - 1 - observed[:, ::-1].argmax(axis=1)
+        last = np.where(has_level, self.levels[np.arange(len(self.levels)), last_index], -1)
+        peak = np.where(has_level, np.where(observed, self.levels, len(self.LEVELS)).min(axis=1), -1)
+
+        province_previous, province_current, moved = self._changes(self.provinces)
+        province_moves = (moved & (province_current != province_previous)).sum(axis=1)
+
+        result = self.people.copy()
+        result['晋升次数'] = promotions
+        result['降级次数'] = demotions
+        result['跨省调动次数'] = province_moves
+        result['首个职级'] = self._level_names(first)
+        result['最新职级'] = self._level_names(last)
+        result['最高职级'] = self._level_names(peak)
+        return result
+
+    def transitions_by_year(self) -> pd.DataFrame:
+        """各年份的职级转移计数：(年份, 原职级, 新职级, 人数)，只统计职级发生变化的记录"""
+        previous, current, valid = self._changes(self.levels)
+        valid &= current != previous
+        k = len(self.LEVELS)
+        year_index = np.broadcast_to(np.arange(len(self.years)), self.levels.shape)
+        keys = (year_index[valid].astype(np.int64) * k + previous[valid]) * k + current[valid]
+        counts = np.bincount(keys, minlength=len(self.years) * k * k)
+        nonzero = np.flatnonzero(counts)
+        year, rest = np.divmod(nonzero, k * k)
+        source, target = np.divmod(rest, k)
+        return pd.DataFrame({
+            '年份': self.years[year],
+            '原职级': np.asarray(self.LEVELS)[source],
+            '新职级': np.asarray(self.LEVELS)[target],
+            '人数': counts[nonzero],
+            '方向': np.where(target < source, '晋升', '降级'),
+        })
+
+    def transition_matrix(self, year: Optional[int] = None) -> pd.DataFrame:
+        """职级转移矩阵（行：原职级，列：新职级，含职级不变的人数），year 为空时汇总所有年份"""
+        previous, current, valid = self._changes(self.levels)
+        if year is not None:
+            valid &= (self.years == year)[None, :]
+        k = len(self.LEVELS)
+        counts = np.bincount(previous[valid].astype(np.int64) * k + current[valid], minlength=k * k)
+        return pd.DataFrame(counts.reshape(k, k), index=self.LEVELS, columns=self.LEVELS)
+
+    def province_flows(self) -> pd.DataFrame:
+        """跨省调动流向：(年份, 调出省份, 调入省份, 人数)"""
+        previous, current, valid = self._changes(self.provinces)
+        valid &= current != previous
+        k = len(PROVINCES)
+        year_index = np.broadcast_to(np.arange(len(self.years)), self.provinces.shape)
+        keys = (year_index[valid].astype(np.int64) * k + previous[valid]) * k + current[valid]
+        counts = np.bincount(keys, minlength=len(self.years) * k * k)
+        nonzero = np.flatnonzero(counts)
+        year, rest = np.divmod(nonzero, k * k)
+        source, target = np.divmod(rest, k)
+        names = np.asarray(PROVINCES)
+        return pd.DataFrame({
+            '年份': self.years[year],
+            '调出省份': names[source],
+            '调入省份': names[target],
+            '人数': counts[nonzero],
+        })
+
+    def rank_spells(self) -> pd.DataFrame:
+        """任职级时段：同一人连续若干年职级不变记为一段（缺失年份视为中断）
+        左删失/右删失表示该段始于首年或止于末年，实际时长可能更长
+        """
+        n, m = self.levels.shape
+        codes = self.levels
+        previous = np.full_like(codes, -1)
+        previous[:, 1:] = codes[:, :-1]
+        starts = (codes >= 0) & (codes != previous)
+        flat_codes = codes.ravel()
+        valid = flat_codes >= 0
+        # 每个有效单元格所属时段编号：时段开头处累加
+        spell_ids = np.cumsum(starts.ravel()) - 1
+        lengths = np.bincount(spell_ids[valid], minlength=int(starts.sum()))
+        start_cells = np.flatnonzero(starts.ravel())
+        person, start_column = np.divmod(start_cells, m)
+        end_column = start_column + lengths - 1
+        return pd.DataFrame({
+            '姓名': self.people['姓名'].to_numpy()[person],
+            '职级': np.asarray(self.LEVELS)[flat_codes[start_cells]],
+            '起始年份': self.years[start_column],
+            '年数': lengths,
+            '左删失': start_column == 0,
+            '右删失': end_column == m - 1,
+        })
+
+    def time_in_rank(self) -> pd.DataFrame:
+        """各职级的平均任职年数；完整时段（两端均未删失）单独统计"""
+        spells = self.rank_spells()
+        complete = spells[~spells['左删失'] & ~spells['右删失']]
+        summary = spells.groupby('职级', observed=True)['年数'].agg(['count', 'mean']).rename(
+            columns={'count': '时段数', 'mean': '平均年数'})
+        summary['完整时段数'] = complete.groupby('职级')['年数'].count()
+        summary['完整时段平均年数'] = complete.groupby('职级')['年数'].mean()
+        summary = summary.reindex([level for level in self.LEVELS if level in summary.index])
+        return summary.fillna({'完整时段数': 0}).astype({'完整时段数': int})
+
+    def summary(self) -> Dict:
+        changes = self.level_changes()
+        return {
+            '人数': len(self.people),
+            '年份': f"{self.years[0]}-{self.years[-1]}",
+            '职级覆盖率': round(float((self.levels >= 0).mean()), 4),
+            '地点覆盖率': round(float((self.locations >= 0).mean()), 4),
+            '晋升次数': int(changes['晋升次数'].sum()),
+            '降级次数': int(changes['降级次数'].sum()),
+            '有跨省调动的人数': int((changes['跨省调动次数'] > 0).sum()),
+        }
+
+    def _level_names(self, codes: np.ndarray) -> np.ndarray:
+        names = np.asarray(self.LEVELS + [''])
+        return names[np.where(codes >= 0, codes, len(self.LEVELS))]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='百科补充结果的职业路径统计')
+    parser.add_argument('input', help='baike_crawler 的输出（.csv/.db/.parquet）')
+    parser.add_argument('--output', default='./results/analytics', help='统计结果CSV输出目录')
+    parser.add_argument('--table', default='baike_results', help='SQLite表名')
+    args = parser.parse_args()
+
+    start = pd.Timestamp.now()
+    matrix = CareerMatrix.load(args.input, args.table)
+    os.makedirs(args.output, exist_ok=True)
+    outputs = {
+        '人物职级变动.csv': matrix.level_changes(),
+        '职级转移.csv': matrix.transitions_by_year(),
+        '职级转移矩阵.csv': matrix.transition_matrix(),
+        '跨省调动.csv': matrix.province_flows(),
+        '任职时段.csv': matrix.rank_spells(),
+        '平均任职年数.csv': matrix.time_in_rank(),
+    }
+    for name, frame in outputs.items():
+        keep_index = name in ('职级转移矩阵.csv', '平均任职年数.csv')
+        frame.to_csv(os.path.join(args.output, name), index=keep_index, encoding='utf-8-sig')
+
+    for key, value in matrix.summary().items():
+        print(f"{key}: {value}")
+    print(f"统计完成，用时 {(pd.Timestamp.now() - start).total_seconds():.2f} 秒，结果保存在 {args.output}")
@@ -2,7 +2,6 @@ import urllib.request
 import urllib.parse
 import urllib.error
 from lxml import etree
-import pandas as pd
 import time
 import random
 import chardet
@@ -12,8 +11,18 @@ import requests
 import re
 import os
 import csv
+import sqlite3
+import unicodedata
+import argparse
 from typing import Dict, List, Optional
-from volcenginesdkarkruntime import Ark
+from llm_async import AsyncLLM
+from constants import LEVELS, PROVINCES
+from result_store import open_store, iter_store_rows
+from resilience import endpoints, check_status, CircuitOpenError
+from metrics import metrics
+from profiling import enable_profiling
+from cassette import add_cassette_arguments, cassette, open_from_args, CassetteMissError
+from warc_archive import add_archive_arguments, archive
 
 
 class Config:
@@ -35,11 +44,48 @@ class Config:
     PROXY_PASSWORD = "your_kuaidaili_password"
     PROXY_API_URL = f"https://dps.kdlapi.com/api/getdps/?secret_id={PROXY_SECRET_ID}&signature={PROXY_SIGNATURE}&num=1&pt=1&sep=1"
     
-    MAX_RETRIES = 3
-    DELAY_MIN = 0.5
-    DELAY_MAX = 2
+    MAX_RETRIES = 3  # 重试间隔、并发与熔断参数见 resilience.endpoints
+
+    # 同名义项消歧的最低得分（省份/部门各3分，职务每项1分）
+    DISAMBIGUATION_MIN_SCORE = 3
+
+    # 批量提取：多人履历合并为一次调用，规则只发送一次
+    BATCH_EXTRACT = False
+    BATCH_TOKEN_BUDGET = 12000  # 单次调用的输入token预算
+    BATCH_MAX_PERSONS = 6
+
+    # 规则解析“2016.03—2018.05 任XX”形式的履历，只把无法解析的行交给GPT
+    RULE_BASED_EXTRACT = True
+    # 职务职级缓存（规范化职务 -> 职级），避免同类职务重复询问GPT
+    LEVEL_MEMO_FILE = "./results/level_memo.json"
+
+    # 优先从输入文件的简历列提取，简历不完整时才查询百度百科
+    RESUME_FIRST = True
+
+    # 合并模式：关键词验证不通过时，身份判断与信息提取在同一次GPT调用中完成
+    COMBINED_VALIDATE_EXTRACT = False
+
+    # 同时在途的大模型请求上限（异步调用层共用一个事件循环）
+    MAX_LLM_IN_FLIGHT = 16
+
+    # 运行结束时输出各阶段耗时、token用量与缓存命中率（Prometheus文本 + JSON）
+    METRICS_DIR = "./results/metrics"
 
     HEADERS = {}
+
+    # 统计年份范围（含首尾）
+    START_YEAR = 2016
+    END_YEAR = 2024
+
+    # 结果存储：为空时写入 OUTPUT_EXCEL（CSV）；.db/.sqlite 为SQLite，.parquet 为Parquet目录
+    OUTPUT_STORE = ""
+    STORE_BATCH_SIZE = 20
+
+    # 博查搜索缓存：保存全部10条结果及摘要，过期时间内相同查询不再请求
+    SEARCH_CACHE_FILE = "./results/search_cache.db"
+    SEARCH_CACHE_TTL = 30 * 24 * 3600  # 秒
+    SEARCH_TIMEOUT = 15
+    SEARCH_MAX_PAGES = 3  # 摘要预筛后最多抓取的百科页面数
     
 
 class PersonInfo:
@@ -58,7 +104,32 @@ class PersonInfo:
         self.education = ""
         self.ethnicity = ""
         self.positions = {str(year): {"position": "", "level": "", "location": ""} 
-                         for year in range(2016, 2025)}
+                         for year in self.years()}
+        # 已由政府网站简历确定的年份，百科提取结果不再覆盖
+        self.locked_years = set()
+    
+    @staticmethod
+    def years() -> range:
+        return range(Config.START_YEAR, Config.END_YEAR + 1)
+
+    @classmethod
+    def headers(cls) -> List[str]:
+        """输出列：基本信息 + 每年的职位、职级、地点"""
+        headers = ['省份', '部门', '姓名', '性别', '出生年月', '籍贯', '学历', '民族']
+        for year in cls.years():
+            headers.extend([f"{year}职位", f"{year}职级", f"{year}地点"])
+        return headers
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'PersonInfo':
+        """由 gov_crawler 输出的一行（姓名/职务/简历/省份/部门）构造"""
+        return cls(
+            name=row['姓名'],
+            position=row.get('职务', ''),
+            resume=row.get('简历', ''),
+            province=row.get('省份', ''),
+            department=row.get('部门', '')
+        )
     
     def update_positions(self, positions_list: List[Dict]):
         """更新职位信息
@@ -67,7 +138,7 @@ class PersonInfo:
         """
         for position_data in positions_list:
             year = str(position_data['year'])
-            if year in self.positions:
+            if year in self.positions and year not in self.locked_years:
                 self.positions[year].update({
                     'position': position_data.get('position', ''),
                     'level': position_data.get('level', ''),
@@ -87,7 +158,7 @@ class PersonInfo:
             "民族": self.ethnicity
         }
         
-        for year in range(2016, 2025):
+        for year in self.years():
             year_str = str(year)
             result.update({
                 f"{year}职位": self.positions[year_str]["position"],
@@ -115,18 +186,134 @@ class FakeChromeUA:
                         chrome_version,
                         'Safari/537.36'])
 
+def _class_prefix_test(prefix: str) -> str:
+    """生成按类名前缀匹配的XPath条件（百科类名带构建哈希后缀，如 paraTitle_WslP_）"""
+    return f"contains(concat(' ', normalize-space(@class)), ' {prefix}')"
+
+
+class BaikePageParser:
+    """百度百科页面解析类
+    XPath只编译一次；履历段落通过单次遍历兄弟节点提取，复杂度与页面长度成线性关系
+    """
+    CAREER_TITLES = ('人物履历', '人物经历', '个人履历', '工作履历', '任职经历')
+
+    _SECTION_TITLES = etree.XPath(
+        f"//div[{_class_prefix_test('paraTitle_')} and {_class_prefix_test('level-1_')}]"
+    )
+    _TITLE_TEXT = etree.XPath("string(./h2)")
+    _PARA_TEXT = etree.XPath(f".//span[{_class_prefix_test('text_')}]/text()")
+    _BASIC_INFO = etree.XPath(
+        f"//div[{_class_prefix_test('basicInfo_')}]"
+        f"//*[(self::dt and {_class_prefix_test('itemName_')})"
+        f" or (self::dd and {_class_prefix_test('itemValue_')})]"
+    )
+    _BASIC_INFO_NAME = etree.XPath("./text()")
+    _BASIC_INFO_VALUE = etree.XPath(f"./span[{_class_prefix_test('text_')}]/text()")
+
+    # 多义词义项：旧版 polysemantList-wrapper 下的 li，新版 polysemant_ 前缀容器下的 li
+    _POLYSEMANT_ITEMS = etree.XPath(
+        f"//*[{_class_prefix_test('polysemant')}]/descendant-or-self::li"
+    )
+    _ITEM_TEXT = etree.XPath("string(.)")
+    _ITEM_LINK = etree.XPath("(.//a[contains(@href, '/item/')]/@href)[1]")
+    _LEMMA_DESC = etree.XPath(
+        f"string((//*[{_class_prefix_test('lemmaDesc')} or {_class_prefix_test('lemma-desc')}])[1])"
+    )
+
+    @staticmethod
+    def _class_tokens(element) -> List[str]:
+        return (element.get('class') or '').split()
+
+    @classmethod
+    def _has_class_prefix(cls, element, prefix: str) -> bool:
+        return any(token.startswith(prefix) for token in cls._class_tokens(element))
+
+    @classmethod
+    def _is_section_title(cls, element) -> bool:
+        return cls._has_class_prefix(element, 'paraTitle_') and cls._has_class_prefix(element, 'level-1_')
+
+    @classmethod
+    def extract_basic_info(cls, html) -> List[str]:
+        """提取基本信息栏，按 名称、取值 交替排列"""
+        lines = []
+        for item in cls._BASIC_INFO(html):
+            if item.tag == 'dt':
+                lines.extend(cls._BASIC_INFO_NAME(item))
+            else:
+                lines.extend(cls._BASIC_INFO_VALUE(item))
+        return lines
+
+    @classmethod
+    def extract_career(cls, html) -> List[str]:
+        """提取履历板块的段落文本：从板块标题开始遍历后续兄弟节点，遇到下一个一级标题即停止"""
+        titles = cls._SECTION_TITLES(html)
+        career_title = None
+        for wanted in cls.CAREER_TITLES:
+            career_title = next((t for t in titles if cls._TITLE_TEXT(t).strip() == wanted), None)
+            if career_title is not None:
+                break
+        if career_title is None:
+            return []
+
+        lines = []
+        for sibling in career_title.itersiblings():
+            if not isinstance(sibling.tag, str):
+                continue  # 跳过注释等节点
+            if cls._is_section_title(sibling):
+                break
+            if cls._has_class_prefix(sibling, 'para_'):
+                lines.extend(cls._PARA_TEXT(sibling))
+        return lines
+
+    @classmethod
+    def extract_polysemants(cls, html) -> List[Dict]:
+        """提取多义词义项列表（同名人物），当前义项的 url 为空、current 为 True"""
+        candidates = []
+        seen = set()
+        for item in cls._POLYSEMANT_ITEMS(html):
+            description = re.sub(r'\s+', ' ', cls._ITEM_TEXT(item)).strip()
+            if not description:
+                continue
+            links = cls._ITEM_LINK(item)
+            if links:
+                url = links[0].split('#')[0].split('?')[0]
+                if url in seen:
+                    continue
+                seen.add(url)
+                candidates.append({'url': url, 'description': description, 'current': False})
+            elif not any(c['current'] for c in candidates):
+                candidates.append({'url': '', 'description': description, 'current': True})
+
+        # 新版页面的当前义项不在列表中，取词条标题下的概述
+        if candidates and not any(c['current'] for c in candidates):
+            desc = re.sub(r'\s+', ' ', cls._LEMMA_DESC(html)).strip()
+            if desc:
+                candidates.append({'url': '', 'description': desc, 'current': True})
+        return candidates
+
+    @classmethod
+    def extract_lines(cls, html) -> List[str]:
+        """按页面顺序返回基本信息与履历文本"""
+        return cls.extract_basic_info(html) + cls.extract_career(html)
+
+
 class BaiduSpider:
     """百度百科爬虫类"""
     def __init__(self):
         self.base_headers = Config.HEADERS
         self.proxy_ip = None
         self.opener = None
-        self.update_proxy()
+        self.endpoint = endpoints.get('baike')
+        # 回放模式不访问网络，不需要代理
+        if not cassette.replaying:
+            self.update_proxy()
     
     def update_proxy(self):
         """获取新的代理IP"""
         try:
-            response = requests.get(Config.PROXY_API_URL)
+            with endpoints.get('proxy').slot():
+                response = requests.get(Config.PROXY_API_URL, timeout=10)
+                check_status(response.status_code)
             self.proxy_ip = response.text.strip()
             # 配置代理
             proxy_url = f"http://{Config.PROXY_USERNAME}:{Config.PROXY_PASSWORD}@{self.proxy_ip}"
@@ -142,11 +329,36 @@ class BaiduSpider:
         except Exception as e:
             print(f"更新代理IP失败: {e}")
 
-    def query(self, url: str, max_retries: int = Config.MAX_RETRIES) -> Optional[str]:
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """人名转换为词条链接，站内相对链接补全为绝对链接"""
         prefix = 'https://baike.baidu.com/item/'
+        if url.startswith('/item/'):
+            return 'https://baike.baidu.com' + url
         if not url.startswith(prefix):
-            url = prefix + urllib.parse.quote(url)
-        
+            return prefix + urllib.parse.quote(url)
+        return url
+
+    def fetch_page(self, url: str, max_retries: int = Config.MAX_RETRIES):
+        """获取词条页面并解析为lxml文档，失败返回None"""
+        url = self.normalize_url(url)
+        try:
+            # 录制模式下同时保存页面，回放模式下直接读取录制的页面
+            content = cassette.through('baike', url, lambda: self.download(url, max_retries))
+        except CassetteMissError as e:
+            print(f"跳过 {url}: {e}")
+            return None
+        if content is None:
+            return None
+        if not cassette.replaying:
+            archive.add('baike', url, content)
+
+        charset = chardet.detect(content)['encoding'] or 'utf-8'
+        text = content.decode(charset, errors='replace')
+        return etree.HTML(text)
+
+    def download(self, url: str, max_retries: int = Config.MAX_RETRIES) -> Optional[bytes]:
+        """通过代理下载页面，失败返回None"""
         for retry in range(max_retries):
             try:
                 # 每次重试前更新代理IP
@@ -157,76 +369,533 @@ class BaiduSpider:
                 headers['User-Agent'] = FakeChromeUA.get_ua()
                 headers['Referer'] = 'https://baike.baidu.com'
                 req = urllib.request.Request(url=url, headers=headers, method='GET')
-                response = self.opener.open(req, timeout=10)
-                content = response.read()
-                
-                charset = chardet.detect(content)['encoding'] or 'utf-8'
-                text = content.decode(charset, errors='replace')
-                html = etree.HTML(text)
-                
-                # 提取履历信息
-                # sen_list = html.xpath('''
-                #     //div[@class='paraTitle_c7Isv level-1_gngtl' and h2='人物履历']/following-sibling::div[
-                #         contains(@class, 'para_WzwJ3') and 
-                #         count(. | //div[@class='paraTitle_c7Isv level-1_gngtl'][h2!='人物履历'][1]/preceding-sibling::div) = 
-                #         count(//div[@class='paraTitle_c7Isv level-1_gngtl'][h2!='人物履历'][1]/preceding-sibling::div)
-                #     ]
-                #     //span[@class='text_tJaKK']/text()
-                #     | (//div[contains(@class, 'basicInfo_Gvg0x J-basic-info')]//dt[@class='basicInfoItem_teWTJ itemName_J9fIC']
-                #     /text())
-                #     | (//div[contains(@class, 'basicInfo_Gvg0x J-basic-info')]//dd[@class='basicInfoItem_teWTJ itemValue_AEGp2']
-                #     /span[@class='text_tJaKK']/text())
-                #     ''')
-                sen_list = html.xpath('''
-                    //div[@class='paraTitle_WslP_ level-1_Ep022' and h2='人物履历']/following-sibling::div[
-                        contains(@class, 'para_fT72O') and 
-                        count(. | //div[@class='paraTitle_WslP_ level-1_Ep022'][h2!='人物履历'][1]/preceding-sibling::div) = 
-                        count(//div[@class='paraTitle_WslP_ level-1_Ep022'][h2!='人物履历'][1]/preceding-sibling::div)
-                    ]
-                    //span[@class='text_H18Us']/text()
-                    | (//div[contains(@class, 'basicInfo_Dxt9K')]//dt[@class='basicInfoItem_zB304 itemName_LS0Jv']
-                    /text())
-                    | (//div[contains(@class, 'basicInfo_Dxt9K')]//dd[@class='basicInfoItem_zB304 itemValue_AYbkR']
-                    /span[@class='text_H18Us']/text())
-                ''')
-
-                sen_list_after_filter = [re.sub(r'\s+', ' ', item).strip() for item in sen_list if item.strip()]
-                return '\n'.join(sen_list_after_filter)
+                # 403/429 视为代理被封或限流：降低并发、拉长请求间隔，连续失败时熔断
+                if self.opener is None:
+                    raise RuntimeError("没有可用的代理")
+                with metrics.timer('baike_fetch', detail=url), self.endpoint.slot():
+                    response = self.opener.open(req, timeout=10)
+                    return response.read()
                 
+            except CircuitOpenError as e:
+                print(f"跳过 {url}: {e}")
+                return None
             except Exception as e:
                 print(f"查询 {url} 时发生错误 (重试 {retry + 1}/{max_retries}): {e}")
                 if retry == max_retries - 1:
                     print(f"爬取 {url} 失败，已达到最大重试次数")
                     return None
-                time.sleep(random.uniform(Config.DELAY_MIN, Config.DELAY_MAX))
+                time.sleep(self.endpoint.backoff_delay(retry))
+
+    @staticmethod
+    def page_text(html) -> str:
+        """提取基本信息与履历文本"""
+        with metrics.timer('baike_parse'):
+            sen_list = BaikePageParser.extract_lines(html)
+        sen_list_after_filter = [re.sub(r'\s+', ' ', item).strip() for item in sen_list if item.strip()]
+        return '\n'.join(sen_list_after_filter)
+
+    def query(self, url: str, max_retries: int = Config.MAX_RETRIES) -> Optional[str]:
+        html = self.fetch_page(url, max_retries)
+        if html is None:
+            return None
+        return self.page_text(html)
+
+    def query_with_candidates(self, url: str, max_retries: int = Config.MAX_RETRIES):
+        """获取词条文本及同名义项列表
+        Returns:
+            (content, candidates)，candidates 为 [{'url', 'description', 'current'}]
+        """
+        html = self.fetch_page(url, max_retries)
+        if html is None:
+            return None, []
+        return self.page_text(html), BaikePageParser.extract_polysemants(html)
+
+class Gazetteer:
+    """行政区划、部门与职务词表，用于关键词切分与多模式匹配"""
+    PROVINCES = PROVINCES
+    PROVINCE_SUFFIXES = ('维吾尔自治区', '壮族自治区', '回族自治区', '自治区', '省', '市')
+    ADMIN_TERMS = [
+        '自治区', '党委', '人民政府', '人大常委会', '政协', '纪委', '监委', '人民法院', '人民检察院',
+        '高级人民法院', '组织部', '宣传部', '统战部', '政法委', '编办', '办公厅', '盟', '自治州', '自治旗'
+    ]
+    DEPARTMENTS = [
+        '发展和改革委员会', '发展改革委', '教育厅', '科学技术厅', '科技厅', '工业和信息化厅', '民族事务委员会',
+        '公安厅', '民政厅', '司法厅', '财政厅', '人力资源和社会保障厅', '人社厅', '自然资源厅', '生态环境厅',
+        '住房和城乡建设厅', '住建厅', '交通运输厅', '水利厅', '农牧厅', '农业农村厅', '商务厅', '文化和旅游厅',
+        '卫生健康委员会', '卫健委', '退役军人事务厅', '应急管理厅', '审计厅', '外事办公室', '国有资产监督管理委员会',
+        '国资委', '市场监督管理局', '广播电视局', '体育局', '统计局', '林业和草原局', '医疗保障局', '信访局',
+        '能源局', '粮食和物资储备局', '机关事务管理局', '大数据中心', '乡村振兴局', '地方金融监督管理局', '行政审批和政务服务局'
+    ]
+    TITLES = [
+        '书记', '副书记', '常委', '委员', '秘书长', '副秘书长', '省长', '副省长', '主席', '副主席', '市长', '副市长',
+        '盟长', '副盟长', '州长', '副州长', '厅长', '副厅长', '局长', '副局长', '主任', '副主任', '部长', '副部长',
+        '院长', '副院长', '检察长', '副检察长', '巡视员', '副巡视员', '督查专员', '一级巡视员', '二级巡视员',
+        '党组书记', '党组副书记', '党组成员', '总经济师', '总工程师', '总会计师', '总审计师', '机关党委书记'
+    ]
+
+    @classmethod
+    def short_province(cls, province: str) -> str:
+        """去掉省份后缀：内蒙古自治区 -> 内蒙古"""
+        for suffix in cls.PROVINCE_SUFFIXES:
+            if province.endswith(suffix) and len(province) > len(suffix):
+                return province[:-len(suffix)]
+        return province
+
+    @classmethod
+    def strip_province(cls, text: str, province: str) -> str:
+        """去掉文本开头的省份前缀：内蒙古自治区教育厅 -> 教育厅"""
+        if not province:
+            return text
+        for prefix in [province + suffix for suffix in cls.PROVINCE_SUFFIXES] + [province]:
+            if text.startswith(prefix) and len(text) > len(prefix):
+                return text[len(prefix):]
+        return text
+
+    @classmethod
+    def terms(cls) -> Dict[str, str]:
+        """全部词条 -> 类别"""
+        terms = {}
+        for kind, words in (('title', cls.TITLES), ('department', cls.DEPARTMENTS),
+                            ('department', cls.ADMIN_TERMS), ('province', cls.PROVINCES)):
+            for word in words:
+                terms[word] = kind
+        return terms
+
+
+class KeywordAutomaton:
+    """Aho-Corasick多模式匹配自动机：一次扫描文本即可找出全部关键词"""
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append(pattern)
+
+    def _build(self):
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[nxt] = self.goto[state].get(char, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """逐个返回 (起始位置, 关键词)"""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern in output[node]:
+                yield index - len(pattern) + 1, pattern
+
+    def find_all(self, text: str) -> set:
+        return {pattern for _, pattern in self.iter_matches(text)}
+
+
+def _text(value) -> str:
+    """pandas 读取的空单元格为 NaN，统一转换为字符串"""
+    return value.strip() if isinstance(value, str) else ''
+
 
 class ContentValidator:
-    """内容验证类"""
+    """内容验证类
+    人物关键词由词表最长匹配切分得到（行政区划、部门名称保持完整），词表无法覆盖的片段才交给jieba；
+    关键词集合及其匹配自动机按人物缓存，百科文本只需一次线性扫描
+    """
+    MATCH_THRESHOLD = 0.6  # 匹配度阈值
+
     def __init__(self):
-        jieba.initialize()
-    
+        self.gazetteer_terms = Gazetteer.terms()
+        self.gazetteer = KeywordAutomaton(self.gazetteer_terms)
+        self._keyword_cache = {}
+
+    def _segment(self, phrase: str) -> Dict[str, str]:
+        """按词表最长匹配切分短语，未覆盖的片段用jieba兜底"""
+        matches = sorted(self.gazetteer.iter_matches(phrase), key=lambda m: (m[0], -len(m[1])))
+        terms, pos = {}, 0
+        leftovers = []
+        for start, word in matches:
+            if start < pos:
+                continue
+            leftovers.append(phrase[pos:start])
+            terms[word] = self.gazetteer_terms[word]
+            pos = start + len(word)
+        leftovers.append(phrase[pos:])
+
+        for chunk in leftovers:
+            chunk = chunk.strip('的和及与、')
+            if len(chunk) < 2:
+                continue
+            if len(chunk) <= 4:
+                terms.setdefault(chunk, 'other')
+            else:
+                for word in jieba.lcut(chunk):
+                    if len(word) >= 2:
+                        terms.setdefault(word, 'other')
+        return terms
+
+    def _person_entry(self, person_info: PersonInfo):
+        """返回缓存的 (关键词 -> 类别, 关键词自动机)"""
+        key = (_text(person_info.province), _text(person_info.department), _text(person_info.position))
+        cached = self._keyword_cache.get(key)
+        if cached is not None:
+            return cached
+
+        province, department, position = key
+        short_province = Gazetteer.short_province(province)
+        keywords = {}
+        if short_province:
+            keywords[short_province] = 'province'
+        department = Gazetteer.strip_province(department, short_province)
+        if department:
+            keywords[department] = 'department'
+        for part in re.split(r'[、，,；;\s]+', position):
+            part = Gazetteer.strip_province(part, short_province)
+            if not part:
+                continue
+            for word, kind in self._segment(part).items():
+                if word not in keywords and word not in Gazetteer.PROVINCE_SUFFIXES:
+                    keywords[word] = kind
+
+        cached = self._keyword_cache[key] = (keywords, KeywordAutomaton(keywords))
+        return cached
+
+    def person_keywords(self, person_info: PersonInfo) -> Dict[str, str]:
+        """人物关键词 -> 类别（province/department/title/other），按人物缓存"""
+        return self._person_entry(person_info)[0]
+
+    def matched_keywords(self, baidu_content: str, person_info: PersonInfo) -> set:
+        """文本中出现的人物关键词"""
+        return self._person_entry(person_info)[1].find_all(baidu_content)
+
     def validate_by_keywords(self, baidu_content: str, person_info: PersonInfo) -> bool:
         if not baidu_content:
             return False
-            
-        # 分词处理
-        content_words = set(jieba.cut(baidu_content))
-        keywords = set(jieba.cut(f"{person_info.province} {person_info.department} {person_info.position}"))
+
+        keywords = self.person_keywords(person_info)
+        if not keywords:
+            return False
         
         # 计算关键词匹配度
-        matched = keywords & content_words
+        matched = self.matched_keywords(baidu_content, person_info)
         match_ratio = len(matched) / len(keywords)
         
-        return match_ratio >= 0.6  # 匹配度阈值
+        return match_ratio >= self.MATCH_THRESHOLD
+
+    def is_plausible(self, baidu_content: str, person_info: PersonInfo) -> bool:
+        """省份与部门均未出现的页面直接排除，不再交给GPT验证"""
+        if not baidu_content:
+            return False
+        keywords = self.person_keywords(person_info)
+        anchors = {word for word, kind in keywords.items() if kind in ('province', 'department')}
+        if not anchors:
+            return True
+        return bool(anchors & self.matched_keywords(baidu_content, person_info))
+
+class LemmaDisambiguator:
+    """同名义项本地消歧类：用省份、部门、职务对义项简介打分，选出最可能的词条"""
+    WEIGHTS = {'province': 3, 'department': 3, 'title': 1, 'other': 1}
+
+    def __init__(self, validator: ContentValidator):
+        self.validator = validator
+
+    def score(self, text: str, person: PersonInfo) -> int:
+        terms = self.validator.person_keywords(person)
+        return sum(self.WEIGHTS[terms[word]] for word in self.validator.matched_keywords(text, person))
+
+    def matches(self, text: str, person: PersonInfo) -> bool:
+        """文本是否达到消歧阈值（省份或部门至少命中一项）"""
+        return self.score(text, person) >= Config.DISAMBIGUATION_MIN_SCORE
+
+    def best_candidate(self, candidates: List[Dict], person: PersonInfo) -> Optional[Dict]:
+        """一次遍历为所有义项打分，返回得分最高且达到阈值的义项"""
+        best, best_score = None, 0
+        for candidate in candidates:
+            score = self.score(candidate['description'], person)
+            candidate['score'] = score
+            if score > best_score:
+                best, best_score = candidate, score
+        if best_score < Config.DISAMBIGUATION_MIN_SCORE:
+            return None
+        return best
+
+class ResumeParser:
+    """规则履历解析类
+    将“2016.03—2018.05 任XX”“2017.03— 任XX”形式的履历转换为逐年职务：横跨多年的任职每年沿用该职务，
+    同一年有多条任职时取开始时间最新的一条；无法识别时间的行留给GPT处理
+    """
+    _DATE = r'(\d{4})\s*(?:[.．/年]\s*(\d{1,2})\s*月?|年)?'
+    _RANGE = re.compile(
+        _DATE + r'\s*(?:[—－\-–~～至到]+|起至)\s*(?:' + _DATE + r'|(至今|今))?\s*[，,、:：]?'
+    )
+    _START_ONLY = re.compile(_DATE + r'\s*(?:起|以来|后)?\s*[，,、:：]?\s*(?=任|兼任|担任|调任|挂职)')
+    _STUDY = re.compile(r'学习|就读|读研|在职研究生|进修|培训|毕业')
+    _YEAR = re.compile(r'(?:19|20)\d{2}')
+    _LOCATION = re.compile(
+        r'^(?:(?:' + '|'.join(sorted(Gazetteer.PROVINCES, key=len, reverse=True)) + r')'
+        r'(?:维吾尔自治区|壮族自治区|回族自治区|自治区|省|市)?)?'
+        r'(?:[\u4e00-\u9fff]{2,6}?(?:市|盟|自治州|地区))?'
+        r'(?:[\u4e00-\u9fff]{1,6}?(?:区|县|旗))?'
+    )
+    _BASIC_FIELDS = {
+        '性别': 'gender', '出生日期': 'birth_date', '出生年月': 'birth_date', '籍贯': 'native_place',
+        '出生地': 'native_place', '学历': 'education', '学位': 'education', '民族': 'ethnicity'
+    }
+    _BASIC_PATTERNS = {
+        'gender': r'(?:^|[，,\s])(男|女)[，,]',
+        'ethnicity': r'([\u4e00-\u9fff]{1,4}族)[，,]',
+        'birth_date': r'(\d{4}年\d{1,2}月)(?:生|出生)',
+        'native_place': r'[，,]([\u4e00-\u9fff]{2,10}?)人[，,]',
+        'education': r'((?:研究生|大学本科|大学|大专|中专)学历|(?:博士|硕士|学士)学位)'
+    }
+
+    def __init__(self, years=None):
+        self.years = [int(year) for year in (years or PersonInfo.years())]
+
+    @staticmethod
+    def _clean_position(text: str) -> str:
+        text = re.sub(r'\s+', '', text)
+        text = re.sub(r'^[，,、:：）)]+', '', text)
+        text = re.sub(r'^(?:任|担任|调任|历任)', '', text)
+        # 括号内的“（其间：2016.09—2017.01 在中央党校学习）”被拆成两个条目，去掉未配对的括号
+        text = re.sub(r'[（(][^（()）]*$', '', text)
+        if not re.search(r'[（(]', text):
+            text = re.sub(r'[）)]+$', '', text)
+        return re.sub(r'[，,、（(]+$', '', text)
+
+    @classmethod
+    def location_of(cls, position: str, province: str = '') -> str:
+        """从职务中取出地点前缀（保留省/市/区全称），以“自治区”“省”开头的职务补全省份"""
+        short_province = Gazetteer.short_province(province)
+        if short_province and re.match(r'^(?:自治区|省)', position):
+            position = short_province + position
+        match = cls._LOCATION.match(position)
+        location = match.group(0) if match else ''
+        # 仅有省份简称（如“内蒙古党委”）时补全为省级全称
+        if location and location == short_province:
+            location = province
+        return location
+
+    def _is_unresolved(self, line: str) -> bool:
+        """含有与统计年份相关的年份（排除出生年份等）且未被解析的行"""
+        first_year = min(self.years) - 15
+        return any(first_year <= int(y) <= max(self.years) for y in self._YEAR.findall(line))
+
+    def parse_entries(self, text: str) -> tuple:
+        """切分出履历条目
+        Returns:
+            (entries, unresolved)，entries 为 [(开始(年,月), 结束(年,月), 职务)]，unresolved 为无法解析的文本行
+        """
+        marks = []
+        for match in self._RANGE.finditer(text):
+            start = (int(match.group(1)), int(match.group(2) or 1))
+            if match.group(5) or match.group(3) is None:
+                # “至今”或只写了开始时间（“2017.03— 河北省副省长”）：任职到统计的最后一年
+                end = (max(self.years), 12)
+            else:
+                end = (int(match.group(3)), int(match.group(4) or 12))
+            marks.append((match.start(), match.end(), start, end))
+        taken = [(m[0], m[1]) for m in marks]
+        for match in self._START_ONLY.finditer(text):
+            if any(s <= match.start() < e for s, e in taken):
+                continue
+            start = (int(match.group(1)), int(match.group(2) or 1))
+            marks.append((match.start(), match.end(), start, None))
+        marks.sort()
+
+        entries, unresolved = [], []
+        head = text[:marks[0][0]] if marks else text
+        unresolved.extend(line for line in re.split(r'[\n；;。]', head) if self._is_unresolved(line))
+        for i, (_, body_start, start, end) in enumerate(marks):
+            body_end = marks[i + 1][0] if i + 1 < len(marks) else len(text)
+            # 条目正文到句末为止，其后仍含年份的句子视为无法解析
+            first, *rest = re.split(r'[\n；;。]', text[body_start:body_end])
+            position = self._clean_position(first)
+            if position:
+                entries.append([start, end, position])
+            unresolved.extend(line for line in rest if self._is_unresolved(line))
+
+        # 只有开始时间的条目，结束时间取下一条目的开始时间
+        entries.sort(key=lambda e: e[0])
+        for i, entry in enumerate(entries):
+            if entry[1] is None:
+                entry[1] = entries[i + 1][0] if i + 1 < len(entries) else (max(self.years), 12)
+        return [tuple(e) for e in entries], [line.strip() for line in unresolved if line.strip()]
+
+    def parse_basic_info(self, text: str) -> Dict:
+        """提取基本信息：百科信息栏的“名称\n取值”，或政府网站简历开头的“男，汉族，1968年3月生，河北唐山人”"""
+        info = {}
+        lines = [line.strip() for line in text.split('\n')]
+        for name, value in zip(lines, lines[1:]):
+            field = self._BASIC_FIELDS.get(name.replace(' ', ''))
+            if field and value and field not in info:
+                info[field] = value
+
+        if info:
+            return info
+
+        head = text[:200]
+        for field, pattern in self._BASIC_PATTERNS.items():
+            if field not in info:
+                match = re.search(pattern, head)
+                if match:
+                    info[field] = match.group(1)
+        return info
+
+    def parse(self, text: str, person: PersonInfo) -> Dict:
+        """解析履历文本
+        Returns:
+            {'positions': {年份: {'position', 'location'}}, 'basic': 基本信息,
+             'unresolved': 无法解析的行, 'missing_years': 未填充的年份}
+        """
+        text = text or ''
+        entries, unresolved = self.parse_entries(text)
+        province = _text(person.province)
+        positions = {}
+        for year in self.years:
+            covering = [e for e in entries if e[0][0] <= year <= e[1][0]]
+            # 在职学习与任职重叠时以任职为准
+            jobs = [e for e in covering if not self._STUDY.search(e[2])] or covering
+            if jobs:
+                latest = max(jobs, key=lambda e: e[0])
+                positions[year] = {
+                    'position': latest[2],
+                    'location': self.location_of(latest[2], province)
+                }
+
+        # 最后一年履历缺失时使用输入文件中的职务
+        last_year = max(self.years)
+        if entries and last_year not in positions and _text(person.position):
+            positions[last_year] = {
+                'position': _text(person.position),
+                'location': self.location_of(_text(person.position), province)
+            }
+
+        return {
+            'positions': positions,
+            'basic': self.parse_basic_info(text),
+            'unresolved': unresolved,
+            'missing_years': [year for year in self.years if year not in positions]
+        }
+
+
+# 职级判断标准
+LEVEL_RUBRIC = """
+            - 正国级（党和国家领导人核心层）：中共中央政治局常务委员会委员、中华人民共和国主席、全国人民代表大会常务委员会委员长、国务院总理、全国政协主席、中央军事委员会主席、中央纪律检查委员会书记。
+            - 副国级（党和国家领导人）：中共中央政治局委员（非常委）、国家副主席、国务院副总理、国务委员、全国人大常委会副委员长、全国政协副主席、中央军委副主席、最高人民法院院长、最高人民检察院检察长。
+            - 正部级（省部级正职）：党中央直属机构正职（中央办公厅主任、中央政法委秘书长、中央政策研究室主任、非政治局委员的中组部/中宣部/统战部部长）；国务院组成部门正职（各部部长（如外交部、国防部）、央行行长、审计署审计长）；地方党政正职（省委书记、省长、自治区主席、直辖市市长）；全国性机构正职（全国政协秘书长、全国人大专委会主任委员（正部级））。
+            - 副部级（省部级副职）：国务院部委副职（副部长、央行副行长、海关总署副署长）；地方党政副职（省委副书记、副省长、自治区副主席）；副省级城市四大班子正职（如武汉市市长、南京市人大常委会主任）；中央直属单位副职（中央纪委副书记（部分高配正部级）、中央党校副校长）。
+            - 正厅级（地厅级正职）：省级党政机关正职（如省教育厅厅长、省公安厅厅长、省委组织部常务副部长（主持工作））；地级市四大班子正职（市委书记、市长、市人大常委会主任、市政协主席）；中央驻地方机构正职；副部级单位常务副职（如国家发改委社会发展司司长（副部级国家发改委下属正厅级岗位））。
+            - 副厅级（地厅级副职）：省级机关副职；地级市四大班子副职（市委常委、副市长（如非常务副职））；中央驻地方机构副职。
+            - 正处级（县处级正职）：省级机关内设机构正职（如省发改委国民经济综合处处长、省公安厅治安管理总队总队长）；县级行政区正职（县长、县委书记（普通县）、市辖区区长、区委书记（地级市下属区））；地级市直部门正职。
+            - 副处级（县处级副职）：省级机关内设机构副职；县级行政区副职（副县长、县委常委、市辖区副区长）；地级市直部门副职。
+            - 正科级（乡科级正职）：县级机关正职；乡镇/街道正职；地级市直部门内设科室正职。
+            - 副科级（乡科级副职）：县级机关副职；乡镇/街道副职；地级市直部门内设科室副职。
+            - 科员级：一级科员、二级科员（基层公务员主体）；专业技术岗（如工程师、医师等事业单位人员）。
+            - 办事员级：基层辅助岗位（如乡镇政府办事员、社区工作人员、新入职公务员试用期人员）。
+"""
+
+# 履历提取规则（单人与批量提取共用，约2KB，批量模式下每次调用只发送一次）
+EXTRACT_RULES = """
+        1. 文本中的履历按时间顺序排列，如果某个时间段横跨多年(如2018-2020)，则这期间每年都使用与开始年份（这里是2018年）相同的职务信息。
+        2. 同一年份如有多次职务变动，只取时间最新的一条。
+        3. 职级判断请使用以下标准进行判断，如果难以确定职级则根据你的知识库判断，如果还无法判断返回空值：""" + LEVEL_RUBRIC
+
+
+EXTRACT_FIELDS = """
+        需要提取的字段：
+        - gender: 性别
+        - birth_date: 出生年月
+        - native_place: 籍贯
+        - education: 学历
+        - ethnicity: 民族
+        - positions: 职位信息（{start_year}-{end_year}年），数组格式，每个元素包含：
+        * year: 年份
+        * position: 职位
+        * level: 职级（根据知识库标准判断，难以确定时返回空）
+        * location: 地点（保留省/市/区全称）
+"""
+
+
+def extract_fields() -> str:
+    """按配置的年份范围生成字段说明"""
+    return EXTRACT_FIELDS.format(start_year=Config.START_YEAR, end_year=Config.END_YEAR)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中文约每字1个token，其余字符约每4个1个token"""
+    cjk = len(re.findall(r'[\u4e00-\u9fff]', text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def parse_json_response(response: str):
+    """解析模型返回的JSON，兼容代码块标记、推理过程与多余逗号，失败返回 {}"""
+    if not isinstance(response, str):
+        return {}
+    try:
+        # 尝试直接解析JSON
+        return json.loads(response)
+    except json.JSONDecodeError:
+        # 如果直接解析失败，尝试清理后再解析
+        # 1. 移除可能的markdown代码块标记和推理过程
+        cleaned_result = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL)
+        cleaned_result = re.sub(r'<think>.*?</think>', '', cleaned_result, flags=re.DOTALL)
+        cleaned_result = re.sub(r'^```json\s*|\s*```$', '', cleaned_result)
+        cleaned_result = re.sub(r',\s*([}\]])', r'\1', cleaned_result)  # 修复多余逗号
+        cleaned_result = re.sub(r"'(?=\s*:)", '"', cleaned_result)  # 替换单引号为双引号
+        # 2. 查找第一个 { 和最后一个 } 之间的内容
+        json_match = re.search(r'\{.*\}', cleaned_result, re.DOTALL)
+        if json_match:
+            try:
+                return json.loads(json_match.group())
+            except json.JSONDecodeError:
+                # 如果失败，尝试匹配列表或字典模式
+                try:
+                    # 匹配 [...] 或 {...} 模式
+                    pattern = r'(\[.*\]|\{.*\})'
+                    match = re.search(pattern, cleaned_result, re.DOTALL)
+                    if match:
+                        matched_content = match.group()
+                        # 尝试解析匹配到的内容
+                        return json.loads(matched_content)
+                except json.JSONDecodeError as je:
+                    print(f"JSON解析错误: {str(je)}")
+                    print(f"清理后的内容: {cleaned_result}")
+                    return {}
+        else:
+            print("未找到有效的JSON内容")
+            print(f"清理后的内容: {cleaned_result}")
+            return {}
+    return {}
+
 
 class GPTHelper:
     """GPT交互类"""
     def __init__(self, api_key: str = Config.GPT_API_KEY, model: str = Config.MODEL):
         self.api_key = api_key
         self.model = model
-        self.client = Ark(
-            api_key=api_key
-        )
+        self.llm = AsyncLLM(api_key, model, max_in_flight=Config.MAX_LLM_IN_FLIGHT)
         
     def validate_person(self, baidu_content: str, person_info: PersonInfo) -> bool:
         prompt = f"""
@@ -246,7 +915,7 @@ class GPTHelper:
         """
         
         try:
-            response = self.call_gpt(prompt)
+            response = self.call_gpt(prompt, kind='validate')
             print(f"GPT验证 {person_info.name} 为 {response.lower()}")
             return 'true' in response.lower()
         except Exception as e:
@@ -255,40 +924,13 @@ class GPTHelper:
     
     def extract_info(self, baidu_content: str, person: PersonInfo) -> Dict:
         prompt = f"""
-        请从以下履历文本中提取人物信息，请仅返回JSON格式的结果，不要有任何其他文字。注意以下要点：
-        1. 文本中的履历按时间顺序排列，如果某个时间段横跨多年(如2018-2020)，则这期间每年都使用与开始年份（这里是2018年）相同的职务信息。
-        2. 同一年份如有多次职务变动，只取时间最新的一条。
-        3. 职级判断请使用以下标准进行判断，如果难以确定职级则根据你的知识库判断，如果还无法判断返回空值：
-            - 正国级（党和国家领导人核心层）：中共中央政治局常务委员会委员、中华人民共和国主席、全国人民代表大会常务委员会委员长、国务院总理、全国政协主席、中央军事委员会主席、中央纪律检查委员会书记。
-            - 副国级（党和国家领导人）：中共中央政治局委员（非常委）、国家副主席、国务院副总理、国务委员、全国人大常委会副委员长、全国政协副主席、中央军委副主席、最高人民法院院长、最高人民检察院检察长。
-            - 正部级（省部级正职）：党中央直属机构正职（中央办公厅主任、中央政法委秘书长、中央政策研究室主任、非政治局委员的中组部/中宣部/统战部部长）；国务院组成部门正职（各部部长（如外交部、国防部）、央行行长、审计署审计长）；地方党政正职（省委书记、省长、自治区主席、直辖市市长）；全国性机构正职（全国政协秘书长、全国人大专委会主任委员（正部级））。
-            - 副部级（省部级副职）：国务院部委副职（副部长、央行副行长、海关总署副署长）；地方党政副职（省委副书记、副省长、自治区副主席）；副省级城市四大班子正职（如武汉市市长、南京市人大常委会主任）；中央直属单位副职（中央纪委副书记（部分高配正部级）、中央党校副校长）。
-            - 正厅级（地厅级正职）：省级党政机关正职（如省教育厅厅长、省公安厅厅长、省委组织部常务副部长（主持工作））；地级市四大班子正职（市委书记、市长、市人大常委会主任、市政协主席）；中央驻地方机构正职；副部级单位常务副职（如国家发改委社会发展司司长（副部级国家发改委下属正厅级岗位））。
-            - 副厅级（地厅级副职）：省级机关副职；地级市四大班子副职（市委常委、副市长（如非常务副职））；中央驻地方机构副职。
-            - 正处级（县处级正职）：省级机关内设机构正职（如省发改委国民经济综合处处长、省公安厅治安管理总队总队长）；县级行政区正职（县长、县委书记（普通县）、市辖区区长、区委书记（地级市下属区））；地级市直部门正职。
-            - 副处级（县处级副职）：省级机关内设机构副职；县级行政区副职（副县长、县委常委、市辖区副区长）；地级市直部门副职。
-            - 正科级（乡科级正职）：县级机关正职；乡镇/街道正职；地级市直部门内设科室正职。
-            - 副科级（乡科级副职）：县级机关副职；乡镇/街道副职；地级市直部门内设科室副职。
-            - 科员级：一级科员、二级科员（基层公务员主体）；专业技术岗（如工程师、医师等事业单位人员）。
-            - 办事员级：基层辅助岗位（如乡镇政府办事员、社区工作人员、新入职公务员试用期人员）。
-        4. 2024 年的职务信息如果履历文本中不包含以下内容则补充（从输入文件中读取）：
+        请从以下履历文本中提取人物信息，请仅返回JSON格式的结果，不要有任何其他文字。注意以下要点：{EXTRACT_RULES}
+        4. {Config.END_YEAR} 年的职务信息如果履历文本中不包含以下内容则补充（从输入文件中读取）：
             - 职务：{person.position}
 
         履历文本：
         {baidu_content}
-        
-        需要提取的字段：
-        - gender: 性别
-        - birth_date: 出生年月
-        - native_place: 籍贯
-        - education: 学历
-        - ethnicity: 民族
-        - positions: 职位信息（2016-2024年），数组格式，每个元素包含：
-        * year: 年份
-        * position: 职位
-        * level: 职级（根据知识库标准判断，难以确定时返回空）
-        * location: 地点（保留省/市/区全称）
-        
+        {extract_fields()}
         返回格式示例：
         {{
             "gender": "男",
@@ -309,55 +951,194 @@ class GPTHelper:
         """
         
         try:
-            response = self.call_gpt(prompt)
+            response = self.call_gpt(prompt, kind='extract')
         except Exception as e:
             print(f"GPT提取信息失败: {e}")
             return {}
         
+        result = parse_json_response(response)
+        return result if isinstance(result, dict) else {}
+
+    def validate_and_extract(self, baidu_content: str, person: PersonInfo) -> Optional[Dict]:
+        """一次调用完成身份判断与信息提取
+        Returns:
+            不是同一人返回None；是同一人返回提取结果（与 extract_info 格式相同）
+        Raises:
+            调用失败或回复中没有可解析的判断结果时抛出异常，由调用方改用分开的验证与提取
+        """
+        prompt = f"""
+        第一步：请判断以下百科内容是否描述的是同一个人：
+        - 姓名：{person.name}
+        - 职务：{person.position}
+        - 省份：{person.province}
+        - 部门：{person.department}
+        优先判断省份与部门；个别人物职务可能为空。
+
+        第二步：如果是同一个人，从履历文本中提取人物信息；如果不是，仅返回 {{"match": false}}。
+        请仅返回JSON格式的结果，不要有任何其他文字。提取时注意以下要点：{EXTRACT_RULES}
+        4. {Config.END_YEAR} 年的职务信息如果履历文本中不包含以下内容则补充（从输入文件中读取）：
+            - 职务：{person.position}
+
+        百科内容（履历文本）：
+        {baidu_content}
+        {extract_fields()}
+        返回格式示例：
+        {{
+            "match": true,
+            "gender": "男",
+            "birth_date": "1968年3月",
+            "native_place": "河北唐山",
+            "education": "大学本科",
+            "ethnicity": "汉族",
+            "positions": [
+                {{
+                    "year": 2016,
+                    "position": "内蒙古自治区纪委常委、秘书长",
+                    "level": "正厅级",
+                    "location": "内蒙古自治区"
+                }},
+                ...
+            ]
+        }}
+        """
+
+        result = parse_json_response(self.call_gpt(prompt, kind='validate_extract'))
+        if not isinstance(result, dict) or 'match' not in result:
+            raise ValueError(f"无法解析的回复: {str(result)[:200]}")
+        match = result.pop('match')
+        matched = match is True or str(match).strip().lower() == 'true'
+        print(f"GPT验证 {person.name} 为 {str(matched).lower()}")
+        return result if matched else None
+
+    def classify_levels(self, titles: List[str]) -> Dict[str, str]:
+        """判断一组职务的职级，返回 {职务: 职级}，无法判断的职级为空字符串"""
+        if not titles:
+            return {}
+        title_list = '\n'.join(f"        - {title}" for title in titles)
+        prompt = f"""
+        请判断以下每个职务的职级，请仅返回JSON格式的结果，不要有任何其他文字。
+        职级判断请使用以下标准进行判断，如果难以确定职级则根据你的知识库判断，如果还无法判断返回空值：{LEVEL_RUBRIC}
+        职务列表：
+{title_list}
+
+        返回格式示例：
+        {{
+            "内蒙古自治区纪委常委、秘书长": "正厅级"
+        }}
+        """
+
         try:
-            # 尝试直接解析JSON
-            return json.loads(response)
-        except json.JSONDecodeError:
-            # 如果直接解析失败，尝试清理后再解析
-            # 1. 移除可能的markdown代码块标记和推理过程
-            cleaned_result = re.sub(r'<thinking>.*?</thinking>', '', response, flags=re.DOTALL)
-            cleaned_result = re.sub(r'<think>.*?</think>', '', cleaned_result, flags=re.DOTALL)
-            cleaned_result = re.sub(r'^```json\s*|\s*```$', '', cleaned_result)
-            cleaned_result = re.sub(r',\s*([}\]])', r'\1', cleaned_result)  # 修复多余逗号
-            cleaned_result = re.sub(r"'(?=\s*:)", '"', cleaned_result)  # 替换单引号为双引号
-            # 2. 查找第一个 { 和最后一个 } 之间的内容
-            json_match = re.search(r'\{.*\}', cleaned_result, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    # 如果失败，尝试匹配列表或字典模式
-                    try:
-                        # 匹配 [...] 或 {...} 模式
-                        pattern = r'(\[.*\]|\{.*\})'
-                        match = re.search(pattern, cleaned_result, re.DOTALL)
-                        if match:
-                            matched_content = match.group()
-                            # 尝试解析匹配到的内容
-                            return json.loads(matched_content)
-                    except json.JSONDecodeError as je:
-                        print(f"JSON解析错误: {str(je)}")
-                        print(f"清理后的内容: {cleaned_result}")
-                        return {}
-            else:
-                print("未找到有效的JSON内容")
-                print(f"清理后的内容: {cleaned_result}")
-                return {}
+            result = parse_json_response(self.call_gpt(prompt, kind='classify_levels'))
+        except Exception as e:
+            print(f"GPT职级判断失败: {e}")
+            return {}
+        if not isinstance(result, dict):
+            return {}
+        return {title: str(result.get(title) or '') for title in titles}
+
+    @staticmethod
+    def _batch_entry(index: int, baidu_content: str, person: PersonInfo) -> str:
+        return f"""
+        【人物 P{index}】
+        姓名：{person.name}
+        输入文件职务（{Config.END_YEAR}年履历缺失时补充）：{person.position}
+        履历文本：
+        {baidu_content}
+        """
+
+    @classmethod
+    def pack_batches(cls, items: List, token_budget: int = Config.BATCH_TOKEN_BUDGET,
+                     max_persons: int = Config.BATCH_MAX_PERSONS) -> List[List[int]]:
+        """按token预算把待提取的人物分组，返回每组的下标列表；单人超出预算时独占一组"""
+        preamble = estimate_tokens(EXTRACT_RULES + extract_fields()) + 300
+        batches, current, used = [], [], preamble
+        for i, (content, person) in enumerate(items):
+            cost = estimate_tokens(cls._batch_entry(i, content, person))
+            if current and (used + cost > token_budget or len(current) >= max_persons):
+                batches.append(current)
+                current, used = [], preamble
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def extract_batch(self, items: List) -> List[Dict]:
+        """批量提取多人的信息，规则只发送一次
+        Args:
+            items: [(履历文本, PersonInfo)]
+        Returns:
+            与 items 对应的提取结果列表；批量结果缺失或无效的人物单独重试
+        """
+        results = [{} for _ in items]
+        batches, prompts = [], []
+        for batch in self.pack_batches(items):
+            if len(batch) == 1:
+                i = batch[0]
+                results[i] = self.extract_info(*items[i])
+                continue
+
+            entries = ''.join(self._batch_entry(i, *items[i]) for i in batch)
+            prompt = f"""
+        请分别从以下{len(batch)}位人物的履历文本中提取人物信息，请仅返回JSON数组，不要有任何其他文字。每位人物注意以下要点：{EXTRACT_RULES}
+        4. {Config.END_YEAR} 年的职务信息如果履历文本中不包含，则使用该人物的“输入文件职务”补充。
+        5. 不同人物的履历互不相关，不要混用。
+        {entries}
+        {extract_fields()}
+        返回格式示例（每位人物一个元素，id 与上面的人物编号一致）：
+        [
+            {{
+                "id": "P{batch[0]}",
+                "gender": "男",
+                "birth_date": "1968年3月",
+                "native_place": "河北唐山",
+                "education": "大学本科",
+                "ethnicity": "汉族",
+                "positions": [
+                    {{
+                        "year": 2016,
+                        "position": "内蒙古自治区纪委常委、秘书长",
+                        "level": "正厅级",
+                        "location": "内蒙古自治区"
+                    }},
+                    ...
+                ]
+            }},
+            ...
+        ]
+        """
+            batches.append(batch)
+            prompts.append(prompt)
+
+        # 各批次同时发送
+        for batch, response in zip(batches, self.call_gpt_many(prompts, kind='extract_batch')):
+            try:
+                parsed = parse_json_response(response)
+            except Exception as e:
+                print(f"GPT批量提取信息失败: {e}")
+                parsed = []
+            if isinstance(parsed, dict):
+                parsed = parsed.get('results', [parsed])
+
+            by_id = {}
+            for item in parsed if isinstance(parsed, list) else []:
+                if isinstance(item, dict) and isinstance(item.get('positions'), list):
+                    by_id[str(item.get('id', '')).strip().upper()] = item
+
+            for i in batch:
+                info = by_id.get(f"P{i}")
+                if info is None:
+                    # 批量结果缺失的人物单独重试
+                    print(f"批量提取缺少 {items[i][1].name}，单独重试")
+                    info = self.extract_info(*items[i])
+                results[i] = info
+        return results
     
-    def call_gpt(self, prompt: str) -> str:
+    def call_gpt(self, prompt: str, kind: str = 'call_gpt') -> str:
         try:
-            response = self.client.chat.completions.create(
-                model= self.model,  # 指定模型
-                messages=[{"role": "user", "content": prompt}],
-                stream=False
-            )
-            result = response.choices[0].message.content.strip()
-            return result
+            # 交给异步调用层：相同提示词的在途请求只发送一次，限流（429）时自动退避，连续失败时熔断
+            # kind 为任务类型，用于分类统计耗时与token用量
+            return self.llm.complete_sync(prompt, kind)
         except requests.exceptions.RequestException as e:
             print(f"请求异常: {str(e)}")
             return {}
@@ -365,14 +1146,261 @@ class GPTHelper:
             print(f"其他错误: {str(e)}")
             return {}
 
+    async def call_gpt_async(self, prompt: str, kind: str = 'call_gpt') -> str:
+        try:
+            return await self.llm.complete(prompt, kind)
+        except Exception as e:
+            print(f"其他错误: {str(e)}")
+            return {}
+
+    def call_gpt_many(self, prompts: List[str], kind: str = 'call_gpt') -> List:
+        """同时发送多个提示词，结果与输入顺序一致，失败的位置为空字典（与 call_gpt 一致）"""
+        if not prompts:
+            return []
+        responses = self.llm.map_sync(prompts, kind)
+        for i, response in enumerate(responses):
+            if isinstance(response, Exception):
+                print(f"其他错误: {str(response)}")
+                responses[i] = {}
+        return responses
+
+class LevelClassifier:
+    """职务职级分类类
+    第一层为规则表（与提示词中的职级标准一致），第二层为按规范化职务持久保存的GPT判断结果，
+    只有两层都无法判断的职务才交给GPT
+    """
+    LEVELS = LEVELS
+    SUB_PROVINCIAL_CITIES = ['广州', '长春', '济南', '杭州', '大连', '青岛', '武汉', '哈尔滨',
+                             '沈阳', '成都', '南京', '西安', '深圳', '厦门', '宁波']
+
+    # 规范化后用占位符表示辖区：省级、副省级城市、地级市（盟、自治州）、县级（区、旗）
+    P, S, C, X = '〈省〉', '〈副省级市〉', '〈市〉', '〈县〉'
+    # 只有直辖市名称后的“市”表示省级；吉林市、海南藏族自治州等与省份同名开头的地名交给后面的市级规则
+    MUNICIPALITIES = ['北京', '天津', '上海', '重庆']
+    _PROVINCE = re.compile(
+        r'^(?:(?:' + '|'.join(MUNICIPALITIES) + r')市?'
+        r'|(?:' + '|'.join(sorted(Gazetteer.PROVINCES, key=len, reverse=True)) + r')'
+        r'(?:维吾尔自治区|壮族自治区|回族自治区|自治区|省)?(?![市州盟]|[\u4e00-\u9fff]{1,4}自治州)'
+        r'|自治区|省(?!级))'
+    )
+    _SUB_PROVINCIAL = re.compile(r'^(?:' + '|'.join(SUB_PROVINCIAL_CITIES) + r')市')
+    _CITY = re.compile(r'^(?:[\u4e00-\u9fff]{2,6}?(?:市|盟|自治州|地区)|市(?=委|人民|政府|人大|政协|纪委|监委))')
+    _COUNTY = re.compile(
+        r'^(?:[\u4e00-\u9fff]{1,5}?(?:县|旗|区)|[县区旗])(?=委|人民政府|政府|人大|政协|纪委|监委|长|副)'
+    )
+    _PARTY_PREFIX = re.compile(r'^(?:中共|中国共产党)')
+    _SPLIT = re.compile(r'[、，,；;]|兼任?')
+    # 自身带有辖区含义的职务，拆分后只继承辖区
+    _PLACE_TITLES = re.compile(r'^(?:副)?(?:省长|主席|市长|盟长|州长|县长|区长|旗长)$')
+    _TITLE_SUFFIX = re.compile(
+        r'(?:党组|党委)?(?:副|常务副)?(?:书记|厅长|局长|主任|部长|秘书长|院长|检察长|成员|常委|巡视员|处长)$'
+    )
+
+    _DEPT = r'[^〈〉]{1,14}?(?:厅|局|委员会|委|办公室|办|部)'
+    _GOV = r'(?:人民)?(?:政府)?'
+    # 中央职务不含辖区占位符；复合职务中后续职务会带上前一职务的机构前缀（如“中央政治局国务院总理”）
+    _NATIONAL = r'^[^〈〉]*?'
+    _NPC = r'(?:全国人大常委会|全国人民代表大会常务委员会)'
+    _CPPCC = r'(?:全国政协|中国人民政治协商会议全国委员会)'
+    RULES = [(level, re.compile(pattern)) for level, pattern in [
+        ('正国级', rf'{_NATIONAL}(?:总书记|政治局常委|政治局常务委员会委员)$'),
+        ('正国级', rf'{_NATIONAL}(?:国家主席|中华人民共和国主席|国务院总理|{_NPC}委员长|{_CPPCC}主席)$'),
+        ('正国级', rf'{_NATIONAL}(?:(?:中央军委|中央军事委员会)主席|(?:中央纪委|中央纪律检查委员会)书记)$'),
+        ('副国级', rf'{_NATIONAL}(?:政治局委员|中央书记处书记|国务院副总理|国务委员)$'),
+        ('副国级', rf'{_NATIONAL}(?:国家副主席|中华人民共和国副主席|{_NPC}副委员长|{_CPPCC}副主席)$'),
+        ('副国级', rf'{_NATIONAL}(?:(?:中央军委|中央军事委员会)副主席|最高人民法院院长|最高人民检察院检察长)$'),
+        ('正部级', rf'^{P}(?:党委|委)?书记$'),
+        ('正部级', rf'^{P}{_GOV}(?:省长|主席|市长|长)$'),
+        ('正部级', rf'^{P}(?:人大常委会主任|政协主席)$'),
+        ('副部级', rf'^{P}(?:党委|委)?(?:副书记|常委)$'),
+        ('副部级', rf'^(?:{P}{_GOV})?(?:副省长|副主席|副市长)$'),
+        ('副部级', rf'^{P}(?:人大常委会副主任|政协副主席)$'),
+        ('副部级', rf'^{P}(?:(?:党委|委)?(?:纪委|纪委监委|政法委)书记|监委主任|高级人民法院院长|人民检察院检察长)$'),
+        ('副部级', rf'^{S}(?:(?:党委|委)?书记|{_GOV}市长|人大常委会主任|政协主席)$'),
+        ('正厅级', rf'^{S}(?:(?:党委|委)?(?:副书记|常委)|{_GOV}副市长|人大常委会副主任|政协副主席)$'),
+        ('正厅级', rf'^{C}(?:(?:党委|委)?书记|{_GOV}(?:市长|盟长|州长|长)|人大常委会主任|政协主席)$'),
+        ('正厅级', rf'^{P}(?:(?:党委|委)?(?:纪委|纪委监委)副书记|高级人民法院副院长|人民检察院副检察长)$'),
+        ('正厅级', rf'^{P}(?:{_GOV}|人大常委会|政协|党委|委)秘书长$'),
+        ('正厅级', rf'^{P}{_DEPT}(?:党组书记|党委书记|厅长|局长|主任|部长|书记)$'),
+        ('副厅级', r'^[^〈〉]*(?:二级巡视员|副巡视员)$'),
+        ('正厅级', r'^[^〈〉]*巡视员$'),
+        ('副厅级', rf'^{C}(?:(?:党委|委)?(?:副书记|常委)|{_GOV}(?:副市长|副盟长|副州长)|人大常委会副主任|政协副主席)$'),
+        ('副厅级', rf'^{P}{_DEPT}(?:副厅长|副局长|副主任|副部长|党组成员|党组副书记|副书记)$'),
+        ('副厅级', rf'^{P}(?:{_GOV}|人大常委会|政协|党委|委)副秘书长$'),
+        ('正处级', rf'^{X}(?:(?:党委|委)?书记|{_GOV}(?:县长|区长|旗长|长)|人大常委会主任|政协主席)$'),
+        ('正处级', rf'^{C}{_DEPT}(?:党组书记|局长|主任|部长)$'),
+        ('正处级', r'^[^〈〉]*[^副]处长$'),
+        ('副处级', rf'^{X}(?:(?:党委|委)?(?:副书记|常委)|{_GOV}(?:副县长|副区长|副旗长)|人大常委会副主任|政协副主席)$'),
+        ('副处级', rf'^{C}{_DEPT}(?:副局长|副主任|副部长)$'),
+        ('副处级', r'^[^〈〉]*副处长$'),
+    ]]
+
+    def __init__(self, gpt, memo_file: str = Config.LEVEL_MEMO_FILE):
+        self.gpt = gpt
+        self.memo_file = memo_file
+        self.memo = {}
+        if memo_file and os.path.exists(memo_file):
+            try:
+                with open(memo_file, 'r', encoding='utf-8') as f:
+                    self.memo = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"读取职级缓存失败: {e}")
+
+    def _canonical_part(self, part: str):
+        """单个职务规范化：地名替换为辖区占位符，只保留最内层辖区；返回 (规范化职务, 辖区占位符)"""
+        text = self._PARTY_PREFIX.sub('', part)
+        token = ''
+        for pattern, placeholder in ((self._PROVINCE, self.P), (self._SUB_PROVINCIAL, self.S),
+                                     (self._CITY, self.C), (self._COUNTY, self.X)):
+            if placeholder == self.C and token == self.S:
+                continue
+            match = pattern.match(text)
+            if match:
+                text, token = text[match.end():], placeholder
+        return token + text, token
+
+    def canonical_parts(self, title: str) -> List[str]:
+        """复合职务拆分并规范化，后续职务继承前一职务的辖区与机构"""
+        parts = []
+        stem, token = '', ''
+        for raw in self._SPLIT.split(re.sub(r'\s+', '', title or '')):
+            if not raw:
+                continue
+            canonical, own_token = self._canonical_part(raw)
+            if not own_token and parts:
+                canonical = (token if self._PLACE_TITLES.match(raw) else stem) + raw
+            else:
+                token = own_token or token
+            stem = self._TITLE_SUFFIX.sub('', canonical)
+            parts.append(canonical)
+        return parts
+
+    def normalize(self, title: str) -> str:
+        """缓存使用的规范化职务"""
+        return '、'.join(self.canonical_parts(title))
+
+    def classify_by_rules(self, title: str) -> str:
+        """规则判断，复合职务取最高职级；无法判断返回空字符串"""
+        best = ''
+        for part in self.canonical_parts(title):
+            for level, pattern in self.RULES:
+                if pattern.match(part):
+                    if not best or self.LEVELS.index(level) < self.LEVELS.index(best):
+                        best = level
+                    break
+        return best
+
+    def remember(self, title: str, level: str):
+        """记录GPT给出的职级（规则可判断的职务不写入缓存）"""
+        if title and level in self.LEVELS and not self.classify_by_rules(title):
+            self.memo[self.normalize(title)] = level
+
+    def classify(self, titles: List[str]) -> Dict[str, str]:
+        """判断一组职务的职级：规则 -> 缓存 -> GPT（只询问未见过的职务）"""
+        levels, unknown = {}, []
+        for title in dict.fromkeys(t for t in titles if t):
+            level = self.classify_by_rules(title) or self.memo.get(self.normalize(title), '')
+            metrics.cache('level', bool(level))
+            if level:
+                levels[title] = level
+            else:
+                unknown.append(title)
+
+        if unknown:
+            for title, level in self.gpt.classify_levels(unknown).items():
+                levels[title] = level
+                self.remember(title, level)
+            self.save()
+        return levels
+
+    def save(self):
+        if not self.memo_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.memo_file) or '.', exist_ok=True)
+            tmp_file = self.memo_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.memo, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_file, self.memo_file)
+        except OSError as e:
+            print(f"保存职级缓存失败: {e}")
+
+class SearchCache:
+    """博查搜索结果缓存（SQLite）
+    以规范化后的查询为键保存全部结果（标题、链接、摘要），超过 ttl 秒的记录视为过期；
+    同时记录省份与部门，便于同一部门的人物复用已有结果
+    """
+    def __init__(self, path: str = Config.SEARCH_CACHE_FILE, ttl: int = Config.SEARCH_CACHE_TTL):
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS search_cache ('
+                'query TEXT PRIMARY KEY, province TEXT, department TEXT, results TEXT, created REAL)'
+            )
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_search_department ON search_cache (province, department)'
+            )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """全角转半角、合并空白、统一大小写"""
+        return ' '.join(unicodedata.normalize('NFKC', query).lower().split())
+
+    def get(self, query: str) -> Optional[List[Dict]]:
+        row = self.conn.execute(
+            'SELECT results FROM search_cache WHERE query = ? AND created >= ?',
+            (self.normalize_query(query), time.time() - self.ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, query: str, results: List[Dict], province: str = '', department: str = ''):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)',
+                (self.normalize_query(query), province, department,
+                 json.dumps(results, ensure_ascii=False), time.time())
+            )
+
+    def department_results(self, province: str, department: str) -> List[Dict]:
+        """同一部门其他查询的未过期结果（按链接去重）"""
+        rows = self.conn.execute(
+            'SELECT results FROM search_cache WHERE province = ? AND department = ? AND created >= ?',
+            (province, department, time.time() - self.ttl)
+        )
+        results = {}
+        for (data,) in rows:
+            for item in json.loads(data):
+                results.setdefault(item['url'], item)
+        return list(results.values())
+
+
 class WebSearcher:
     """网页搜索类"""
-    def __init__(self, api_key: str = Config.BOCHAAI_API_KEY):
+    def __init__(self, api_key: str = Config.BOCHAAI_API_KEY, validator: Optional['ContentValidator'] = None,
+                 cache: Optional[SearchCache] = None):
         self.api_key = api_key
-        
-    def search_baidu_pages(self, person_info: PersonInfo) -> List[str]:
-        query = f"{person_info.province} {person_info.department} {person_info.name} 百度百科"
-        
+        self.validator = validator
+        self.disambiguator = LemmaDisambiguator(validator) if validator else None
+        self.cache = cache if cache is not None else SearchCache()
+
+    def search(self, query: str, province: str = '', department: str = '') -> List[Dict]:
+        """返回全部搜索结果 [{name, url, summary}]，优先读取缓存"""
+        cached = self.cache.get(query)
+        metrics.cache('search', cached is not None)
+        if cached is not None:
+            print(f"搜索缓存命中: {query}")
+            return cached
+
+        # 录制模式下同时保存结果，回放模式下直接读取录制的结果
+        results = cassette.through_json('bocha', self.cache.normalize_query(query), lambda: self.request(query))
+        self.cache.put(query, results, province, department)
+        return results
+
+    def request(self, query: str) -> List[Dict]:
+        """调用博查搜索接口，返回 [{name, url, summary}]"""
         payload = json.dumps({
             "query": query,
             "summary": True,
@@ -385,20 +1413,61 @@ class WebSearcher:
             'Content-Type': 'application/json'
         }
         
+        def post():
+            response = requests.post(Config.BOCHAAI_API_URL, headers=headers, data=payload,
+                                     timeout=Config.SEARCH_TIMEOUT)
+            check_status(response.status_code)
+            return response
+
+        with metrics.timer('search'):
+            response = endpoints.get('bocha').call(post)
+        data = response.json()
+        if response.status_code != 200 or not data.get('data'):
+            # 出错的响应不写入缓存
+            raise ValueError(f"HTTP {response.status_code}: {data.get('msg') or data.get('message')}")
+        return [
+            {
+                'name': item.get('name', ''),
+                'url': item['url'],
+                'summary': item.get('summary') or item.get('snippet', ''),
+            }
+            for item in data['data'].get('webPages', {}).get('value', [])
+        ]
+
+    def rank_baike_results(self, results: List[Dict], person_info: PersonInfo) -> List[str]:
+        """用标题和摘要在本地预筛百科链接：标题须含姓名，按摘要中命中的关键词数排序"""
+        scored = []
+        for order, item in enumerate(results):
+            if 'baike.baidu.com' not in item['url'] or person_info.name not in item['name']:
+                continue
+            score = 0
+            if self.validator:
+                score = len(self.validator.matched_keywords(item['name'] + item['summary'], person_info))
+            scored.append((-score, order, item['url']))
+        scored.sort()
+        # 已有摘要命中关键词的候选时，不再抓取摘要完全不相关的同名页面
+        if scored and scored[0][0] < 0:
+            scored = [entry for entry in scored if entry[0] < 0]
+        return [url for _, _, url in scored[:Config.SEARCH_MAX_PAGES]]
+
+    def search_baidu_pages(self, person_info: PersonInfo) -> List[str]:
+        # 同部门其他人物的搜索结果中已有此人的百科页面时，不再发起新的搜索；
+        # 只复用标题与摘要达到消歧阈值的结果，避免同名的其他人物
+        cached = [item for item in self.cache.department_results(person_info.province, person_info.department)
+                  if self.disambiguator and self.disambiguator.matches(item['name'] + item['summary'], person_info)]
+        pages = self.rank_baike_results(cached, person_info)
+        metrics.cache('search_department', bool(pages))
+        if pages:
+            print(f"复用同部门搜索结果: {person_info.name}")
+            return pages
+
+        query = f"{person_info.province} {person_info.department} {person_info.name} 百度百科"
         try:
-            response = requests.post(Config.BOCHAAI_API_URL, headers=headers, data=payload)
-            data = response.json()
-            
-            # 筛选百度百科链接
-            baidu_pages = []
-            for item in data['data']['webPages']['value']:
-                if 'baike.baidu.com' in item['url']:
-                    baidu_pages.append(item['url'])
-            
-            return baidu_pages[:3]  # 返回前三条结果
+            results = self.search(query, person_info.province, person_info.department)
         except Exception as e:
             print(f"搜索失败: {e}")
             return []
+        return self.rank_baike_results(results, person_info)
 
 class DataProcessor:
     """数据处理类"""
@@ -406,43 +1475,152 @@ class DataProcessor:
         self.spider = BaiduSpider()
         self.validator = ContentValidator()
         self.gpt = GPTHelper()
-        self.searcher = WebSearcher()
-        
-    def process_file(self, input_file: str = Config.INPUT_EXCEL):
-        # 读取输入文件
-        df = pd.read_csv(input_file)
+        # 录制/回放时搜索缓存、职级缓存与结果存储都改到录制文件旁的目录，回放结果与录制时一致
+        self.searcher = WebSearcher(validator=self.validator,
+                                    cache=SearchCache(cassette.state_path(Config.SEARCH_CACHE_FILE)))
+        self.disambiguator = LemmaDisambiguator(self.validator)
+        self.pending_extractions = []  # 批量提取模式下待提取的 (履历文本, PersonInfo)
+        self.resume_parser = ResumeParser()
+        self.level_classifier = LevelClassifier(self.gpt, cassette.state_path(Config.LEVEL_MEMO_FILE))
+        self.store = open_store(cassette.state_path(Config.OUTPUT_STORE or Config.OUTPUT_EXCEL), PersonInfo.headers(),
+                                table='baike_results', batch_size=Config.STORE_BATCH_SIZE)
         
+    @staticmethod
+    def iter_input_rows(input_file: str, start: int = 0, stop: Optional[int] = None,
+                        shard: Optional[tuple] = None):
+        """逐行读取输入（CSV，或 gov_crawler 写入的 .db/.parquet 结果存储），内存占用与文件大小无关
+        Args:
+            start, stop: 数据行下标范围（不含表头），stop 为 None 时读到文件末尾
+            shard: (i, n) 时只返回下标对 n 取余等于 i 的行，多个进程各处理互不重叠的一份
+        """
+        if input_file.lower().endswith('.csv'):
+            rows = DataProcessor._iter_csv(input_file)
+        else:
+            rows = iter_store_rows(input_file, table='gov_leaders')
+        for index, row in enumerate(rows):
+            if index < start:
+                continue
+            if stop is not None and index >= stop:
+                break
+            if shard and index % shard[1] != shard[0]:
+                continue
+            yield row
+
+    @staticmethod
+    def _iter_csv(input_file: str):
+        with open(input_file, 'r', newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+
+    def process_file(self, input_file: str = Config.INPUT_EXCEL, start: int = 0,
+                     stop: Optional[int] = None, shard: Optional[tuple] = None):
         # 处理每个人物
-        for _, row in df.iterrows():
-            person = PersonInfo(
-                name=row['姓名'],
-                position=row['职务'],
-                resume=row['简历'],
-                province=row['省份'],
-                department=row['部门']
-            )
+        for row in self.iter_input_rows(input_file, start, stop, shard):
+            person = PersonInfo.from_row(row)
             
             if not self.check_duplicate(person):
                 print(f"正在爬取 {person.name}...")
                 self.process_person(person)
             else:
                 print(f"{person.name} 已存在，跳过处理")
+
+        self.finish()
+
+    def finish(self):
+        """处理结束：提取批量模式下剩余的人物，保存职级缓存，写入缓存的结果"""
+        self.flush_extractions()
+        self.level_classifier.save()
+        self.store.flush()
+        metrics.write(Config.METRICS_DIR, 'baike',
+                      extra={'endpoints': endpoints.snapshot(), 'llm_requests': self.gpt.llm.stats})
+        self.gpt.llm.close()
     
     def process_person(self, person: PersonInfo):
+        with metrics.timer('person', detail=person.name):
+            source = self._process_person(person)
+        metrics.inc('persons', source=source)
+
+    def _process_person(self, person: PersonInfo) -> str:
+        """返回信息来源，用于统计"""
+        # 优先使用政府网站简历
+        if Config.RESUME_FIRST and self.enrich_from_resume(person):
+            return 'resume'
+
         # 爬取百度百科
-        content = self.spider.query(person.name)
+        content, candidates = self.spider.query_with_candidates(person.name)
         
         if not content:
             self.try_alternative_sources(person)
-            return
+            return 'search'
         
         # 验证身份
         if self.validator.validate_by_keywords(content, person):
             self.extract_and_save(content, person)
-        elif self.gpt.validate_person(content, person):
-            self.extract_and_save(content, person)
+            return 'baike'
+        elif self.try_polysemant_candidates(candidates, person):
+            return 'polysemant'
+        elif self.validate_with_gpt_and_save(content, person):
+            return 'gpt_validated'
         else:
             self.try_alternative_sources(person)
+            return 'search'
+
+    def validate_with_gpt_and_save(self, content: str, person: PersonInfo) -> bool:
+        """关键词验证不通过时交给GPT判断身份，确认后提取并保存；成功返回True
+        合并模式下身份判断与信息提取在同一次调用中完成，内容只上传一次
+        """
+        if not self.validator.is_plausible(content, person):
+            return False
+
+        if Config.COMBINED_VALIDATE_EXTRACT:
+            try:
+                info = self.gpt.validate_and_extract(content, person)
+            except Exception as e:
+                # 出错不等于“不是同一人”，改用分开的验证与提取
+                print(f"GPT验证与提取失败，改为分步验证: {e}")
+                metrics.inc('validate_extract_fallback')
+            else:
+                if info is None:
+                    return False
+                self.apply_info(person, info)
+                self.save_person(person)
+                return True
+
+        if self.gpt.validate_person(content, person):
+            self.extract_and_save(content, person)
+            return True
+        return False
+
+    def enrich_from_resume(self, person: PersonInfo) -> bool:
+        """从政府网站简历（输入文件的简历列）提取信息
+        Returns:
+            简历覆盖全部年份时保存并返回True；否则保留已解析的年份，返回False由百科补充其余年份
+        """
+        resume = _text(person.resume)
+        if not resume or not self.extract_locally(resume, person):
+            return False
+
+        filled = {year for year, data in person.positions.items() if data['position']}
+        if len(filled) == len(person.positions):
+            print(f"{person.name} 已由政府网站简历完成提取")
+            self.save_person(person)
+            return True
+
+        person.locked_years = filled
+        print(f"{person.name} 的简历缺少部分年份，使用百度百科补充")
+        return False
+
+    def try_polysemant_candidates(self, candidates: List[Dict], person: PersonInfo) -> bool:
+        """在同名义项中本地选出最匹配的词条，仅抓取该词条；成功保存返回True"""
+        best = self.disambiguator.best_candidate(candidates, person)
+        if not best or best['current']:
+            return False
+        
+        print(f"{person.name} 选择同名义项: {best['description']}")
+        content = self.spider.query(best['url'])
+        if content and self.validator.validate_by_keywords(content, person):
+            self.extract_and_save(content, person)
+            return True
+        return False
     
     def try_alternative_sources(self, person: PersonInfo):
         # 搜索其他来源
@@ -453,55 +1631,129 @@ class DataProcessor:
             if not content:
                 continue
                 
-            if self.validator.validate_by_keywords(content, person) or \
-               self.gpt.validate_person(content, person):
+            if self.validator.validate_by_keywords(content, person):
                 self.extract_and_save(content, person)
                 return
+            if self.validate_with_gpt_and_save(content, person):
+                return
         
-        # 所有尝试都失败，记录到失败日志
+        # 所有尝试都失败，记录到失败日志；已从简历解析出的年份仍然保存
+        if person.locked_years:
+            self.save_person(person)
         self.log_failed_person(person)
     
     def extract_and_save(self, content: str, person: PersonInfo):
+        # 优先使用规则解析履历
+        if Config.RULE_BASED_EXTRACT:
+            parsed_locally = self.extract_locally(content, person)
+            metrics.cache('rule_extract', parsed_locally)
+            if parsed_locally:
+                self.save_person(person)
+                return
+
+        # 批量模式下先缓存，凑满一批再统一提取
+        if Config.BATCH_EXTRACT:
+            self.pending_extractions.append((content, person))
+            batches = self.gpt.pack_batches(self.pending_extractions)
+            if len(batches) > 1:
+                # 新加入的人物超出预算，先提取已凑满的一批
+                self.flush_extractions(len(batches[0]))
+            return
+
         # 提取信息
         info = self.gpt.extract_info(content, person)
-        
+        self.apply_info(person, info)
+        self.save_person(person)
+
+    def extract_locally(self, content: str, person: PersonInfo) -> bool:
+        """用规则解析履历填充人物信息，只把无法解析的行交给GPT，职级单独判断
+        Returns:
+            规则解析不出任何任职时返回False，由调用方走完整的GPT提取
+        """
+        parsed = self.resume_parser.parse(content, person)
+        positions = parsed['positions']
+        if not positions:
+            return False
+
+        # 已由政府网站简历确定的年份不会被覆盖，不算缺失
+        missing_years = [year for year in parsed['missing_years'] if str(year) not in person.locked_years]
+        if missing_years and parsed['unresolved']:
+            # 仅就无法解析的行调用GPT，补充缺失的年份
+            info = self.gpt.extract_info('\n'.join(parsed['unresolved']), person)
+            extra = info.get('positions') if isinstance(info, dict) else None
+            for item in extra if isinstance(extra, list) else []:
+                try:
+                    year = int(item.get('year'))
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                if year in missing_years and item.get('position'):
+                    positions[year] = {
+                        'position': item.get('position', ''),
+                        'level': item.get('level', ''),
+                        'location': item.get('location', '')
+                    }
+
+        basic = parsed['basic']
+        for field in ('gender', 'birth_date', 'native_place', 'education', 'ethnicity'):
+            if basic.get(field):
+                setattr(person, field, basic[field])
+        person.update_positions([{'year': year, **data} for year, data in positions.items()])
+        for data in person.positions.values():
+            self.level_classifier.remember(data['position'], data['level'])
+        self.fill_levels(person)
+        return True
+
+    def fill_levels(self, person: PersonInfo):
+        """为缺少职级的职务判断职级"""
+        titles = sorted({data['position'] for data in person.positions.values()
+                         if data['position'] and not data['level']})
+        if not titles:
+            return
+        levels = self.level_classifier.classify(titles)
+        for data in person.positions.values():
+            if data['position'] and not data['level']:
+                data['level'] = levels.get(data['position'], '')
+
+    def flush_extractions(self, count: Optional[int] = None):
+        """提取并保存批量模式下缓存的前 count 个人物（默认全部）"""
+        if not self.pending_extractions:
+            return
+        count = len(self.pending_extractions) if count is None else count
+        items = self.pending_extractions[:count]
+        self.pending_extractions = self.pending_extractions[count:]
+        for (_, person), info in zip(items, self.gpt.extract_batch(items)):
+            self.apply_info(person, info)
+            self.save_person(person)
+
+    def apply_info(self, person: PersonInfo, info: Dict):
         # 更新人物信息
         if info:
-            person.gender = info.get('gender', '')
-            person.birth_date = info.get('birth_date', '')
-            person.native_place = info.get('native_place', '')
-            person.education = info.get('education', '')
-            person.ethnicity = info.get('ethnicity', '')
+            person.gender = info.get('gender') or person.gender
+            person.birth_date = info.get('birth_date') or person.birth_date
+            person.native_place = info.get('native_place') or person.native_place
+            person.education = info.get('education') or person.education
+            person.ethnicity = info.get('ethnicity') or person.ethnicity
             
             positions = info.get('positions', {})
             person.update_positions(positions)
-        
-        # 保存到Excel
-        headers = ['省份', '部门', '姓名', '性别', '出生年月', '籍贯', '学历', '民族', 
-                   '2016职位', '2016职级', '2016地点', '2017职位', '2017职级', '2017地点',
-                   '2018职位', '2018职级', '2018地点', '2019职位', '2019职级', '2019地点',
-                   '2020职位', '2020职级', '2020地点', '2021职位', '2021职级', '2021地点',
-                   '2022职位', '2022职级', '2022地点', '2023职位', '2023职级', '2023地点',
-                   '2024职位', '2024职级', '2024地点']
-        self.save_to_excel(person, headers)
+
+            # 记录GPT给出的职级，缺失的职级本地补充
+            for data in person.positions.values():
+                self.level_classifier.remember(data['position'], data['level'])
+            self.fill_levels(person)
+
+    def save_person(self, person: PersonInfo):
+        # 写入结果存储（批量缓存，finish 时写入剩余部分）
+        self.store.add(person.to_dict())
     
     def check_duplicate(self, person: PersonInfo) -> bool:
-        if not os.path.exists(Config.OUTPUT_EXCEL):
-            return False
-        
-        df = pd.read_csv(Config.OUTPUT_EXCEL)
-        return person.name in df['姓名'].values
-    
-    def save_to_excel(self, person: PersonInfo, headers):
-        file_exists = os.path.exists(Config.OUTPUT_EXCEL)
-        
-        with open(Config.OUTPUT_EXCEL, 'a', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(person.to_dict())
+        """已写入结果，或已在批量提取队列中等待提取"""
+        if any(pending.name == person.name for _, pending in self.pending_extractions):
+            return True
+        return self.store.has('姓名', person.name)
     
     def log_failed_person(self, person: PersonInfo):
+        metrics.inc('failed_persons')
         # 检查文件是否存在
         if not os.path.exists(Config.FAILED_LOG):
             # 如果文件不存在，直接写入
@@ -521,7 +1773,61 @@ class DataProcessor:
             f.write(f"{person.name}\t{person.position}\t{person.province}\t{person.department}\n")
             print(f"记录 {person.name} 到失败日志")
     
+def parse_shard(value: str) -> tuple:
+    """解析 --shard i/n"""
+    try:
+        index, total = (int(x) for x in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"分片格式应为 i/n: {value}")
+    if total <= 0 or not 0 <= index < total:
+        raise argparse.ArgumentTypeError(f"分片下标超出范围: {value}")
+    return index, total
+
+
+def parse_years(value: str) -> tuple:
+    """解析 --years 起始年-结束年"""
+    try:
+        start, end = (int(x) for x in value.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"年份范围格式应为 起始年-结束年: {value}")
+    if start > end:
+        raise argparse.ArgumentTypeError(f"起始年份晚于结束年份: {value}")
+    return start, end
+
+
 # 主程序
 if __name__ == '__main__':
-    processor = DataProcessor()
-    processor.process_file()
+    parser = argparse.ArgumentParser(description='百度百科履历补充')
+    parser.add_argument('--input', default=Config.INPUT_EXCEL, help='gov_crawler 的输出（.csv/.db/.parquet）')
+    parser.add_argument('--output', default=None,
+                        help='输出路径，后缀决定格式（.csv/.db/.parquet），默认使用 Config（分片时自动加后缀）')
+    parser.add_argument('--start', type=int, default=0, help='起始数据行（含）')
+    parser.add_argument('--stop', type=int, default=None, help='结束数据行（不含）')
+    parser.add_argument('--shard', type=parse_shard, default=None, help='只处理第 i 份（共 n 份），如 0/4')
+    parser.add_argument('--years', type=parse_years, default=None, help='统计年份范围，如 2016-2024')
+    parser.add_argument('--profile', action='store_true', help='开启性能分析（cProfile、调用栈采样、内存峰值）')
+    parser.add_argument('--profile-dir', default=None, help='性能分析结果目录，默认 results/profile/<时间>')
+    add_cassette_arguments(parser)
+    add_archive_arguments(parser)
+    args = parser.parse_args()
+
+    if args.years:
+        Config.START_YEAR, Config.END_YEAR = args.years
+    output = args.output or Config.OUTPUT_STORE or Config.OUTPUT_EXCEL
+    if args.shard and not args.output:
+        root, ext = os.path.splitext(output)
+        output = f"{root}.shard{args.shard[0]}of{args.shard[1]}{ext}"
+    Config.OUTPUT_STORE = output
+
+    open_from_args(args)
+    if args.archive:
+        archive.open(args.archive)
+    profiler = enable_profiling(args.profile_dir) if args.profile else None
+    try:
+        processor = DataProcessor()
+        processor.process_file(args.input, args.start, args.stop, args.shard)
+    finally:
+        if profiler:
+            profiler.stop()
+        cassette.close()
+        archive.close()
@@ -0,0 +1,86 @@
+"""百度百科履历提取基准测试
+
+生成不同长度的人物词条页面，对比原先的 count(...) 交集XPath 与 BaikePageParser 的耗时。
+用法：python benchmarks/bench_baike_extract.py [--sizes 50 200 1000 4000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from baike_crawler import BaikePageParser  # noqa: E402
+
+
+# 原 BaiduSpider.query 中使用的XPath（依赖完整哈希类名，且对每个候选节点重复整页查询）
+LEGACY_XPATH = etree.XPath('''
+    //div[@class='paraTitle_WslP_ level-1_Ep022' and h2='人物履历']/following-sibling::div[
+        contains(@class, 'para_fT72O') and
+        count(. | //div[@class='paraTitle_WslP_ level-1_Ep022'][h2!='人物履历'][1]/preceding-sibling::div) =
+        count(//div[@class='paraTitle_WslP_ level-1_Ep022'][h2!='人物履历'][1]/preceding-sibling::div)
+    ]
+    //span[@class='text_H18Us']/text()
+    | (//div[contains(@class, 'basicInfo_Dxt9K')]//dt[@class='basicInfoItem_zB304 itemName_LS0Jv']
+    /text())
+    | (//div[contains(@class, 'basicInfo_Dxt9K')]//dd[@class='basicInfoItem_zB304 itemValue_AYbkR']
+    /span[@class='text_H18Us']/text())
+''')
+
+
+def build_lemma_page(paragraphs: int) -> str:
+    """构造与百科结构一致的词条页面：人物履历段落数为 paragraphs，其后接一个较长的其他板块"""
+    basic_info = ''.join(
+        f"<dt class='basicInfoItem_zB304 itemName_LS0Jv'>{name}</dt>"
+        f"<dd class='basicInfoItem_zB304 itemValue_AYbkR'><span class='text_H18Us'>{value}</span></dd>"
+        for name, value in [('中文名', '张三'), ('性别', '男'), ('民族', '汉族'),
+                            ('出生日期', '1968年3月'), ('籍贯', '河北唐山'), ('学历', '大学本科')]
+    )
+    body = ["<div class='paraTitle_WslP_ level-1_Ep022'><h2>人物履历</h2></div>"]
+    for i in range(paragraphs):
+        year = 1990 + i % 35
+        body.append(
+            f"<div class='para_fT72O content_xxx'><span class='text_H18Us'>"
+            f"{year}.{i % 12 + 1:02d}—{year + 1}.{(i + 3) % 12 + 1:02d} 任某某市某某局第{i}处处长</span></div>"
+        )
+    body.append("<div class='paraTitle_WslP_ level-1_Ep022'><h2>人物评价</h2></div>")
+    for i in range(paragraphs):
+        body.append(f"<div class='para_fT72O'><span class='text_H18Us'>评价段落{i}</span></div>")
+    return (
+        "<html><body>"
+        f"<div class='basicInfo_Dxt9K J-basic-info'><dl>{basic_info}</dl></div>"
+        f"<div class='mainContent_xyz'>{''.join(body)}</div>"
+        "</body></html>"
+    )
+
+
+def bench(func, html, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000, 4000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'段落数':>8} {'原XPath(ms)':>14} {'新解析(ms)':>12} {'加速比':>8}")
+    for size in args.sizes:
+        html = etree.HTML(build_lemma_page(size))
+        legacy = LEGACY_XPATH(html)
+        current = BaikePageParser.extract_lines(html)
+        assert legacy == current, f"提取结果不一致（段落数 {size}）"
+
+        legacy_time = bench(LEGACY_XPATH, html, args.repeat)
+        parser_time = bench(BaikePageParser.extract_lines, html, args.repeat)
+        print(f"{size:>8} {legacy_time * 1000:>14.2f} {parser_time * 1000:>12.2f} {legacy_time / parser_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""爬取调度的扩展性测试
+
+在本地合成网站（synthetic_site.py）上运行 GovInfoCrawler.process_department，大模型使用 fake_ark.FakeAsyncArk，
+对每组 并发数 × 递归深度 统计：部门吞吐、每个部门的页面请求数与大模型调用数、找到领导的部门比例。
+Selenium 深度展开以普通请求代替。结果写入JSON。
+用法：python benchmarks/bench_crawl_scaling.py [--concurrency 1 4 8] [--max-depth 2 4 6] [--sample 200]
+      [--latency 0.05] [--error-rate 0.02] [--llm-latency 0.2]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from gov_crawler import GovInfoCrawler  # noqa: E402
+from llm_async import AsyncLLM  # noqa: E402
+from metrics import metrics  # noqa: E402
+from resilience import endpoints  # noqa: E402
+
+from fake_ark import FakeAsyncArk  # noqa: E402
+from synthetic_site import DISCLOSURE_PATH, SyntheticServer, SyntheticSite, sample_departments  # noqa: E402
+
+
+def run_once(server: SyntheticServer, departments, concurrency: int, max_depth: int, llm: AsyncLLM,
+             client: FakeAsyncArk, chunk_size: int, use_discovery: bool = True) -> dict:
+    """以 concurrency 个线程并行处理各部门，每个线程一个爬虫实例（结果写入各自的临时目录）"""
+    server.reset_counts()
+    client.calls.clear()
+    with metrics.lock:
+        metrics.counters.clear()
+        metrics.histograms.clear()
+    # 合成网站只有一个域名：该域名端点的并发上限即本组测试的并发数，不设请求间隔
+    endpoints.endpoints.pop(server.host, None)
+    endpoints.settings[server.host] = {'max_concurrency': concurrency, 'min_interval': 0.0}
+
+    local = threading.local()
+    crawlers = []
+    found = {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        def worker(department):
+            crawler = getattr(local, 'crawler', None)
+            if crawler is None:
+                crawler = GovInfoCrawler('offline', 'bench', chunk_size, max_depth, server.url, [],
+                                         os.path.join(folder, threading.current_thread().name),
+                                         use_discovery=use_discovery)
+                crawler.llm = llm
+                # 不启动浏览器：深度展开改为普通请求
+                crawler.expand_content_with_selenium = crawler.get_content_request
+                local.crawler = crawler
+                crawlers.append(crawler)
+            results = crawler.process_department(server.url.rstrip('/') + department['path'],
+                                                 department['province'], department['name'])
+            found[department['path']] = len(results)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(worker, departments))
+        elapsed = time.perf_counter() - start
+        for crawler in crawlers:
+            crawler.close_stores()
+
+    fetches = [server.department_requests(d) for d in departments]
+    # 发现阶段开启时，有 ldxx/ 短路径或领导信息在标准信息公开路径上的部门不受递归深度限制
+    reachable = [d for d in departments if d['depth'] < max_depth
+                 or (use_discovery and (d['shortcut'] or d['depth'] == len(DISCLOSURE_PATH)))]
+    with metrics.lock:
+        discovery = {dict(labels)['result']: int(value) for (name, labels), value in metrics.counters.items()
+                     if name == 'discovery'}
+    return {
+        'concurrency': concurrency,
+        'max_depth': max_depth,
+        'departments': len(departments),
+        'seconds': round(elapsed, 3),
+        'departments_per_second': round(len(departments) / elapsed, 2),
+        'pages_per_second': round(sum(fetches) / elapsed, 2),
+        'fetches_per_department': {
+            'mean': round(statistics.mean(fetches), 2),
+            'p95': sorted(fetches)[int(len(fetches) * 0.95) - 1] if fetches else 0,
+            'max': max(fetches, default=0),
+        },
+        'llm_calls_per_department': round(sum(client.calls.values()) / len(departments), 2),
+        'found_ratio': round(sum(1 for n in found.values() if n) / len(departments), 3),
+        'reachable_ratio': round(len(reachable) / len(departments), 3),
+        'discovery': discovery,
+        'discovery_ratio': round((discovery.get('sitemap', 0) + discovery.get('probe', 0)) / len(departments), 3),
+        'status': dict(server.status),
+        'endpoint': endpoints.snapshot().get(server.host, {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成网站上的爬取扩展性测试')
+    parser.add_argument('--provinces', type=int, default=31)
+    parser.add_argument('--departments', type=int, default=100, help='每个省的部门数')
+    parser.add_argument('--sample', type=int, default=100, help='每组测试处理的部门数（从全部部门中抽样）')
+    parser.add_argument('--noise', type=int, default=200, help='每页新闻条数')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--max-depth', type=int, nargs='+', default=[2, 4, 6])
+    parser.add_argument('--latency', type=float, default=0.02, help='网站平均响应延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='网站返回 503/500 的概率')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='模拟的大模型单次调用延迟（秒）')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--no-discovery', action='store_true', help='关闭 sitemap/常见路径发现阶段，用于对比')
+    parser.add_argument('--output', default=None, help='结果JSON路径，默认 results/benchmarks/crawl_scaling_<时间>.json')
+    args = parser.parse_args()
+
+    site = SyntheticSite(args.provinces, args.departments, noise=args.noise)
+    departments = sample_departments(site, args.sample)
+    client = FakeAsyncArk(args.llm_latency)
+    llm = AsyncLLM('offline', 'bench', max_in_flight=64, client=client)
+
+    runs = []
+    with SyntheticServer(site, args.latency, args.error_rate) as server:
+        print(f"合成网站 {server.url}：{len(site.provinces) * site.departments_per_province} 个部门，每组抽样 {len(departments)} 个")
+        print(f"{'并发':>4} {'深度':>4} {'耗时(s)':>8} {'部门/秒':>8} {'页面/秒':>8} {'请求/部门':>9} {'调用/部门':>9} {'找到':>6} {'可达':>6} {'发现':>6}")
+        for max_depth in args.max_depth:
+            for concurrency in args.concurrency:
+                result = run_once(server, departments, concurrency, max_depth, llm, client, args.chunk_size,
+                                  not args.no_discovery)
+                runs.append(result)
+                print(f"{concurrency:>4} {max_depth:>4} {result['seconds']:>8.2f} {result['departments_per_second']:>8.2f} "
+                      f"{result['pages_per_second']:>8.2f} {result['fetches_per_department']['mean']:>9.2f} "
+                      f"{result['llm_calls_per_department']:>9.2f} {result['found_ratio']:>6.1%} {result['reachable_ratio']:>6.1%} "
+                      f"{result['discovery_ratio']:>6.1%}")
+    llm.close()
+
+    output = args.output or os.path.join('results', 'benchmarks', f"crawl_scaling_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'settings': vars(args), 'runs': runs}, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""任务队列的多进程测试
+
+在本地合成网站（synthetic_site.py）上启动 N 个工作进程处理同一个 SQLite 任务队列，大模型使用 fake_ark.FakeAsyncArk：
+- 其中一个工作进程在租到任务后卡住，被主进程强制结束（模拟崩溃），其任务应在租约过期后由其他进程接手
+- 额外加入 --poison 个总是出错的任务，应在 max_attempts 次后标记为失败
+检查所有任务最终都处于 done 或 failed，打印各任务的尝试次数；检查不通过时退出码为 1。
+用法：python benchmarks/bench_work_queue.py [--workers 4] [--departments 40] [--visibility-timeout 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from work_queue import WorkQueue, run_worker  # noqa: E402
+
+from synthetic_site import SyntheticServer, SyntheticSite, sample_departments  # noqa: E402
+
+POISON = '故障注入'
+
+
+def worker(queue_path: str, owner: str, folder: str, host: str, args, hang: bool = False):
+    """工作进程：hang 为 True 时租到任务后一直卡住，等待被结束"""
+    from fake_ark import FakeAsyncArk
+    from gov_crawler import GovInfoCrawler
+    from llm_async import AsyncLLM
+    from resilience import endpoints
+
+    endpoints.settings[host] = {'max_concurrency': 4, 'min_interval': 0.0}
+    queue = WorkQueue(queue_path, args.visibility_timeout, args.max_attempts)
+    crawler = GovInfoCrawler('offline', 'bench', 50000, args.max_depth, '', [], os.path.join(folder, owner))
+    crawler.llm = AsyncLLM('offline', 'bench', client=FakeAsyncArk(args.llm_latency))
+    crawler.expand_content_with_selenium = crawler.get_content_request
+
+    def process(task):
+        if hang:
+            time.sleep(3600)
+        if task['department'].startswith(POISON):
+            raise RuntimeError('注入的错误')
+        with contextlib.redirect_stdout(io.StringIO()):
+            return len(crawler.process_department(task['url'], task['province'], task['department']))
+
+    try:
+        run_worker(queue, process, owner, poll_interval=0.2)
+    finally:
+        crawler.close()
+        queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='任务队列的多进程与崩溃恢复测试')
+    parser.add_argument('--workers', type=int, default=4, help='正常工作进程数（另有一个会被结束的进程）')
+    parser.add_argument('--departments', type=int, default=40, help='任务数')
+    parser.add_argument('--poison', type=int, default=2, help='总是出错的任务数')
+    parser.add_argument('--visibility-timeout', type=float, default=3.0)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--llm-latency', type=float, default=0.01)
+    args = parser.parse_args()
+
+    site = SyntheticSite(provinces=4, departments=50)
+    context = get_context('spawn')
+    with tempfile.TemporaryDirectory() as folder, SyntheticServer(site) as server:
+        queue_path = os.path.join(folder, 'queue.db')
+        queue = WorkQueue(queue_path, args.visibility_timeout, args.max_attempts)
+        tasks = [{'province': d['province'], 'department': d['name'], 'url': server.url.rstrip('/') + d['path']}
+                 for d in sample_departments(site, args.departments)]
+        tasks += [{'province': '测试', 'department': f"{POISON}{i}", 'url': server.url} for i in range(args.poison)]
+        queue.enqueue(tasks)
+        print(f"{len(tasks)} 个任务（其中 {args.poison} 个总是出错），{args.workers} 个工作进程 + 1 个会被结束的进程")
+
+        start = time.perf_counter()
+        # 先启动会卡住的进程，确保它租到任务后再启动其余进程
+        victim = context.Process(target=worker, args=(queue_path, 'victim', folder, server.host, args, True))
+        victim.start()
+        while not any(item['owner'] == 'victim' for item in queue.status()['leased']):
+            time.sleep(0.05)
+        victim_task = next(item['task'] for item in queue.status()['leased'] if item['owner'] == 'victim')
+        workers = [context.Process(target=worker, args=(queue_path, f"worker-{i}", folder, server.host, args))
+                   for i in range(args.workers)]
+        for process in workers:
+            process.start()
+        time.sleep(0.5)
+        victim.kill()
+        victim.join()
+        print(f"已结束 victim（持有任务 {victim_task}）")
+
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        rows = queue.conn.execute('SELECT province, department, state, attempts, owner FROM tasks').fetchall()
+        counts = queue.counts()
+        queue.close()
+
+    attempts = {f"{p}-{d}": (state, n, owner) for p, d, state, n, owner in rows}
+    victim_state, victim_attempts, victim_owner = attempts[victim_task]
+    print(f"耗时 {elapsed:.1f} 秒，{counts}")
+    print(f"victim 的任务：{victim_state}，共尝试 {victim_attempts} 次，最后由 {victim_owner} 处理")
+    for task, (state, n, _) in sorted(attempts.items()):
+        if task.split('-', 1)[1].startswith(POISON):
+            print(f"注入错误的任务 {task}：{state}，共尝试 {n} 次")
+
+    checks = {
+        '所有任务都已完成或失败': counts['pending'] == counts['leased'] == 0,
+        '正常任务全部完成': counts['done'] == args.departments,
+        '注入错误的任务全部失败': counts['failed'] == args.poison,
+        'victim 的任务由其他进程重新租用并完成': (
+            victim_state == 'done' and victim_attempts >= 2 and victim_owner != 'victim'),
+        '失败任务的尝试次数等于 max_attempts': all(
+            n == args.max_attempts for task, (state, n, _) in attempts.items()
+            if task.split('-', 1)[1].startswith(POISON)),
+    }
+    for name, ok in checks.items():
+        print(f"{'通过' if ok else '失败'}: {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
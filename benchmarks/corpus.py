@@ -0,0 +1,174 @@
+"""离线基准测试的页面语料
+
+gov/ 为一个部门的政府网站页面（首页、政务公开、领导信息页），baike/ 为对应领导的百度百科词条页面，
+manifest.json 记录页面URL、部门与人物。语料目录不存在时按固定随机种子生成，结果可重复；
+也可以把真实保存的页面放入目录并登记到 manifest.json，基准测试会原样使用。
+用法：python benchmarks/corpus.py --write benchmarks/corpus [--leaders 8] [--noise 400]
+"""
+import argparse
+import json
+import os
+import random
+import urllib.parse
+from typing import Dict, List, Optional
+
+
+SURNAMES = '王李张刘陈杨赵黄周吴徐孙胡朱高林何郭马罗梁宋郑谢韩唐冯于董萧程曹袁邓许傅沈曾彭吕'
+GIVEN = '建国志强海军红伟明华文春晓东平立新永宏国庆德林峰玉秀英丽敏杰斌刚勇军涛辉鹏飞'
+TITLES = ['党组书记 主任', '党组成员 副主任', '副主任', '党组成员 副主任', '二级巡视员', '总经济师']
+NEWS = ['关于印发', '工作方案的通知', '召开专题会议', '开展调研', '政策解读', '公示公告', '项目名单', '年度报告']
+
+BASE_URL = 'http://bench.gov.local/fgw/'
+PROVINCE = '内蒙古自治区'
+DEPARTMENT = '发展和改革委员会'
+
+
+def _noise(rng: random.Random, count: int) -> str:
+    """新闻列表、脚本与样式等与领导信息无关的内容"""
+    items = ''.join(
+        f"<li><a href='{BASE_URL}xwdt/{i}.html'>{rng.choice(NEWS)}{rng.choice(NEWS)}</a>"
+        f"<span class='date'>2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}</span></li>"
+        for i in range(count)
+    )
+    return (
+        "<script>var _hmt = _hmt || [];(function(){var hm=document.createElement('script');})();</script>"
+        "<style>.nav{float:left}.footer{clear:both}</style>"
+        f"<div class='news-list'><ul>{items}</ul></div>"
+        "<div class='footer'>主办单位 版权所有 网站标识码 备案号</div>"
+    )
+
+
+def _page(title: str, body: str) -> str:
+    return f"<html><head><meta charset='utf-8'><title>{title}</title></head><body>{body}</body></html>"
+
+
+def build_gov_pages(leaders: List[Dict], rng: random.Random, noise: int) -> Dict[str, str]:
+    """部门首页 -> 政务公开 -> 领导信息，领导信息页按 姓名/职务/简历 排列"""
+    nav = (
+        "<div class='nav'>"
+        f"<a href='{BASE_URL}xwdt/'>新闻动态</a><a href='{BASE_URL}tzgg/'>通知公告</a>"
+        f"<a href='{BASE_URL}zwgk/'>政务公开</a><a href='#'>无障碍</a>"
+        "</div>"
+    )
+    leader_items = ''.join(
+        f"<div class='leader'><p>姓名 {p['姓名']}</p><p>职务 {p['职务']}</p>"
+        f"<p>简历 {p['简历']}</p></div>"
+        for p in leaders
+    )
+    return {
+        BASE_URL: _page(DEPARTMENT, nav + _noise(rng, noise)),
+        f"{BASE_URL}zwgk/": _page('政务公开', nav + (
+            f"<div class='list'><a href='{BASE_URL}zfxxgk/fdzdgknr/jgxx/ldxx/'>领导信息</a>"
+            f"<a href='{BASE_URL}zfxxgk/fdzdgknr/jgxx/jgzn/'>机构职能</a></div>"
+        ) + _noise(rng, noise // 4)),
+        f"{BASE_URL}zfxxgk/fdzdgknr/jgxx/ldxx/": _page('领导信息', nav + leader_items + _noise(rng, noise)),
+        f"{BASE_URL}zfxxgk/fdzdgknr/jgxx/jgzn/": _page('机构职能', nav + _noise(rng, noise // 2)),
+    }
+
+
+def build_baike_page(person: Dict, start_year: int = 2010, end_year: int = 2024) -> str:
+    """与百科结构一致的词条页面，履历为“年.月—年.月 任XX”格式，现任职务写作“年.月— 任XX”（不写结束时间）"""
+    basic_info = ''.join(
+        f"<dt class='basicInfoItem_zB304 itemName_LS0Jv'>{name}</dt>"
+        f"<dd class='basicInfoItem_zB304 itemValue_AYbkR'><span class='text_H18Us'>{value}</span></dd>"
+        for name, value in [('中文名', person['姓名']), ('性别', '男'), ('民族', '汉族'),
+                            ('出生日期', '1968年3月'), ('籍贯', '河北唐山'), ('学历', '大学本科')]
+    )
+    titles = person['职务'].split()
+    career = []
+    for year in range(start_year, end_year + 1, 3):
+        current = year + 3 > end_year
+        title = '、'.join(titles) if current else '副处长'
+        end = '' if current else f"{year + 3}.02"
+        career.append(
+            f"<div class='para_fT72O'><span class='text_H18Us'>"
+            f"{year}.03—{end} 任{person['省份']}{person['部门']}{title}</span></div>"
+        )
+    return (
+        "<html><body>"
+        f"<div class='basicInfo_Dxt9K J-basic-info'><dl>{basic_info}</dl></div>"
+        "<div class='paraTitle_WslP_ level-1_Ep022'><h2>人物履历</h2></div>"
+        f"{''.join(career)}"
+        "<div class='paraTitle_WslP_ level-1_Ep022'><h2>人物评价</h2></div>"
+        "<div class='para_fT72O'><span class='text_H18Us'>工作扎实</span></div>"
+        "</body></html>"
+    )
+
+
+def baike_url(name: str) -> str:
+    return 'https://baike.baidu.com/item/' + urllib.parse.quote(name)
+
+
+class Corpus:
+    """gov_pages: URL -> HTML；baike_pages: 词条URL -> HTML；department: 部门首页与名称；persons: 输入行"""
+    def __init__(self, gov_pages: Dict[str, str], baike_pages: Dict[str, str], department: Dict,
+                 persons: List[Dict]):
+        self.gov_pages = gov_pages
+        self.baike_pages = baike_pages
+        self.department = department
+        self.persons = persons
+
+    @classmethod
+    def generate(cls, leaders: int = 8, noise: int = 400, seed: int = 42) -> 'Corpus':
+        rng = random.Random(seed)
+        names = set()
+        while len(names) < leaders:
+            names.add(rng.choice(SURNAMES) + ''.join(rng.sample(GIVEN, 2)))
+        persons = [
+            {'姓名': name, '职务': TITLES[i % len(TITLES)],
+             '简历': f"1968年3月生大学学历历任{PROVINCE}{DEPARTMENT}处长副主任",
+             '省份': PROVINCE, '部门': DEPARTMENT}
+            for i, name in enumerate(sorted(names))
+        ]
+        return cls(
+            gov_pages=build_gov_pages(persons, rng, noise),
+            baike_pages={baike_url(p['姓名']): build_baike_page(p) for p in persons},
+            department={'url': BASE_URL, 'province': PROVINCE, 'name': DEPARTMENT},
+            persons=persons,
+        )
+
+    @classmethod
+    def load(cls, folder: str) -> 'Corpus':
+        with open(os.path.join(folder, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        def read_pages(kind):
+            pages = {}
+            for url, filename in manifest[kind].items():
+                with open(os.path.join(folder, kind, filename), 'r', encoding='utf-8') as f:
+                    pages[url] = f.read()
+            return pages
+
+        return cls(read_pages('gov'), read_pages('baike'), manifest['department'], manifest['persons'])
+
+    def save(self, folder: str):
+        manifest = {'department': self.department, 'persons': self.persons}
+        for kind, pages in (('gov', self.gov_pages), ('baike', self.baike_pages)):
+            os.makedirs(os.path.join(folder, kind), exist_ok=True)
+            manifest[kind] = {}
+            for i, (url, html) in enumerate(sorted(pages.items())):
+                filename = f"{i:04d}.html"
+                with open(os.path.join(folder, kind, filename), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                manifest[kind][url] = filename
+        with open(os.path.join(folder, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def load_or_generate(folder: Optional[str] = None, **kwargs) -> Corpus:
+    if folder and os.path.exists(os.path.join(folder, 'manifest.json')):
+        return Corpus.load(folder)
+    return Corpus.generate(**kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成离线基准测试语料')
+    parser.add_argument('--write', required=True, help='语料目录')
+    parser.add_argument('--leaders', type=int, default=8)
+    parser.add_argument('--noise', type=int, default=400, help='每页新闻列表条数（页面大小）')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = Corpus.generate(args.leaders, args.noise, args.seed)
+    corpus.save(args.write)
+    print(f"已写入 {len(corpus.gov_pages)} 个政府网站页面、{len(corpus.baike_pages)} 个百科页面到 {args.write}")
@@ -0,0 +1,94 @@
+"""离线的 AsyncArk 替身
+
+接口与 AsyncArk 一致（client.chat.completions.create / close），按提示词的任务类型返回固定格式的JSON，
+可设置每次调用的延迟，用于在不访问模型的情况下测量爬虫自身的吞吐。
+通过 AsyncLLM(api_key, model, client=FakeAsyncArk()) 注入。
+"""
+import asyncio
+import json
+import re
+from collections import Counter
+from types import SimpleNamespace
+
+
+GOV_SECTION_KEYWORDS = ('zwgk', 'xxgk', 'zfxxgk', 'ldxx', 'jgxx')
+
+
+def _page_content(prompt: str) -> str:
+    """gov_crawler.build_prompt 生成的提示词中清洗后的网页内容"""
+    content = prompt.split('网页内容：', 1)[-1]
+    return content.rsplit('请仅返回JSON格式的结果', 1)[0]
+
+
+def section_links(prompt: str):
+    urls = re.findall(r'https?://[^\s<>"\']+', _page_content(prompt))
+    links = [url for url in dict.fromkeys(urls) if any(k in url for k in GOV_SECTION_KEYWORDS)]
+    return {f"板块{i + 1}": url for i, url in enumerate(links)}
+
+
+def leaders(prompt: str):
+    return [{'姓名': name, '职务': title, '简历': resume}
+            for name, title, resume in re.findall(r'姓名 (\S+) 职务 (.+?) 简历 (\S+)', _page_content(prompt))]
+
+
+def merged_people(prompt: str):
+    people = {}
+    for name, title, resume, province, department in re.findall(
+            r'姓名 (\S+) 职务 (.+?) 简历 (\S*) ?省份 (\S*) ?部门 (\S*)', _page_content(prompt)):
+        people.setdefault(name, {'姓名': name, '职务': title, '简历': resume, '省份': province, '部门': department})
+    return list(people.values())
+
+
+def level_titles(prompt: str):
+    titles = re.findall(r'^\s*- (.+?)\s*$', prompt.split('职务列表：', 1)[-1], flags=re.MULTILINE)
+    return {title: '正厅级' for title in titles}
+
+
+def batch_results(prompt: str):
+    return [{'id': f"P{i}", 'positions': []} for i in re.findall(r'【人物 P(\d+)】', prompt)]
+
+
+# (提示词中的标志文字, 任务名, 生成回复) 按顺序匹配，第一项命中即返回
+RESPONDERS = [
+    ('提取与政府机构、领导信息相关的链接', 'section_links', section_links),
+    ('识别并合并重复人员信息', 'merge_people', merged_people),
+    ('提取领导班子信息', 'leadership', leaders),
+    ('第二步：如果是同一个人', 'validate_extract', lambda p: {'match': True, 'positions': []}),
+    ('请判断以下百科内容是否描述的是同一个人', 'validate', lambda p: 'true'),
+    ('请判断以下每个职务的职级', 'classify_levels', level_titles),
+    ('位人物的履历文本中提取人物信息', 'extract_batch', batch_results),
+    ('请从以下履历文本中提取人物信息', 'extract', lambda p: {'positions': []}),
+]
+
+
+class FakeAsyncArk:
+    """按提示词返回固定JSON的 AsyncArk 替身
+    Args:
+        latency: 每次调用的模拟延迟（秒），不占用线程
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()  # 任务名 -> 调用次数
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def respond(self, prompt: str):
+        for marker, task, build in RESPONDERS:
+            if marker in prompt:
+                self.calls[task] += 1
+                return build(prompt)
+        self.calls['unknown'] += 1
+        return {}
+
+    async def create(self, model: str, messages, stream: bool = False, **kwargs):
+        prompt = messages[-1]['content']
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        result = self.respond(prompt)
+        content = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=len(prompt) // 2, completion_tokens=len(content) // 2),
+        )
+
+    async def close(self):
+        pass
@@ -0,0 +1,318 @@
+"""离线基准测试
+
+使用 corpus.py 的页面语料与 fake_ark.FakeAsyncArk，不访问网络与模型，测量：
+- ContentCleaner.clean_html_content 的清洗速度
+- process_large_content 的分块（split_content 与逐块生成提示词）
+- 百科词条的XPath提取（BaikePageParser.extract_lines / BaiduSpider.page_text）
+- ContentValidator 关键词验证（首次构建关键词与缓存命中两种情况）
+- 单个部门的端到端爬取（页面/秒）与百科补充阶段（人物/秒）
+结果写入JSON，--compare 与之前版本的结果逐项对比耗时。
+用法：python benchmarks/run_benchmarks.py [--corpus DIR] [--llm-latency 0.05] [--output FILE] [--compare OLD.json]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from lxml import etree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from baike_crawler import BaiduSpider, BaikePageParser, ContentValidator, DataProcessor, PersonInfo  # noqa: E402
+from gov_crawler import ContentCleaner, GovInfoCrawler  # noqa: E402
+from llm_async import AsyncLLM  # noqa: E402
+from metrics import metrics  # noqa: E402
+from resilience import endpoints  # noqa: E402
+
+from corpus import load_or_generate  # noqa: E402
+from fake_ark import FakeAsyncArk  # noqa: E402
+
+
+# 离线测试只衡量代码本身，去掉各端点的请求间隔
+endpoints.default = {'max_concurrency': 8}
+endpoints.settings['baike'] = {'max_concurrency': 8}
+
+LEADERSHIP_TASK = "提取领导班子信息"
+
+
+def timeit(func, repeat: int) -> dict:
+    """运行 repeat 次，返回最短与中位耗时（秒）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'best_seconds': round(min(times), 6), 'median_seconds': round(statistics.median(times), 6),
+            'repeat': repeat}
+
+
+def reset_metrics():
+    with metrics.lock:
+        metrics.counters.clear()
+        metrics.histograms.clear()
+
+
+def new_crawler(folder: str, chunk_size: int, max_depth: int, client: FakeAsyncArk) -> GovInfoCrawler:
+    crawler = GovInfoCrawler('offline', 'bench', chunk_size, max_depth, '', [], folder)
+    crawler.llm = AsyncLLM('offline', 'bench', client=client)
+    return crawler
+
+
+def bench_clean(corpus, repeat: int) -> dict:
+    pages = list(corpus.gov_pages.items())
+    size = sum(len(html.encode('utf-8')) for _, html in pages)
+
+    def run():
+        for url, html in pages:
+            ContentCleaner(url).clean_html_content(html)
+
+    result = timeit(run, repeat)
+    result.update(pages=len(pages), pages_per_second=round(len(pages) / result['best_seconds'], 2),
+                  mb_per_second=round(size / 1024 / 1024 / result['best_seconds'], 2))
+    return result
+
+
+def bench_chunking(corpus, args, crawler: GovInfoCrawler) -> dict:
+    """最大的页面重复拼接到约 4 个分块大小，保证会被切分"""
+    url, page = max(corpus.gov_pages.items(), key=lambda item: len(item[1]))
+    html = page * (args.chunk_size * 4 // len(page) + 1)
+    chunks = crawler.split_content(html, args.chunk_size)
+    split = timeit(lambda: crawler.split_content(html, args.chunk_size), args.repeat)
+    prompts = timeit(lambda: crawler._chunk_prompts(html, LEADERSHIP_TASK, args.chunk_size, url), args.repeat)
+    return {
+        'split': {**split, 'page_chars': len(html), 'chunks': len(chunks)},
+        'chunk_prompts': {**prompts, 'chunks': len(chunks)},
+    }
+
+
+def bench_baike_xpath(corpus, repeat: int) -> dict:
+    docs = [etree.HTML(html) for html in corpus.baike_pages.values()]
+    extract = timeit(lambda: [BaikePageParser.extract_lines(doc) for doc in docs], repeat)
+    text = timeit(lambda: [BaiduSpider.page_text(doc) for doc in docs], repeat)
+    for result in (extract, text):
+        result.update(pages=len(docs), pages_per_second=round(len(docs) / result['best_seconds'], 2))
+    return {'extract_lines': extract, 'page_text': text}
+
+
+def bench_validator(corpus, repeat: int) -> dict:
+    persons = [PersonInfo.from_row(row) for row in corpus.persons]
+    texts = [BaiduSpider.page_text(etree.HTML(html)) for html in corpus.baike_pages.values()]
+    pairs = [(text, person) for person in persons for text in texts]
+
+    def run(validator):
+        for text, person in pairs:
+            validator.validate_by_keywords(text, person)
+
+    # 首次：每轮新建验证器，包含关键词切分与自动机构建
+    cold = timeit(lambda: run(ContentValidator()), repeat)
+    warm_validator = ContentValidator()
+    run(warm_validator)
+    warm = timeit(lambda: run(warm_validator), repeat)
+    for result in (cold, warm):
+        result.update(checks=len(pairs), checks_per_second=round(len(pairs) / result['best_seconds'], 2))
+    return {'cold': cold, 'warm': warm}
+
+
+def gov_session_get(corpus):
+    """替换 requests.Session.get，从语料返回页面"""
+    def get(session, url, **kwargs):
+        html = corpus.gov_pages.get(url)
+        if html is None:
+            return SimpleNamespace(status_code=404, content=b'')
+        return SimpleNamespace(status_code=200, content=html.encode('utf-8'))
+    return get
+
+
+def bench_department(corpus, args) -> dict:
+    """单个部门从首页到合并结果的完整流程"""
+    department = corpus.department
+    client = FakeAsyncArk(args.llm_latency)
+    times, pages, leaders = [], 0, 0
+    for _ in range(args.e2e_repeat):
+        reset_metrics()
+        with tempfile.TemporaryDirectory() as folder:
+            crawler = new_crawler(folder, args.chunk_size, args.max_depth, client)
+            with mock.patch.object(requests.Session, 'get', gov_session_get(corpus)), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results = crawler.process_department(department['url'], department['province'], department['name'])
+                times.append(time.perf_counter() - start)
+                crawler.close_stores()
+        pages = sum(value for (name, _), value in metrics.counters.items() if name == 'pages_visited')
+        leaders = len(results)
+    best = min(times)
+    return {
+        'best_seconds': round(best, 6), 'median_seconds': round(statistics.median(times), 6),
+        'repeat': args.e2e_repeat, 'pages': pages, 'leaders': leaders,
+        'pages_per_second': round(pages / best, 2),
+        'llm_calls': dict(client.calls), 'stages': metrics.summary()['stages'],
+    }
+
+
+class CorpusOpener:
+    """替代代理 opener，从语料返回百科页面"""
+    def __init__(self, pages):
+        self.pages = pages
+
+    def open(self, request, timeout=None):
+        html = self.pages.get(request.full_url)
+        if html is None:
+            raise urllib.error.HTTPError(request.full_url, 404, 'Not Found', None, None)
+        return io.BytesIO(html.encode('utf-8'))
+
+
+def bench_baike_stage(corpus, args) -> dict:
+    """百科补充阶段：读取输入、查询词条、验证、规则解析与职级判断、写入结果"""
+    client = FakeAsyncArk(args.llm_latency)
+    opener = CorpusOpener(corpus.baike_pages)
+    fields = list(corpus.persons[0].keys())
+    cwd = os.getcwd()
+    times = []
+
+    def use_corpus(spider):
+        spider.opener = opener
+
+    for _ in range(args.e2e_repeat):
+        reset_metrics()
+        with tempfile.TemporaryDirectory() as folder:
+            # Config 中的路径均为相对路径，切换目录后全部落在临时目录
+            os.chdir(folder)
+            try:
+                os.makedirs('results', exist_ok=True)
+                with open('input.csv', 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writeheader()
+                    writer.writerows(corpus.persons)
+                with mock.patch.object(BaiduSpider, 'update_proxy', use_corpus), \
+                        contextlib.redirect_stdout(io.StringIO()):
+                    processor = DataProcessor()
+                    processor.gpt.llm = AsyncLLM('offline', 'bench', client=client)
+                    start = time.perf_counter()
+                    processor.process_file('input.csv')
+                    times.append(time.perf_counter() - start)
+                    processor.store.close()
+                    processor.searcher.cache.conn.close()
+            finally:
+                os.chdir(cwd)
+    persons = len(corpus.persons)
+    best = min(times)
+    sources = {dict(labels).get('source'): value for (name, labels), value in metrics.counters.items()
+               if name == 'persons'}
+    return {
+        'best_seconds': round(best, 6), 'median_seconds': round(statistics.median(times), 6),
+        'repeat': args.e2e_repeat, 'persons': persons, 'persons_per_second': round(persons / best, 2),
+        'sources': sources, 'llm_calls': dict(client.calls), 'stages': metrics.summary()['stages'],
+    }
+
+
+def git_revision() -> dict:
+    def git(*command):
+        return subprocess.run(['git', *command], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    try:
+        return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '-uno'))}
+    except OSError:
+        return {'commit': '', 'dirty': False}
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    """嵌套结果展开为 名称 -> 结果，名称以 / 分隔"""
+    flat = {}
+    for name, value in results.items():
+        if isinstance(value, dict) and 'best_seconds' not in value:
+            flat.update(flatten(value, f"{prefix}{name}/"))
+        elif isinstance(value, dict):
+            flat[prefix + name] = value
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float) -> bool:
+    """逐项比较最短耗时，打印新/旧比值；超过阈值视为退化，返回是否有退化"""
+    old_results, new_results = flatten(old['results']), flatten(new['results'])
+    print(f"\n与 {old.get('git', {}).get('commit') or '旧结果'} 对比（比值 = 新耗时 / 旧耗时）")
+    print(f"{'基准':<28} {'旧(ms)':>10} {'新(ms)':>10} {'比值':>8}")
+    regressed = False
+    for name, result in new_results.items():
+        if name not in old_results:
+            continue
+        before, after = old_results[name]['best_seconds'], result['best_seconds']
+        ratio = after / before if before else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag, regressed = '  退化', True
+        print(f"{name:<28} {before * 1000:>10.2f} {after * 1000:>10.2f} {ratio:>8.2f}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线基准测试')
+    parser.add_argument('--corpus', default=None, help='语料目录（含 manifest.json），默认按固定种子生成')
+    parser.add_argument('--leaders', type=int, default=8, help='生成语料时的领导人数')
+    parser.add_argument('--noise', type=int, default=400, help='生成语料时每页的新闻条数')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='模拟的大模型单次调用延迟（秒）')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--max-depth', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5, help='单项基准的重复次数')
+    parser.add_argument('--e2e-repeat', type=int, default=3, help='端到端基准的重复次数')
+    parser.add_argument('--output', default=None, help='结果JSON路径，默认 results/benchmarks/<时间>_<提交>.json')
+    parser.add_argument('--compare', default=None, help='与之前的结果JSON对比')
+    parser.add_argument('--threshold', type=float, default=1.10, help='新/旧耗时超过该比值视为退化')
+    args = parser.parse_args()
+
+    corpus = load_or_generate(args.corpus, leaders=args.leaders, noise=args.noise)
+    with tempfile.TemporaryDirectory() as folder:
+        crawler = new_crawler(folder, args.chunk_size, args.max_depth, FakeAsyncArk())
+        results = {}
+        for name, run in [
+            ('clean_html', lambda: bench_clean(corpus, args.repeat)),
+            ('chunking', lambda: bench_chunking(corpus, args, crawler)),
+            ('baike_xpath', lambda: bench_baike_xpath(corpus, args.repeat)),
+            ('validator', lambda: bench_validator(corpus, args.repeat)),
+            ('gov_department', lambda: bench_department(corpus, args)),
+            ('baike_stage', lambda: bench_baike_stage(corpus, args)),
+        ]:
+            print(f"运行 {name}...")
+            results[name] = run()
+
+    revision = git_revision()
+    report = {
+        'schema': 1,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results,
+    }
+
+    for name, result in flatten(results).items():
+        rate = next((f"{v} {k}" for k, v in result.items() if k.endswith('_per_second')), '')
+        print(f"{name:<28} {result['best_seconds'] * 1000:>10.2f} ms  {rate}")
+
+    output = args.output or os.path.join(
+        'results', 'benchmarks', f"{time.strftime('%Y%m%d-%H%M%S')}_{revision['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"基准测试结果已保存到 {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            if compare(json.load(f), report, args.threshold):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
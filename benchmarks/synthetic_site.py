@@ -0,0 +1,279 @@
+"""合成的政府网站，用于爬取调度的压力测试
+
+全国索引 -> 省级门户 -> 部门网站；每个部门网站有导航、新闻列表与“政务公开 -> 政府信息公开 -> 法定主动公开内容 ->
+机构信息 -> 领导信息”的信息公开目录，领导信息页所在的层级按部门随机（0 为首页），部分部门超出常用的递归深度。
+页面按 (种子, 省份, 部门) 即时生成，数千个部门也不占内存。
+部分部门另有常见的领导信息短路径 ldxx/，其中一部分列在 /sitemap.xml 中（robots.txt 声明），用于测试发现阶段。
+由本地 ThreadingHTTPServer 提供，可注入延迟与错误（503/500）。
+用法：python benchmarks/synthetic_site.py --provinces 31 --departments 100 --latency 0.05 --error-rate 0.02
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+
+PROVINCES = ['北京', '天津', '河北', '山西', '内蒙古', '辽宁', '吉林', '黑龙江', '上海', '江苏', '浙江', '安徽',
+             '福建', '江西', '山东', '河南', '湖北', '湖南', '广东', '广西', '海南', '重庆', '四川', '贵州',
+             '云南', '西藏', '陕西', '甘肃', '青海', '宁夏', '新疆']
+DEPARTMENTS = ['发展和改革委员会', '教育厅', '科学技术厅', '工业和信息化厅', '公安厅', '民政厅', '司法厅', '财政厅',
+               '人力资源和社会保障厅', '自然资源厅', '生态环境厅', '住房和城乡建设厅', '交通运输厅', '水利厅',
+               '农业农村厅', '商务厅', '文化和旅游厅', '卫生健康委员会', '退役军人事务厅', '应急管理厅', '审计厅',
+               '市场监督管理局', '统计局', '医疗保障局', '林业和草原局', '体育局', '地方金融监督管理局', '能源局']
+SURNAMES = '王李张刘陈杨赵黄周吴徐孙胡朱高林何郭马罗梁宋郑谢韩唐冯于董萧程曹袁邓许傅沈曾彭吕'
+GIVEN = '建国志强海军红伟明华文春晓东平立新永宏国庆德林峰玉秀英丽敏杰斌刚勇军涛辉鹏飞'
+TITLES = ['党组书记 厅长', '党组成员 副厅长', '副厅长', '党组成员 副厅长', '二级巡视员', '总工程师']
+NEWS = ['关于印发', '工作方案的通知', '召开专题会议', '开展调研', '政策解读', '公示公告', '项目名单', '年度报告']
+
+# 领导信息短路径（discovery.PROBE_PATHS 之一）
+SHORTCUT_PATH = 'ldxx/'
+SHORTCUTS = ['sitemap', 'path', None]
+
+# 信息公开目录：(路径, 链接文字)，领导信息页位于第 depth 层
+DISCLOSURE_PATH = [
+    ('zwgk/', '政务公开'),
+    ('zwgk/zfxxgk/', '政府信息公开'),
+    ('zwgk/zfxxgk/fdzdgknr/', '法定主动公开内容'),
+    ('zwgk/zfxxgk/fdzdgknr/jgxx/', '机构信息'),
+    ('zwgk/zfxxgk/fdzdgknr/jgxx/ldxx/', '领导信息'),
+]
+
+
+class SyntheticSite:
+    """按种子确定生成的网站结构
+    Args:
+        depth_weights: 领导信息位于第 0..5 层的相对概率
+        shortcut_weights: 部门有 ldxx/ 短路径且列入 sitemap、只有短路径、都没有的相对概率
+    """
+    def __init__(self, provinces: int = 31, departments: int = 100, seed: int = 42, noise: int = 200,
+                 depth_weights=(1, 2, 3, 3, 2, 1), shortcut_weights=(1, 1, 2)):
+        self.provinces = PROVINCES[:provinces]
+        self.departments_per_province = departments
+        self.seed = seed
+        self.noise = noise
+        self.depth_weights = depth_weights
+        self.shortcut_weights = shortcut_weights
+
+    @staticmethod
+    def department_name(index: int) -> str:
+        name = DEPARTMENTS[index % len(DEPARTMENTS)]
+        return name if index < len(DEPARTMENTS) else f"{name}第{index // len(DEPARTMENTS) + 1}分局"
+
+    def department(self, p: int, d: int) -> Dict:
+        rng = random.Random(f"{self.seed}-{p}-{d}")
+        count = rng.randint(2, 8)
+        names = set()
+        while len(names) < count:
+            names.add(rng.choice(SURNAMES) + ''.join(rng.sample(GIVEN, 2)))
+        return {
+            'province': self.provinces[p],
+            'name': self.department_name(d),
+            'path': f"/p{p}/d{d}/",
+            'depth': rng.choices(range(len(self.depth_weights)), weights=self.depth_weights)[0],
+            'leaders': [{'姓名': name, '职务': TITLES[i % len(TITLES)],
+                         '简历': f"1970年生大学学历历任{self.provinces[p]}{self.department_name(d)}处长副厅长"}
+                        for i, name in enumerate(sorted(names))],
+            'shortcut': rng.choices(SHORTCUTS, weights=self.shortcut_weights)[0],
+        }
+
+    def iter_departments(self) -> Iterator[Dict]:
+        for p in range(len(self.provinces)):
+            for d in range(self.departments_per_province):
+                yield self.department(p, d)
+
+    def _noise(self, rng: random.Random, base: str, count: int) -> str:
+        items = ''.join(
+            f"<li><a href='{base}xwdt/{i}.html'>{rng.choice(NEWS)}{rng.choice(NEWS)}</a>"
+            f"<span class='date'>2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}</span></li>"
+            for i in range(count)
+        )
+        return (
+            "<script>var _hmt = _hmt || [];</script><style>.nav{float:left}</style>"
+            f"<div class='news-list'><ul>{items}</ul></div><div class='footer'>主办单位 版权所有</div>"
+        )
+
+    @staticmethod
+    def _page(title: str, body: str) -> str:
+        return f"<html><head><meta charset='utf-8'><title>{title}</title></head><body>{body}</body></html>"
+
+    def sitemap(self, root: str) -> str:
+        urls = ''.join(f"<url><loc>{root}{d['path']}{SHORTCUT_PATH}</loc></url>"
+                       for d in self.iter_departments() if d['shortcut'] == 'sitemap')
+        return (f"<?xml version='1.0' encoding='UTF-8'?>"
+                f"<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>{urls}</urlset>")
+
+    def page(self, path: str, host: str) -> Optional[str]:
+        """返回路径对应的页面，不存在时返回 None；链接为带 host 的绝对地址"""
+        root = f"http://{host}"
+        parts = path.strip('/').split('/')
+        if path == '/':
+            links = ''.join(f"<li><a href='{root}/p{p}/'>{name}</a></li>" for p, name in enumerate(self.provinces))
+            return self._page('地方政府网站', f"<ul class='provinces'>{links}</ul>")
+        if path == '/robots.txt':
+            return f"User-agent: *\nDisallow: /admin/\nSitemap: {root}/sitemap.xml\n"
+        if path == '/sitemap.xml':
+            return self.sitemap(root)
+
+        try:
+            p = int(parts[0][1:])
+            if not parts[0].startswith('p') or not 0 <= p < len(self.provinces):
+                return None
+            if len(parts) == 1:
+                links = ''.join(f"<li><a href='{root}/p{p}/d{d}/'>{self.department_name(d)}</a></li>"
+                                for d in range(self.departments_per_province))
+                return self._page(f"{self.provinces[p]}人民政府", f"<ul class='departments'>{links}</ul>")
+            d = int(parts[1][1:])
+            if not parts[1].startswith('d') or not 0 <= d < self.departments_per_province:
+                return None
+        except ValueError:
+            return None
+
+        department = self.department(p, d)
+        base = f"{root}{department['path']}"
+        sub = '/'.join(parts[2:]) + '/' if len(parts) > 2 else ''
+        rng = random.Random(f"{self.seed}-{p}-{d}-{sub}")
+        nav = (
+            f"<div class='nav'><a href='{base}'>首页</a><a href='{base}xwdt/'>新闻动态</a>"
+            f"<a href='{base}tzgg/'>通知公告</a><a href='{base}{DISCLOSURE_PATH[0][0]}'>政务公开</a>"
+            f"<a href='{base}hdjl/'>互动交流</a><a href='#'>无障碍</a></div>"
+        )
+        leaders = ''.join(
+            f"<div class='leader'><p>姓名 {item['姓名']}</p><p>职务 {item['职务']}</p><p>简历 {item['简历']}</p></div>"
+            for item in department['leaders']
+        )
+
+        if sub == SHORTCUT_PATH:
+            if department['shortcut'] is None:
+                return None
+            return self._page(f"{department['name']}领导信息", nav + leaders)
+        if sub == '':
+            level = 0
+        else:
+            level = next((i + 1 for i, (path_part, _) in enumerate(DISCLOSURE_PATH) if path_part == sub), None)
+            if level is None:
+                # 新闻、通知等栏目：只有列表
+                if sub.split('/')[0] in ('xwdt', 'tzgg', 'hdjl') or sub.endswith('jgzn/'):
+                    return self._page(department['name'], nav + self._noise(rng, base, self.noise // 2))
+                return None
+
+        body = nav
+        if level < len(DISCLOSURE_PATH):
+            next_path, next_title = DISCLOSURE_PATH[level]
+            body += f"<div class='list'><a href='{base}{next_path}'>{next_title}</a>"
+            if level == 4:
+                body += f"<a href='{base}{DISCLOSURE_PATH[3][0]}jgzn/'>机构职能</a>"
+            body += "</div>"
+        if level == department['depth']:
+            body += leaders
+        return self._page(department['name'], body + self._noise(rng, base, self.noise))
+
+
+class SyntheticServer:
+    """本地HTTP服务，可注入延迟与错误
+    Args:
+        latency: 平均响应延迟（秒），实际延迟在 0.5~1.5 倍之间均匀分布
+        error_rate: 返回错误的概率，其中一半为 503（限流），一半为 500
+    """
+    def __init__(self, site: SyntheticSite, latency: float = 0.0, error_rate: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0, seed: int = 0):
+        self.site = site
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = Counter()  # 部门路径 -> 请求数
+        self.status = Counter()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}/"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    roll = server.rng.random()
+                    delay = server.latency * server.rng.uniform(0.5, 1.5)
+                    parts = self.path.strip('/').split('/')
+                    server.requests['/'.join(parts[:2])] += 1
+                if delay:
+                    time.sleep(delay)
+                if roll < server.error_rate:
+                    status, html = (503 if roll < server.error_rate / 2 else 500), '<html>error</html>'
+                else:
+                    html = server.site.page(self.path, self.headers.get('Host') or server.host)
+                    status = 200 if html is not None else 404
+                    html = html or '<html>not found</html>'
+                with server.lock:
+                    server.status[status] += 1
+                body = html.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'SyntheticServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='synthetic-site', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests.clear()
+            self.status.clear()
+
+    def department_requests(self, department: Dict) -> int:
+        return self.requests[department['path'].strip('/')]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def sample_departments(site: SyntheticSite, count: int, seed: int = 0) -> List[Dict]:
+    departments = list(site.iter_departments())
+    return random.Random(seed).sample(departments, min(count, len(departments)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='启动合成政府网站')
+    parser.add_argument('--provinces', type=int, default=31)
+    parser.add_argument('--departments', type=int, default=100, help='每个省的部门数')
+    parser.add_argument('--noise', type=int, default=200, help='每页新闻条数')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    site = SyntheticSite(args.provinces, args.departments, noise=args.noise)
+    server = SyntheticServer(site, args.latency, args.error_rate, port=args.port)
+    print(f"合成网站: {server.url}（{len(site.provinces) * site.departments_per_province} 个部门）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+
+
+class CassetteMissError(Exception):
+    """回放模式下请求没有对应的录制记录"""
+
+
+class Cassette:
+    """外部请求的录制与回放
+    - record：照常请求，同时把响应（政府网站页面、Selenium展开后的页面、百科页面、博查结果、大模型回复）
+      以 zlib 压缩写入 SQLite，主键为 (类型, 键)，同一请求重复录制时保留最新一次
+    - replay：直接返回录制的响应，不发出任何网络请求；没有记录时抛出 CassetteMissError
+    - off：不做任何处理（默认）
+    请求失败（返回 None）也会录制，回放时同样返回 None，结果与录制时一致
+    record / replay 时结果文件与本地状态（职级缓存、搜索缓存、数据接口模板、结果查重）通过 state_path 改到
+    录制文件旁的 {录制文件}.{模式} 目录，并在本进程首次使用时清空，回放与录制从相同的初始状态开始
+    """
+    MODES = ('off', 'record', 'replay')
+
+    def __init__(self):
+        self.mode = 'off'
+        self.path = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+        self._cleared = set()  # 本进程已清空过的状态路径
+
+    def open(self, path: str, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f"未知的录制模式: {mode}")
+        self.close()
+        self.mode, self.path = mode, path
+        if mode == 'off':
+            return
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS cassette ('
+                'kind TEXT, key TEXT, body BLOB, created REAL, PRIMARY KEY (kind, key)) WITHOUT ROWID'
+            )
+        os.makedirs(self.state_dir, exist_ok=True)
+        print(f"{'录制' if mode == 'record' else '回放'}外部请求: {path}，结果与本地状态写入 {self.state_dir}")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    @property
+    def state_dir(self) -> Optional[str]:
+        """本次录制/回放的结果与本地状态目录，off 时为 None"""
+        return None if self.mode == 'off' else f"{self.path}.{self.mode}"
+
+    def state_path(self, path: str) -> str:
+        """record / replay 时把结果或本地状态文件（或目录）改到 state_dir 下（保留名称），本进程首次使用时清空；
+        off 时原样返回
+        """
+        if self.mode == 'off':
+            return path
+        target = os.path.join(self.state_dir, os.path.basename(os.path.normpath(path)))
+        with self.lock:
+            if target not in self._cleared:
+                self._cleared.add(target)
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                for name in (target, target + '-wal', target + '-shm'):
+                    if os.path.isfile(name):
+                        os.remove(name)
+        return target
+
+    def get(self, kind: str, key: str) -> Optional[bytes]:
+        """返回录制的响应；录制的是失败（None）时返回 None，没有记录时抛出 CassetteMissError"""
+        with self.lock:
+            row = self.conn.execute('SELECT body FROM cassette WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if row is None:
+                self.stats['missed'] += 1
+                raise CassetteMissError(f"没有录制的 {kind} 响应: {key}")
+            self.stats['replayed'] += 1
+        return None if row[0] is None else zlib.decompress(row[0])
+
+    def put(self, kind: str, key: str, data: Optional[bytes]):
+        body = None if data is None else zlib.compress(data, 6)
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO cassette VALUES (?, ?, ?, ?)', (kind, key, body, time.time()))
+            self.stats['recorded'] += 1
+
+    def through(self, kind: str, key: str, func: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+        """回放模式返回录制的响应，否则调用 func 发出请求，录制模式下同时保存结果；func 抛出的异常不录制"""
+        if self.mode == 'replay':
+            return self.get(kind, key)
+        data = func()
+        if self.mode == 'record':
+            self.put(kind, key, data)
+        return data
+
+    async def through_async(self, kind: str, key: str, func: Callable) -> Optional[bytes]:
+        """through 的协程版本：func 返回 awaitable"""
+        if self.mode == 'replay':
+            return self.get(kind, key)
+        data = await func()
+        if self.mode == 'record':
+            self.put(kind, key, data)
+        return data
+
+    def through_text(self, kind: str, key: str, func: Callable[[], Optional[str]]) -> Optional[str]:
+        data = self.through(kind, key, lambda: _encode(func()))
+        return None if data is None else data.decode('utf-8')
+
+    def through_json(self, kind: str, key: str, func: Callable):
+        data = self.through(kind, key, lambda: json.dumps(func(), ensure_ascii=False).encode('utf-8'))
+        return json.loads(data)
+
+    def summary(self):
+        """各类型的记录数与压缩后大小"""
+        rows = self.conn.execute(
+            'SELECT kind, COUNT(*), SUM(LENGTH(body)) FROM cassette GROUP BY kind ORDER BY kind'
+        ).fetchall()
+        return {kind: {'records': count, 'bytes': size or 0} for kind, count, size in rows}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.mode = 'off'
+
+
+def _encode(text: Optional[str]) -> Optional[bytes]:
+    return None if text is None else text.encode('utf-8')
+
+
+def add_cassette_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', metavar='PATH', default=None, help='录制所有外部请求的响应到该文件')
+    group.add_argument('--replay', metavar='PATH', default=None, help='从录制文件回放，不访问网络与大模型')
+
+
+def open_from_args(args):
+    if args.record:
+        cassette.open(args.record, 'record')
+    elif args.replay:
+        cassette.open(args.replay, 'replay')
+
+
+# 进程内共享的录制器
+cassette = Cassette()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='查看录制文件')
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    cassette.open(args.path, 'replay')
+    for kind, info in cassette.summary().items():
+        print(f"{kind:<10} {info['records']:>8} 条 {info['bytes'] / 1024 / 1024:>10.2f} MB")
+    cassette.close()
@@ -0,0 +1,13 @@
+# 爬虫与统计分析共用的词表，不依赖任何第三方库
+
+# 省级行政区（含新疆生产建设兵团）
+PROVINCES = [
+    '北京', '天津', '河北', '山西', '内蒙古', '辽宁', '吉林', '黑龙江', '上海', '江苏', '浙江',
+    '安徽', '福建', '江西', '山东', '河南', '湖北', '湖南', '广东', '广西', '海南', '重庆',
+    '四川', '贵州', '云南', '西藏', '陕西', '甘肃', '青海', '宁夏', '新疆', '香港', '澳门', '台湾',
+    '新疆生产建设兵团'
+]
+
+# 职级从高到低，下标即职级编码
+LEVELS = ['正国级', '副国级', '正部级', '副部级', '正厅级', '副厅级',
+          '正处级', '副处级', '正科级', '副科级', '科员级', '办事员级']
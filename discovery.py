@@ -0,0 +1,186 @@
+import gzip
+import html
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import chardet
+
+from metrics import metrics
+
+
+class LeadershipDiscovery:
+    """在调用大模型逐页查找链接之前，直接定位部门的领导信息页
+    1. robots.txt：读取 Sitemap 声明，探测时遵守 Disallow
+    2. sitemap：挑选路径中带领导信息关键词（ldxx、ldzc 等）的URL
+    3. 按政府信息公开目录的常见路径探测，如 zfxxgk/fdzdgknr/jgxx/ldxx/
+    候选页的内容至少包含“领导”“职务”“简历”等字样中的两种才算命中（排除返回首页或空模板的伪404）。
+    命中的路径（包括 sitemap 命中页相对部门首页的路径）在后续部门中优先探测（同一省份的部门网站多用同一套模板）。
+    同一域名连续 max_host_misses 次探测都未命中且从未命中过时，不再对该域名探测。
+    """
+    # 领导信息页常见的路径片段
+    LEADERSHIP_PATTERN = re.compile(r'/(ldxx|ldzc|ldbz|ldjj|ldfg|ldzz|lingdao|leader)', re.I)
+    # 相对部门首页（以及域名根目录）探测的路径，按常见程度排序
+    PROBE_PATHS = [
+        'zfxxgk/fdzdgknr/jgxx/ldxx/',
+        'zwgk/zfxxgk/fdzdgknr/jgxx/ldxx/',
+        'xxgk/fdzdgknr/jgxx/ldxx/',
+        'zfxxgk/fdzdgknr/ldxx/',
+        'zwgk/jgxx/ldxx/',
+        'zwgk/ldxx/',
+        'xxgk/ldxx/',
+        'jgxx/ldxx/',
+        'ldxx/',
+        'ldzc/',
+    ]
+    PAGE_KEYWORDS = ('领导', '职务', '简历', '分工', '姓名', '出生', '籍贯', '学历')
+    USER_AGENT = 'Mozilla/5.0'
+
+    def __init__(self, fetch: Callable[[str], Optional[bytes]], max_probes: int = 3, max_sitemaps: int = 5,
+                 max_candidates: int = 3, max_host_misses: int = 3):
+        """
+        Args:
+            fetch: url -> 原始响应内容，状态码不是200或请求失败时返回 None
+        """
+        self.fetch = fetch
+        self.max_probes = max_probes
+        self.max_sitemaps = max_sitemaps
+        self.max_candidates = max_candidates
+        self.max_host_misses = max_host_misses
+        self.hosts = {}  # scheme://host -> (RobotFileParser, sitemap中的候选URL)
+        self.host_probes = {}  # scheme://host -> [命中次数, 连续未命中次数]
+        self.path_hits = Counter()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def decode(body: bytes) -> str:
+        if body[:2] == b'\x1f\x8b':
+            body = gzip.decompress(body)
+        charset = chardet.detect(body[:4096])['encoding'] or 'utf-8'
+        return body.decode(charset, errors='replace')
+
+    def is_leadership_page(self, body: Optional[bytes]) -> bool:
+        if not body:
+            return False
+        text = self.decode(body)
+        title = re.search(r'<title[^>]*>(.*?)</title>', text, re.S | re.I)
+        if title and any(word in title.group(1) for word in ('404', '错误', '不存在')):
+            return False
+        text = re.sub(r'<[^>]+>', '', text)
+        return sum(keyword in text for keyword in self.PAGE_KEYWORDS) >= 2
+
+    def read_sitemaps(self, sitemap_urls: List[str]) -> List[str]:
+        """读取 sitemap（含 sitemap 索引与 .gz），返回其中所有页面URL"""
+        pages, queue, seen = [], list(sitemap_urls), set()
+        while queue and len(seen) < self.max_sitemaps:
+            url = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            body = self.fetch(url)
+            if not body:
+                continue
+            text = self.decode(body)
+            locations = [html.unescape(loc) for loc in re.findall(r'<loc>\s*(.*?)\s*</loc>', text, re.S)]
+            if '<sitemapindex' in text:
+                # 索引中优先读取名字与信息公开相关的子 sitemap
+                queue.extend(sorted(locations, key=lambda loc: not re.search(r'xxgk|zwgk|ld', loc)))
+            else:
+                pages.extend(locations)
+        return pages
+
+    @staticmethod
+    def root(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    @staticmethod
+    def base(department_url: str) -> str:
+        return department_url if department_url.endswith('/') else department_url.rsplit('/', 1)[0] + '/'
+
+    def host_info(self, url: str) -> Tuple[RobotFileParser, List[str]]:
+        """每个域名只读取一次 robots.txt 与 sitemap"""
+        root = self.root(url)
+        with self.lock:
+            if root in self.hosts:
+                return self.hosts[root]
+        robots = RobotFileParser(root + '/robots.txt')
+        body = self.fetch(root + '/robots.txt')
+        robots.parse(self.decode(body).splitlines() if body else [])
+        sitemap_urls = robots.site_maps() or [root + '/sitemap.xml']
+        candidates = [page for page in self.read_sitemaps(sitemap_urls)
+                      if self.LEADERSHIP_PATTERN.search(urlparse(page).path)]
+        with self.lock:
+            self.hosts[root] = (robots, candidates)
+        return robots, candidates
+
+    def probe_urls(self, department_url: str) -> List[Tuple[str, str]]:
+        """(路径, URL)：先相对部门首页，再相对域名根目录；此前命中过的路径排在前面"""
+        bases = [self.base(department_url)]
+        if urlparse(department_url).path.strip('/'):
+            bases.append(self.root(department_url) + '/')
+        with self.lock:
+            paths = self.PROBE_PATHS + [path for path in self.path_hits if path not in self.PROBE_PATHS]
+            paths = sorted(paths, key=lambda path: -self.path_hits[path])
+        return [(path, urljoin(b, path)) for path in paths for b in bases]
+
+    def record_hit(self, path: str):
+        with self.lock:
+            self.path_hits[path] += 1
+
+    def discover(self, department_url: str) -> List[Tuple[str, bytes]]:
+        """返回确认包含领导信息的页面 [(URL, 原始内容)]，未发现时返回空列表"""
+        with metrics.timer('discovery', detail=department_url):
+            robots, candidates = self.host_info(department_url)
+            # 以 / 结尾，避免 /fgw 误匹配 /fgwxx 下的页面
+            prefix = department_url.rsplit('/', 1)[0].rstrip('/') + '/' if urlparse(department_url).path.strip('/') else ''
+            found = []
+
+            # sitemap 中同一部门路径下的候选页
+            base = self.base(department_url)
+            for url in [url for url in candidates if url.startswith(prefix)][:self.max_candidates]:
+                body = self.fetch(url)
+                if self.is_leadership_page(body):
+                    found.append((url, body))
+                    if url.startswith(base) and url != base:
+                        self.record_hit(url[len(base):])
+            if found:
+                metrics.inc('discovery', result='sitemap')
+                return found
+
+            # 该域名多次探测都未命中（不使用这类目录结构），不再探测
+            root = self.root(department_url)
+            with self.lock:
+                hits, misses = self.host_probes.setdefault(root, [0, 0])
+            if hits == 0 and misses >= self.max_host_misses:
+                metrics.inc('discovery', result='skipped')
+                return []
+
+            # 探测常见路径，命中一个即停止
+            probes = 0
+            for path, url in self.probe_urls(department_url):
+                if probes >= self.max_probes:
+                    break
+                if not robots.can_fetch(self.USER_AGENT, url):
+                    continue
+                probes += 1
+                body = self.fetch(url)
+                if self.is_leadership_page(body):
+                    self.record_hit(path)
+                    with self.lock:
+                        self.host_probes[root][0] += 1
+                        self.host_probes[root][1] = 0
+                    metrics.inc('discovery', result='probe')
+                    return [(url, body)]
+            if probes:
+                with self.lock:
+                    self.host_probes[root][1] += 1
+            metrics.inc('discovery', result='miss')
+            return []
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.path_hits)
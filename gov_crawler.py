@@ -1,8 +1,9 @@
+import argparse
+import base64
 import requests
 import json
 import time
 import os
-import csv
 from bs4 import BeautifulSoup, Comment
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -16,7 +17,20 @@ import re
 from urllib.parse import urljoin, urlparse
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-from volcenginesdkarkruntime import Ark
+from llm_async import AsyncLLM
+from result_store import open_store
+from resilience import endpoints, check_status, CircuitOpenError
+from metrics import metrics
+from profiling import enable_profiling
+from cassette import add_cassette_arguments, cassette, open_from_args
+from warc_archive import add_archive_arguments, archive
+from discovery import LeadershipDiscovery
+from xhr_endpoints import (XhrEndpointStore, endpoint_template, json_to_html, looks_like_leadership, parse_json,
+                           parse_performance_log)
+
+
+class DepartmentFetchError(Exception):
+    """部门首页无法访问且没有找到任何领导信息页（区别于正常访问但没有领导信息）"""
 
 
 class ContentCleaner:
@@ -151,21 +165,35 @@ class ContentCleaner:
 
 
 class GovInfoCrawler:
-    def __init__(self, api_key, model, chunk_size, max_depth, initial_url, target_provinces, folder):
+    HEADERS = ['姓名', '职务', '简历', '省份', '部门']
+
+    def __init__(self, api_key, model, chunk_size, max_depth, initial_url, target_provinces, folder,
+                 store_format='csv', max_llm_in_flight=16, use_discovery=True):
         self.api_key = api_key
         self.model = model
         self.chunk_size = chunk_size
         self.max_depth = max_depth
         self.initial_url = initial_url
         self.target_provinces = target_provinces
-        self.folder = folder
+        # 录制/回放时改用录制文件旁的目录，查重与数据接口模板不受以往运行结果影响
+        self.folder = cassette.state_path(folder)
+        self.store_format = store_format  # 结果存储格式：csv / db / parquet
+        self.stores = {}
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        self.client = Ark(
-            api_key=api_key
-        )
-        self.setup_selenium()
+        self.llm = AsyncLLM(api_key, model, max_in_flight=max_llm_in_flight)
+        self._driver = None  # 首次深度展开时才启动浏览器
+        # 调用大模型找链接之前，先通过 robots.txt、sitemap 与常见信息公开路径定位领导信息页
+        self.discovery = LeadershipDiscovery(self.fetch_raw) if use_discovery else None
+        # 深度展开时抓到的领导信息数据接口，之后的爬取直接请求，不再启动浏览器
+        self.xhr_endpoints = XhrEndpointStore(os.path.join(self.folder, 'xhr_endpoints.json'))
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self.setup_selenium()
+        return self._driver
 
     def setup_selenium(self):
         """设置 Selenium WebDriver"""
@@ -176,61 +204,70 @@ class GovInfoCrawler:
         chrome_options.add_argument('--ignore-certificate-errors')
         chrome_options.add_argument('--ignore-ssl-errors')
         chrome_options.add_argument('--allow-insecure-localhost')
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), 
-                                     options=chrome_options)
+        # 记录页面发出的网络请求（CDP performance 日志），用于识别返回领导列表的 JSON 接口
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        self._driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), 
+                                      options=chrome_options)
 
-    def ask_gpt(self, content, task, base_url):
-        """调用 GPT-4o API 分析内容"""
-        clean = ContentCleaner(base_url)
-        cleaned_content = clean.clean_html_content(content)
+    def build_prompt(self, content, task, base_url):
+        """清理网页内容并生成提示词"""
+        with metrics.timer('clean', detail=base_url):
+            clean = ContentCleaner(base_url)
+            cleaned_content = clean.clean_html_content(content)
 
-        prompt = f"""任务：{task}
+        return f"""任务：{task}
         网页内容：{cleaned_content}
         请仅返回JSON格式的结果，不要有任何其他文字。"""
-        
+
+    @staticmethod
+    def parse_gpt_result(result):
+        """解析模型返回的JSON，失败时返回空字典"""
+        # 尝试直接解析JSON
         try:
-            response = self.client.chat.completions.create(
-                model= self.model,  # 指定模型
-                messages=[{"role": "user", "content": prompt}],
-                stream=False
-            )
-            result = response.choices[0].message.content.strip()
-            
-            # 尝试直接解析JSON
-            try:
-                # 首先尝试直接解析
-                return json.loads(result)
-            except json.JSONDecodeError:
-                # 如果直接解析失败，尝试清理后再解析
-                # 1. 移除可能的markdown代码块标记和推理过程
-                cleaned_result = re.sub(r'<thinking>.*?</thinking>', '', result, flags=re.DOTALL)
-                cleaned_result = re.sub(r'<think>.*?</think>', '', cleaned_result, flags=re.DOTALL)
-                cleaned_result = re.sub(r'^```json\s*|\s*```$', '', cleaned_result)
-                cleaned_result = re.sub(r',\s*([}\]])', r'\1', cleaned_result)  # 修复多余逗号
-                cleaned_result = re.sub(r"'(?=\s*:)", '"', cleaned_result)  # 替换单引号为双引号
-                # 2. 查找第一个 { 和最后一个 } 之间的内容
-                json_match = re.search(r'\{.*\}', cleaned_result, re.DOTALL)
-                if json_match:
+            # 首先尝试直接解析
+            return json.loads(result)
+        except json.JSONDecodeError:
+            # 如果直接解析失败，尝试清理后再解析
+            # 1. 移除可能的markdown代码块标记和推理过程
+            cleaned_result = re.sub(r'<thinking>.*?</thinking>', '', result, flags=re.DOTALL)
+            cleaned_result = re.sub(r'<think>.*?</think>', '', cleaned_result, flags=re.DOTALL)
+            cleaned_result = re.sub(r'^```json\s*|\s*```$', '', cleaned_result)
+            cleaned_result = re.sub(r',\s*([}\]])', r'\1', cleaned_result)  # 修复多余逗号
+            cleaned_result = re.sub(r"'(?=\s*:)", '"', cleaned_result)  # 替换单引号为双引号
+            # 2. 查找第一个 { 和最后一个 } 之间的内容
+            json_match = re.search(r'\{.*\}', cleaned_result, re.DOTALL)
+            if json_match:
+                try:
+                    return json.loads(json_match.group())
+                except json.JSONDecodeError:
+                    # 如果失败，尝试匹配列表或字典模式
                     try:
-                        return json.loads(json_match.group())
-                    except json.JSONDecodeError:
-                        # 如果失败，尝试匹配列表或字典模式
-                        try:
-                            # 匹配 [...] 或 {...} 模式
-                            pattern = r'(\[.*\]|\{.*\})'
-                            match = re.search(pattern, cleaned_result, re.DOTALL)
-                            if match:
-                                matched_content = match.group()
-                                # 尝试解析匹配到的内容
-                                return json.loads(matched_content)
-                        except json.JSONDecodeError as je:
-                            print(f"JSON解析错误: {str(je)}")
-                            print(f"清理后的内容: {cleaned_result}")
-                            return {}
-                else:
-                    print("未找到有效的JSON内容")
-                    print(f"清理后的内容: {cleaned_result}")
-                    return {}
+                        # 匹配 [...] 或 {...} 模式
+                        pattern = r'(\[.*\]|\{.*\})'
+                        match = re.search(pattern, cleaned_result, re.DOTALL)
+                        if match:
+                            matched_content = match.group()
+                            # 尝试解析匹配到的内容
+                            return json.loads(matched_content)
+                    except json.JSONDecodeError as je:
+                        print(f"JSON解析错误: {str(je)}")
+                        print(f"清理后的内容: {cleaned_result}")
+                        return {}
+            else:
+                print("未找到有效的JSON内容")
+                print(f"清理后的内容: {cleaned_result}")
+                return {}
+
+    def ask_gpt(self, content, task, base_url, kind='ask_gpt'):
+        """调用 GPT-4o API 分析内容
+        kind 为任务类型，用于分类统计耗时与token用量
+        """
+        prompt = self.build_prompt(content, task, base_url)
+        
+        try:
+            # 交给异步调用层：相同提示词的并发请求只发送一次，限流时自动退避，连续失败时熔断
+            result = self.llm.complete_sync(prompt, kind)
+            return self.parse_gpt_result(result)
                 
         except requests.exceptions.RequestException as e:
             print(f"请求异常: {str(e)}")
@@ -238,15 +275,56 @@ class GovInfoCrawler:
         except Exception as e:
             print(f"其他错误: {str(e)}")
             return {}
+
+    async def ask_gpt_async(self, content, task, base_url, kind='ask_gpt'):
+        """ask_gpt 的协程版本，供在事件循环中同时发起多个请求"""
+        prompt = self.build_prompt(content, task, base_url)
+        try:
+            return self.parse_gpt_result(await self.llm.complete(prompt, kind))
+        except Exception as e:
+            print(f"其他错误: {str(e)}")
+            return {}
         
     def get_content_request(self, url):
         session = requests.Session()
         session.verify = False  # 禁用证书验证
-        response = session.get(url, headers=self.headers)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        content = str(soup)
+
+        def fetch():
+            response = session.get(url, headers=self.headers, timeout=30)
+            check_status(response.status_code)
+            return response
+
+        # 每个政府网站域名独立控制请求间隔与并发，出错时指数退避，整站不可用时熔断
+        with metrics.timer('fetch', detail=url, host=urlparse(url).netloc):
+            # 录制模式下同时保存响应，回放模式下直接读取录制的响应
+            body = cassette.through('http', url, lambda: endpoints.for_url(url).call(fetch).content)
+        if not cassette.replaying:
+            archive.add('http', url, body)
+        with metrics.timer('parse', detail=url):
+            soup = BeautifulSoup(body, 'html.parser')
+            content = str(soup)
         return content
 
+    def fetch_raw(self, url):
+        """返回原始响应内容，状态码不是200或请求失败时返回 None（用于 robots.txt、sitemap 与路径探测）"""
+        session = requests.Session()
+        session.verify = False
+
+        def fetch():
+            response = session.get(url, headers=self.headers, timeout=15)
+            check_status(response.status_code)
+            return response.content if response.status_code == 200 else None
+
+        try:
+            with metrics.timer('fetch', detail=url, host=urlparse(url).netloc):
+                body = cassette.through('probe', url, lambda: endpoints.for_url(url).call(fetch, retries=1))
+        except Exception as e:
+            print(f"请求 {url} 失败: {str(e)}")
+            return None
+        if not cassette.replaying:
+            archive.add('http', url, body)
+        return body
+
     def find_safe_split_point(self, content, target_position):
         """
         在目标位置附近寻找安全的分割点
@@ -286,12 +364,8 @@ class GovInfoCrawler:
         # 返回最接近目标位置的分割点
         return min(splits, key=lambda x: abs(x - target_position))
 
-    def process_large_content(self, content, task, chunk_size, base_url):
-        """
-        处理大型内容，将内容智能分块并循环调用GPT API
-        返回合并后的结果
-        """
-        results = []
+    def split_content(self, content, chunk_size):
+        """在安全的分割点把内容切分为不超过约 chunk_size 的块"""
         current_pos = 0
         chunks = []
         
@@ -305,21 +379,42 @@ class GovInfoCrawler:
             split_point = self.find_safe_split_point(content, current_pos + chunk_size)
             chunks.append(content[current_pos:split_point])
             current_pos = split_point
-        
-        for i, chunk in enumerate(chunks):
-            try:
-                # 添加块号信息到任务描述中
-                chunk_task = f"{task} (第{i+1}块，共{len(chunks)}块)"
-                chunk_result = self.ask_gpt(chunk, chunk_task, base_url)
-                if isinstance(chunk_result, dict):
-                    results.append(chunk_result)
-                elif isinstance(chunk_result, list):
-                    results.extend(item for item in chunk_result if isinstance(item, dict))
-            except Exception as e:
-                print(f"处理第{i+1}块时出错: {str(e)}")
-        
+        return chunks
+
+    def _chunk_prompts(self, content, task, chunk_size, base_url):
+        with metrics.timer('split', detail=base_url):
+            chunks = self.split_content(content, chunk_size)
+        # 添加块号信息到任务描述中
+        return [self.build_prompt(chunk, f"{task} (第{i+1}块，共{len(chunks)}块)", base_url)
+                for i, chunk in enumerate(chunks)]
+
+    def _merge_chunk_results(self, responses):
+        results = []
+        for i, response in enumerate(responses):
+            if isinstance(response, Exception):
+                print(f"处理第{i+1}块时出错: {str(response)}")
+                continue
+            chunk_result = self.parse_gpt_result(response)
+            if isinstance(chunk_result, dict):
+                results.append(chunk_result)
+            elif isinstance(chunk_result, list):
+                results.extend(item for item in chunk_result if isinstance(item, dict))
         return results
 
+    def process_large_content(self, content, task, chunk_size, base_url, kind='leadership'):
+        """
+        处理大型内容，将内容智能分块后同时调用GPT API
+        返回合并后的结果
+        """
+        prompts = self._chunk_prompts(content, task, chunk_size, base_url)
+        metrics.inc('chunks', len(prompts), task=kind)
+        return self._merge_chunk_results(self.llm.map_sync(prompts, kind))
+
+    async def process_large_content_async(self, content, task, chunk_size, base_url, kind='leadership'):
+        prompts = self._chunk_prompts(content, task, chunk_size, base_url)
+        metrics.inc('chunks', len(prompts), task=kind)
+        return self._merge_chunk_results(await self.llm.map(prompts, kind))
+
     def get_province_codes(self):
         """返回省份的拼音和简称字典"""
         return {
@@ -369,7 +464,7 @@ class GovInfoCrawler:
 
             # 修改任务提示，只获取目标省份的链接
             task = f"从页面内容中仅提取以下省份的政府网站链接：{', '.join(self.target_provinces)}，返回格式为：{{'省份名': '网站链接'}}"
-            province_links = self.ask_gpt(content, task, base_url)
+            province_links = self.ask_gpt(content, task, base_url, kind='province_links')
             
             # 过滤结果，确保只返回目标省份的链接
             filtered_links = {k: v for k, v in province_links.items() if k in self.target_provinces}
@@ -419,7 +514,7 @@ class GovInfoCrawler:
                 "✗ 排除：'通知公告'、'政务服务'、'信息公开'\n\n"
             )
             
-            extract_links = self.ask_gpt(content, extract_task, base_url)
+            extract_links = self.ask_gpt(content, extract_task, base_url, kind='department_links')
             
             # 处理所有链接，确保是完整的URL
             normalized_links = {}
@@ -495,7 +590,7 @@ class GovInfoCrawler:
             f"返回格式：{{'板块名称': '链接URL'}}\n"
         )
         
-        section_links = self.ask_gpt(content, task, base_url)
+        section_links = self.ask_gpt(content, task, base_url, kind='section_links')
         
         # 处理链接，确保都是完整的URL
         normalized_links = {}
@@ -626,22 +721,32 @@ class GovInfoCrawler:
             print(f"展开隐藏内容时出错: {str(e)}")
 
     def expand_content_with_selenium(self, url):
-        """针对政府网站结构的精准展开函数"""
+        """针对政府网站结构的精准展开函数（录制/回放模式下展开后的页面经过 cassette）"""
+        page_source = cassette.through_text('selenium', url, lambda: self._expand_content_with_selenium(url))
+        if page_source and not cassette.replaying:
+            archive.add('selenium', url, page_source.encode('utf-8'))
+        return page_source
+
+    def _expand_content_with_selenium(self, url):
         print(f"深度展开内容: {url}")
         max_retries = 3  # 最大重试次数
+        endpoint = endpoints.for_url(url)
         
         for attempt in range(max_retries):
             try:
                 # 设置页面加载超时
                 self.driver.set_page_load_timeout(20)
+                self._read_performance_log()  # 丢弃之前页面的网络日志
                 
-                # 访问页面
-                self.driver.get(url)
-                
-                # 等待页面基本加载完成
-                WebDriverWait(self.driver, 15).until(
-                    lambda driver: driver.execute_script('return document.readyState') == 'complete'
-                )
+                # 访问页面（与 requests 共用该域名的限流与熔断）
+                host = urlparse(url).netloc
+                with metrics.timer('selenium_load', detail=url, host=host), endpoint.slot():
+                    self.driver.get(url)
+                    
+                    # 等待页面基本加载完成
+                    WebDriverWait(self.driver, 15).until(
+                        lambda driver: driver.execute_script('return document.readyState') == 'complete'
+                    )
                 
                 # 检查页面是否成功加载
                 if "404" in self.driver.title or "错误" in self.driver.title:
@@ -649,14 +754,16 @@ class GovInfoCrawler:
                     return None
                     
                 # 展开内容
-                self._click_special_links()
-                self._expand_hidden_contents()
-                
-                # 再次等待以确保内容加载
-                time.sleep(3)
+                with metrics.timer('selenium_expand', detail=url, host=host):
+                    self._click_special_links()
+                    self._expand_hidden_contents()
+                    
+                    # 再次等待以确保内容加载
+                    time.sleep(3)
                 
                 # 获取展开后的页面内容
                 page_source = self.driver.page_source
+                self.capture_xhr_endpoints(url)
                 
                 # 验证内容是否成功获取
                 if len(page_source) < 1000:  # 页面内容过少可能表示加载失败
@@ -666,11 +773,14 @@ class GovInfoCrawler:
                         
                 return page_source
                 
+            except CircuitOpenError as e:
+                print(f"跳过深度展开: {str(e)}")
+                return None
             except Exception as e:
                 print(f"第{attempt + 1}次尝试失败: {str(e)}")
                 if attempt < max_retries - 1:
                     print("正在重试...")
-                    time.sleep(3)  # 重试前等待
+                    time.sleep(endpoint.backoff_delay(attempt))  # 指数退避
                     continue
                 else:
                     print("深度展开失败，已达到最大重试次数")
@@ -685,6 +795,71 @@ class GovInfoCrawler:
                     
         return None
 
+    def _read_performance_log(self):
+        try:
+            return self.driver.get_log('performance')
+        except Exception:
+            return []
+
+    def capture_xhr_endpoints(self, page_url, max_checks=30):
+        """检查页面发出的 XHR/Fetch 请求，返回领导列表的 JSON 接口按站点保存为模板"""
+        for request_id, request in parse_performance_log(self._read_performance_log())[:max_checks]:
+            try:
+                response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except Exception:
+                continue
+            body = response.get('body', '')
+            if response.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            data = parse_json(body)
+            if data is not None and looks_like_leadership(data):
+                template = endpoint_template(request)
+                if self.xhr_endpoints.add(page_url, template):
+                    metrics.inc('xhr_endpoints', result='captured')
+                    print(f"发现领导信息数据接口: {template['method']} {template['url']}")
+
+    def call_xhr_endpoint(self, template, page_url):
+        """按模板直接请求数据接口，返回响应文本，失败返回 None"""
+        session = requests.Session()
+        session.verify = False
+        headers = {**self.headers, 'Referer': page_url, 'X-Requested-With': 'XMLHttpRequest',
+                   'Accept': 'application/json, text/javascript, */*'}
+        if template['content_type']:
+            headers['Content-Type'] = template['content_type']
+        url = template['url']
+
+        def fetch():
+            response = session.request(template['method'], url, data=template['body'].encode('utf-8') or None,
+                                       headers=headers, timeout=15)
+            check_status(response.status_code)
+            return response.content if response.status_code == 200 else None
+
+        try:
+            with metrics.timer('fetch', detail=url, host=urlparse(url).netloc):
+                key = f"{template['method']} {url} {template['body']}"
+                body = cassette.through('xhr', key, lambda: endpoints.for_url(url).call(fetch))
+        except Exception as e:
+            print(f"请求数据接口 {url} 失败: {str(e)}")
+            return None
+        if body is None:
+            return None
+        if not cassette.replaying:
+            archive.add('xhr', url, body, content_type='application/json')
+        return body.decode('utf-8', errors='replace')
+
+    def fetch_xhr_leadership(self, page_url):
+        """页面有已保存的数据接口时直接请求，返回转换后的领导列表HTML，没有或失效时返回 None"""
+        for key, stored, template in self.xhr_endpoints.get(page_url):
+            text = self.call_xhr_endpoint(template, page_url)
+            data = parse_json(text) if text else None
+            ok = data is not None and looks_like_leadership(data)
+            self.xhr_endpoints.mark(page_url, key, stored, ok)
+            metrics.inc('xhr_endpoints', result='hit' if ok else 'stale')
+            if ok:
+                print(f"直接请求数据接口: {template['url']}")
+                return json_to_html(data)
+        return None
+
     def get_leadership_info(self, department_url, province_name, department_name, visited_urls=None, max_depth=3, all_leadership_info = None):
         """获取部门领导信息（递归查找）"""
         if visited_urls is None:
@@ -729,26 +904,45 @@ class GovInfoCrawler:
                         all_leadership_info
                     )
                     visited_urls.add(section_url)
-                    
-                # 避免请求过快
-                time.sleep(1)
                 
         except Exception as e:
             print(f"处理链接 {department_url} 时出错: {str(e)}")
 
+    def search_discovered_pages(self, department_url, province_name, department_name, visited_urls, all_leadership_info):
+        """直接解析发现阶段找到的领导信息页"""
+        for url, body in self.discovery.discover(department_url):
+            print(f"发现领导信息页: {url}")
+            visited_urls.add(url)
+            with metrics.timer('parse', detail=url):
+                content = str(BeautifulSoup(body, 'html.parser'))
+            leadership_info = self.find_leadership_info(content, url)
+            for info in leadership_info:
+                info['省份'] = province_name
+                info['部门'] = department_name
+            all_leadership_info.extend(leadership_info)
+            if len(all_leadership_info) >= 3:
+                return
+
     def deep_search_leadership(self, visited_urls, province_name, department_name):
         """深度搜索（不再遍历子链接）"""
         for url in visited_urls:
             if any(keyword in url for keyword in ['xxgk', 'zwgk']):
                 print(f"启动深度搜索: {url}")
                 try:
-                    # 获取展开后的内容
-                    expanded_content = self.expand_content_with_selenium(url)
-                    if not expanded_content:
-                        continue
-                    
-                    # 直接解析当前页面的扩展内容
-                    leadership_info = self.find_leadership_info(expanded_content, url)
+                    # 此前深度展开时抓到过该页面的数据接口：直接请求JSON，不启动浏览器
+                    leadership_info = []
+                    xhr_content = self.fetch_xhr_leadership(url)
+                    if xhr_content:
+                        leadership_info = self.find_leadership_info(xhr_content, url)
+
+                    if not leadership_info:
+                        # 获取展开后的内容
+                        expanded_content = self.expand_content_with_selenium(url)
+                        if not expanded_content:
+                            continue
+
+                        # 直接解析当前页面的扩展内容
+                        leadership_info = self.find_leadership_info(expanded_content, url)
                     
                     for info in leadership_info:
                         info.update({
@@ -823,7 +1017,7 @@ class GovInfoCrawler:
         
         try:
             # 调用GPT进行处理
-            result_list_merged = self.ask_gpt(people_info, task, "")
+            result_list_merged = self.ask_gpt(people_info, task, "", kind='merge_people')
             
             # 验证返回的数据格式
             if not isinstance(result_list_merged, list):
@@ -836,43 +1030,63 @@ class GovInfoCrawler:
             print(f"处理过程出现错误: {str(e)}")
             return result_list
 
+    def get_store(self, province_name):
+        """每个省份一个结果存储：{省份}领导爬取.csv / .db / .parquet"""
+        if province_name not in self.stores:
+            path = os.path.join(self.folder, f"{province_name}领导爬取.{self.store_format}")
+            self.stores[province_name] = open_store(path, self.HEADERS, table='gov_leaders')
+        return self.stores[province_name]
+
+    def close_stores(self):
+        for store in self.stores.values():
+            store.close()
+        self.stores = {}
+
     def process_department(self, department_url, province_name, department_name):
-        """处理单个部门的数据并保存到CSV"""
-        # 保存到CSV
+        """处理单个部门的数据并保存到结果存储；已爬取过的部门不再请求，直接返回结果存储中该部门的行
+        Raises:
+            DepartmentFetchError: 部门首页请求失败且发现阶段也没有找到领导信息页，结果不可信，由调用方决定跳过或重试
+        """
         os.makedirs(self.folder, exist_ok=True)
-        csv_filename = f"{province_name}领导爬取.csv"
-        headers = ['姓名', '职务', '简历', '省份', '部门']
-        full_path = os.path.join(self.folder, csv_filename)
-        file_exists = os.path.exists(full_path)
-
-        # 检查该部门是否已经爬取
-        if file_exists:
-            with open(full_path, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['部门'] == department_name:
-                        print(f"【已存在】 {department_name}已经爬取过，跳过处理")
-                        return []
+        store = self.get_store(province_name)
+
+        # 检查该部门是否已经爬取：返回已保存的领导，流水线的下游阶段仍能拿到这些人
+        if store.has('部门', department_name):
+            metrics.inc('departments', province=province_name, result='skipped')
+            print(f"【已存在】 {department_name}已经爬取过，跳过处理")
+            return store.query(部门=department_name)
         
         # 获取部门数据
         visited_urls = set()
         result_list = []
-        self.get_leadership_info(department_url, province_name, department_name, visited_urls=visited_urls, max_depth=self.max_depth, all_leadership_info=result_list)
+        with metrics.timer('department_search', detail=department_name, province=province_name):
+            if self.discovery is not None:
+                self.search_discovered_pages(department_url, province_name, department_name, visited_urls, result_list)
+            # 发现阶段没有找到领导时，按原流程由大模型逐页查找
+            if not result_list:
+                self.get_leadership_info(department_url, province_name, department_name, visited_urls=visited_urls, max_depth=self.max_depth, all_leadership_info=result_list)
+        # 首页出错时 get_leadership_info 只打印错误，不能当作"没有领导信息"记录下来
+        if not result_list and department_url not in visited_urls:
+            metrics.inc('departments', province=province_name, result='failed')
+            raise DepartmentFetchError(f"{province_name} {department_name} 首页请求失败: {department_url}")
         if not result_list:
             print(f"【深度触发】{department_name}未找到常规信息")
-            deep_results = self.deep_search_leadership(
-                visited_urls,
-                province_name,
-                department_name
-            )
+            metrics.inc('deep_search', province=province_name)
+            with metrics.timer('deep_search', province=province_name):
+                deep_results = self.deep_search_leadership(
+                    visited_urls,
+                    province_name,
+                    department_name
+                )
             result_list.extend(deep_results)
+        metrics.inc('pages_visited', len(visited_urls), province=province_name)
 
         # 使用GPT合并处理整个列表
         merged_results = self.merge_people_with_gpt(result_list)
 
         # 记录没有找到领导信息的部门
         if not merged_results:
-            no_leader_file = os.path.join(folder, 'no_leader_departments.txt')
+            no_leader_file = os.path.join(self.folder, 'no_leader_departments.txt')
             department_info = f"{province_name}-{department_name}\n"
             # 检查是否需要写入
             need_write = True
@@ -888,21 +1102,24 @@ class GovInfoCrawler:
                 with open(no_leader_file, 'a', encoding='utf-8') as f:
                     f.write(department_info)
     
+            metrics.inc('departments', province=province_name, result='no_leader')
             print(f"【未找到】 {department_name}未找到任何领导信息")
             return []
         
-        with open(full_path, 'a', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            if not file_exists:
-                writer.writeheader()
-            for result in merged_results:
-                writer.writerow(result)
+        metrics.inc('departments', province=province_name, result='found')
+        metrics.inc('leaders', len(merged_results), province=province_name)
+        # 每个部门写入一次
+        store.add_many(merged_results)
+        store.flush()
         
         return merged_results
 
 
-    def main(self):
-        """主程序流程"""
+    def main(self, on_department_results=None):
+        """主程序流程
+        Args:
+            on_department_results: 可选回调，每个部门处理完成后以该部门合并后的领导列表调用，用于流式下游处理
+        """
         initial_url = self.initial_url
         all_results = []
         
@@ -918,20 +1135,45 @@ class GovInfoCrawler:
             for dept_name, dept_url in department_links.items():
                 print(f"正在处理 {province_name} {dept_name}...")
                 # 处理单个部门并获取结果
-                department_results = self.process_department(dept_url, province_name, dept_name)
+                try:
+                    department_results = self.process_department(dept_url, province_name, dept_name)
+                except DepartmentFetchError as e:
+                    print(f"【失败】 {str(e)}")
+                    department_results = []
                 # 将结果添加到全局列表
                 all_results.extend(department_results)
+                if on_department_results and department_results:
+                    on_department_results(department_results)
                 print(f"完成处理 {province_name} {dept_name}")
-                time.sleep(2)
+                if not cassette.replaying:
+                    time.sleep(2)
             
-            time.sleep(5)
+            if not cassette.replaying:
+                time.sleep(5)
         
+        self.close_stores()
+        self.write_metrics()
         return all_results
 
+    def write_metrics(self):
+        """输出本次运行的各阶段耗时、token用量与各端点状态"""
+        metrics.write(os.path.join(self.folder, 'metrics'), 'gov',
+                      extra={'endpoints': endpoints.snapshot(), 'llm_requests': self.llm.stats,
+                             'discovery_paths': self.discovery.snapshot() if self.discovery else {}})
+
+    def close(self):
+        """关闭浏览器、结果存储与大模型调用层的后台事件循环"""
+        if getattr(self, '_driver', None) is not None:
+            self._driver.quit()
+            self._driver = None
+        if hasattr(self, 'stores'):
+            self.close_stores()
+        if getattr(self, 'llm', None) is not None:
+            self.llm.close()
+
     def __del__(self):
         """清理资源"""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        self.close()
 
 
 if __name__ == "__main__":
@@ -943,7 +1185,26 @@ if __name__ == "__main__":
     initial_url = "https://www.gov.cn/home/2023-03/29/content_5748954.htm" # 地方政府网站
     target_provinces = ["内蒙古"] # 目标省份
     folder = './results' # 存储结果文件夹
+    store_format = 'csv' # 结果存储格式：csv / db（SQLite） / parquet
+
+    parser = argparse.ArgumentParser(description='政府网站领导信息爬取')
+    parser.add_argument('--profile', action='store_true', help='开启性能分析（cProfile、调用栈采样、内存峰值）')
+    parser.add_argument('--profile-dir', default=None, help='性能分析结果目录，默认 results/profile/<时间>')
+    add_cassette_arguments(parser)
+    add_archive_arguments(parser)
+    args = parser.parse_args()
 
-    crawler = GovInfoCrawler(api_key, model, chunk_size, max_depth, initial_url, target_provinces, folder)
-    results = crawler.main()
+    open_from_args(args)
+    if args.archive:
+        archive.open(args.archive)
+    profiler = enable_profiling(args.profile_dir) if args.profile else None
+    try:
+        crawler = GovInfoCrawler(api_key, model, chunk_size, max_depth, initial_url, target_provinces, folder, store_format)
+        results = crawler.main()
+        crawler.close()
+    finally:
+        if profiler:
+            profiler.stop()
+        cassette.close()
+        archive.close()
     print("爬取完成！")
@@ -0,0 +1,158 @@
+import argparse
+import glob
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Dict, List
+
+from gov_crawler import GovInfoCrawler
+from result_store import iter_store_rows, open_store
+
+
+def new_crawler(settings: Dict, target_provinces: List[str], folder: str) -> GovInfoCrawler:
+    return GovInfoCrawler(settings['api_key'], settings['model'], settings['chunk_size'], settings['max_depth'],
+                          settings['initial_url'], target_provinces, folder, settings['store_format'])
+
+
+def run_province(settings: Dict, province: str, folder: str) -> str:
+    """工作进程：完整处理一个省份，结果写入该省的分片目录"""
+    crawler = new_crawler(settings, [province], folder)
+    try:
+        crawler.main()
+    finally:
+        crawler.close()
+    return folder
+
+
+def run_departments(settings: Dict, province: str, departments: Dict[str, str], folder: str) -> str:
+    """工作进程：处理一个省份的一组部门"""
+    crawler = new_crawler(settings, [province], folder)
+    try:
+        for name, url in departments.items():
+            print(f"正在处理 {province} {name}...")
+            crawler.process_department(url, province, name)
+        crawler.close_stores()
+        crawler.write_metrics()
+    finally:
+        crawler.close()
+    return folder
+
+
+def department_groups(settings: Dict, target_provinces: List[str], groups: int) -> List[tuple]:
+    """在主进程中获取各省部门链接，按部门名哈希分为 groups 组（重复运行时分组不变，便于续爬）"""
+    crawler = new_crawler(settings, target_provinces, settings['shard_root'])
+    tasks = []
+    try:
+        for province, province_url in crawler.get_province_links(settings['initial_url']).items():
+            departments = crawler.get_department_links(province_url, province)
+            buckets = [{} for _ in range(groups)]
+            for name, url in departments.items():
+                buckets[zlib.crc32(name.encode('utf-8')) % groups][name] = url
+            for index, bucket in enumerate(buckets):
+                if bucket:
+                    tasks.append((province, bucket, os.path.join(settings['shard_root'], f"{province}_{index}")))
+    finally:
+        crawler.close()
+    return tasks
+
+
+def merge_shards(shard_root: str, folder: str, store_format: str) -> Dict[str, int]:
+    """合并各分片的结果到 folder 下的 {省份}领导爬取.{格式}
+    以 (姓名, 部门) 去重，已存在于输出中的人员不再写入；重复条目中的空字段用后出现的分片补齐
+    Returns:
+        省份 -> 新写入的人数
+    """
+    os.makedirs(folder, exist_ok=True)
+    shard_files = {}
+    for path in sorted(glob.glob(os.path.join(shard_root, '*', f"*领导爬取.{store_format}"))):
+        shard_files.setdefault(os.path.basename(path), []).append(path)
+
+    written = {}
+    for filename, paths in shard_files.items():
+        merged = {}
+        for path in paths:
+            for row in iter_store_rows(path, table='gov_leaders'):
+                key = (row.get('姓名', ''), row.get('部门', ''))
+                if key in merged:
+                    for column, value in row.items():
+                        if value and not merged[key].get(column):
+                            merged[key][column] = value
+                else:
+                    merged[key] = dict(row)
+
+        with open_store(os.path.join(folder, filename), GovInfoCrawler.HEADERS, table='gov_leaders') as store:
+            existing = {(row.get('姓名', ''), row.get('部门', '')) for row in store.iter_rows()}
+            rows = [row for key, row in merged.items() if key not in existing]
+            store.add_many(rows)
+        written[filename.split('领导爬取')[0]] = len(rows)
+        print(f"合并 {len(paths)} 个分片到 {filename}：新增 {len(rows)} 人")
+
+    # 合并未找到领导的部门记录
+    no_leader_file = os.path.join(folder, 'no_leader_departments.txt')
+    lines = set()
+    if os.path.exists(no_leader_file):
+        with open(no_leader_file, 'r', encoding='utf-8') as f:
+            lines.update(f.read().splitlines())
+    new_lines = []
+    for path in sorted(glob.glob(os.path.join(shard_root, '*', 'no_leader_departments.txt'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f.read().splitlines():
+                if line and line not in lines:
+                    lines.add(line)
+                    new_lines.append(line)
+    if new_lines:
+        with open(no_leader_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{line}\n" for line in new_lines))
+    return written
+
+
+def launch(settings: Dict, target_provinces: List[str], workers: int, by: str = 'province', groups: int = 0):
+    """按省份（每个省一个进程）或按部门组（每组一个进程）并行爬取，各进程使用独立的浏览器、HTTP会话与输出分片"""
+    if by == 'province':
+        tasks = [(run_province, (settings, province, os.path.join(settings['shard_root'], province)))
+                 for province in target_provinces]
+    else:
+        tasks = [(run_departments, (settings, province, departments, shard))
+                 for province, departments, shard in department_groups(settings, target_provinces, groups or workers)]
+
+    # spawn：子进程不继承父进程中的事件循环线程与浏览器
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        futures = {pool.submit(func, *func_args): func_args for func, func_args in tasks}
+        for future in as_completed(futures):
+            shard = futures[future][-1]
+            try:
+                future.result()
+                print(f"分片完成: {shard}")
+            except Exception as e:
+                print(f"分片 {shard} 出错: {str(e)}")
+
+
+if __name__ == "__main__":
+    api_key = "your_deepseek_api_key" # 模型api
+    model = "deepseek-v3-241226" # 模型id
+    chunk_size = 50000 # process_large_content的分块大小
+    max_depth = 4 # 递归查找网页深度
+
+    initial_url = "https://www.gov.cn/home/2023-03/29/content_5748954.htm" # 地方政府网站
+    target_provinces = ["内蒙古"] # 目标省份
+    folder = './results' # 合并后的结果文件夹
+    shard_root = './results/shards' # 各进程的输出分片
+    store_format = 'csv' # 结果存储格式：csv / db（SQLite） / parquet
+
+    parser = argparse.ArgumentParser(description='多进程政府网站领导信息爬取')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='工作进程数')
+    parser.add_argument('--by', choices=['province', 'department'], default='province',
+                        help='province：每个省份一个进程；department：各省部门分组后每组一个进程')
+    parser.add_argument('--groups', type=int, default=0, help='按部门分组时每个省的组数，默认等于进程数')
+    parser.add_argument('--merge-only', action='store_true', help='只合并已有分片')
+    args = parser.parse_args()
+
+    settings = {
+        'api_key': api_key, 'model': model, 'chunk_size': chunk_size, 'max_depth': max_depth,
+        'initial_url': initial_url, 'store_format': store_format, 'shard_root': shard_root,
+    }
+    if not args.merge_only:
+        launch(settings, target_provinces, args.workers, args.by, args.groups)
+    merge_shards(shard_root, folder, store_format)
+    print("爬取完成！")
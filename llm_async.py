@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional
+
+from volcenginesdkarkruntime import AsyncArk
+
+from cassette import cassette
+from metrics import metrics
+from resilience import endpoints
+
+
+class AsyncLLM:
+    """基于 AsyncArk 的异步大模型调用层
+    - 相同模型与提示词的在途请求合并为一次调用，结果共享
+    - 信号量限制同时在途的请求数，限流、退避与熔断沿用 resilience 中的 ark 端点
+    - 同步代码通过 complete_sync / map_sync 把请求交给后台事件循环，多个线程共用一个循环，不需要大线程池
+    同一实例只能在一个事件循环中使用：要么全部走 *_sync（后台循环），要么全部在调用方自己的循环中 await
+    """
+    def __init__(self, api_key: str, model: str, max_in_flight: int = 16, client=None):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.client = client if client is not None else AsyncArk(api_key=api_key)
+        self.endpoint = endpoints.get('ark')
+        self.in_flight = {}  # 提示词哈希 -> Task
+        self.stats = {'requests': 0, 'coalesced': 0}
+        self.loop = None
+        self.semaphore = None
+        self._lock = threading.Lock()
+
+    def prompt_key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode('utf-8')).hexdigest()
+
+    async def complete(self, prompt: str, task: str = 'default') -> str:
+        """返回模型回复文本；相同提示词的请求在完成前只发送一次
+        Args:
+            task: 任务类型，用于按任务统计耗时与token用量
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        key = self.prompt_key(prompt)
+        future = self.in_flight.get(key)
+        metrics.cache('llm_inflight', future is not None)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            future = asyncio.ensure_future(self._request(prompt, task))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # shield：某个等待方被取消时不影响其他合并的等待方
+        return await asyncio.shield(future)
+
+    async def _request(self, prompt: str, task: str) -> str:
+        # 录制模式下保存回复与token用量，回放模式下直接返回录制的回复，不占用并发名额
+        data = await cassette.through_async('ark', self.prompt_key(prompt), lambda: self._send(prompt, task))
+        reply = json.loads(data)
+        # 回放的回复没有实际调用模型，只计数，不计入调用次数与token用量
+        if cassette.replaying:
+            metrics.inc('llm_replayed', task=task)
+        else:
+            metrics.record_usage(task, reply['usage'])
+        return reply['content']
+
+    async def _send(self, prompt: str, task: str) -> bytes:
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            with metrics.timer('llm', task=task):
+                response = await self.endpoint.call_async(
+                    self.client.chat.completions.create,
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=False
+                )
+        usage = getattr(response, 'usage', None)
+        return json.dumps({
+            'content': response.choices[0].message.content.strip(),
+            'usage': None if usage is None else {
+                kind: getattr(usage, kind, None) for kind in ('prompt_tokens', 'completion_tokens')
+            },
+        }, ensure_ascii=False).encode('utf-8')
+
+    async def map(self, prompts: List[str], task: str = 'default', return_exceptions: bool = True) -> List:
+        """并发发送一组提示词，结果与输入顺序一致；失败的位置为异常对象"""
+        return await asyncio.gather(*(self.complete(p, task) for p in prompts), return_exceptions=return_exceptions)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, labels: Dict):
+        # 后台循环记录的指标沿用创建它的线程绑定的阶段标签
+        metrics.bind(**labels)
+        loop.run_forever()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """后台线程中的事件循环，首次使用时启动"""
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self._run_loop, args=(self.loop, metrics.bound()),
+                                 name='async-llm', daemon=True).start()
+            return self.loop
+
+    def complete_sync(self, prompt: str, task: str = 'default', timeout: Optional[float] = None) -> str:
+        return asyncio.run_coroutine_threadsafe(self.complete(prompt, task), self._ensure_loop()).result(timeout)
+
+    def map_sync(self, prompts: List[str], task: str = 'default', timeout: Optional[float] = None) -> List:
+        return asyncio.run_coroutine_threadsafe(self.map(prompts, task), self._ensure_loop()).result(timeout)
+
+    def close(self, timeout: float = 10):
+        """关闭客户端并停止后台事件循环，可重复调用；timeout 防止在 __del__ 中关闭时卡住"""
+        with self._lock:
+            loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        if loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self.client.close(), loop).result(timeout)
+            except Exception as e:
+                print(f"关闭大模型客户端出错: {str(e)}")
+            loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,218 @@
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Optional
+
+
+# 耗时直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, float('inf'))
+
+
+# Prometheus 文本格式的标签值转义
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数（取桶上限，最后一个桶取最大值）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return self.max if bound == float('inf') else min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """进程内指标：计数器、各阶段耗时直方图、大模型token用量与缓存命中率
+    标签以关键字参数传入，如 metrics.inc('pages', stage='fetch', host='www.nmg.gov.cn')；
+    bind() 为当前线程之后的所有指标附加标签（流水线中用 component 区分两个阶段）；
+    运行结束时 write() 输出 Prometheus 文本格式与 JSON 汇总
+    """
+    def __init__(self):
+        self.counters = {}  # (名称, 标签) -> 值
+        self.histograms = {}  # (名称, 标签) -> Histogram
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # timer 的附加钩子：stage_hooks 中的每一项以 (阶段, detail) 调用并作为上下文管理器进入，用于性能分析
+        self.stage_hooks = []
+
+    def bind(self, **labels):
+        """当前线程之后记录的指标都带上这些标签"""
+        self.local.labels = dict(self.bound(), **labels)
+
+    def bound(self) -> Dict:
+        return dict(getattr(self.local, 'labels', {}))
+
+    def _key(self, name: str, labels: Dict) -> tuple:
+        labels = dict(self.bound(), **labels)
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def _snapshot(self):
+        """计数器与直方图的副本；当前线程绑定了标签时只保留带这些标签的指标"""
+        bound = {k: str(v) for k, v in self.bound().items()}
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        if bound:
+            def own(key):
+                return bound.items() <= dict(key[1]).items()
+            counters = {key: value for key, value in counters.items() if own(key)}
+            histograms = {key: hist for key, hist in histograms.items() if own(key)}
+        return counters, histograms
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, detail: str = '', **labels):
+        """记录一个阶段的耗时；块内抛出异常时同时计入该阶段的错误数
+        detail 为具体对象（如页面URL），不作为标签，只传给钩子
+        """
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for hook in self.stage_hooks:
+                    stack.enter_context(hook(stage, detail))
+                yield
+        except Exception:
+            self.inc('stage_errors', stage=stage, **labels)
+            raise
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    def record_usage(self, task: str, usage):
+        """记录一次大模型调用的token用量（Ark 响应中的 usage）"""
+        if usage is None:
+            return
+        self.inc('llm_calls', task=task)
+        for kind in ('prompt_tokens', 'completion_tokens'):
+            value = getattr(usage, kind, None)
+            if value is None and isinstance(usage, dict):
+                value = usage.get(kind)
+            if value:
+                self.inc('llm_tokens', value, task=task, kind=kind.split('_')[0])
+
+    def cache(self, name: str, hit: bool):
+        self.inc('cache_requests', cache=name, result='hit' if hit else 'miss')
+
+    def prometheus_text(self) -> str:
+        lines = []
+        counters, histograms = self._snapshot()
+        counters, histograms = sorted(counters.items()), sorted(histograms.items())
+
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{escape_label(v)}"' for k, v in pairs) + '}'
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"crawler_{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{label_text(labels)} {value}")
+        for (name, labels), hist in histograms:
+            metric = f"crawler_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                lines.append(f"{metric}_bucket{label_text(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{metric}_sum{label_text(labels)} {hist.sum:.6f}")
+            lines.append(f"{metric}_count{label_text(labels)} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict:
+        """按阶段、任务与缓存汇总，便于直接比较各阶段的耗时占比"""
+        counters, histograms = self._snapshot()
+
+        stages = {}
+        for (name, labels), hist in sorted(histograms.items()):
+            if name != 'stage_seconds':
+                continue
+            stages[','.join(f"{k}={v}" for k, v in labels)] = {
+                'count': hist.count,
+                'total_seconds': round(hist.sum, 3),
+                'mean_seconds': round(hist.sum / hist.count, 3) if hist.count else 0,
+                'p50_seconds': round(hist.quantile(0.5), 3),
+                'p95_seconds': round(hist.quantile(0.95), 3),
+                'max_seconds': round(hist.max, 3),
+            }
+
+        tokens, caches, other = {}, {}, {}
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            if name in ('llm_tokens', 'llm_calls'):
+                # 未按阶段过滤时，同一任务在不同阶段的用量相加
+                stats = tokens.setdefault(labels['task'], {})
+                kind = labels['kind'] if name == 'llm_tokens' else 'calls'
+                stats[kind] = stats.get(kind, 0) + value
+            elif name == 'cache_requests':
+                caches.setdefault(labels['cache'], {'hit': 0, 'miss': 0})[labels['result']] += value
+            else:
+                other[','.join([name] + [f"{k}={v}" for k, v in sorted(labels.items())])] = value
+        for stats in caches.values():
+            total = stats['hit'] + stats['miss']
+            stats['hit_rate'] = round(stats['hit'] / total, 4) if total else 0
+
+        return {
+            'elapsed_seconds': round(time.time() - self.started, 1),
+            'stages': dict(sorted(stages.items(), key=lambda item: -item[1]['total_seconds'])),
+            'llm_tokens': tokens,
+            'caches': caches,
+            'counters': other,
+        }
+
+    def write(self, folder: str, prefix: str, extra: Optional[Dict] = None):
+        """写出 {prefix}_metrics.prom 与 {prefix}_metrics.json（只含当前线程所绑定阶段的指标）"""
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"{prefix}_metrics.prom"), 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        with open(os.path.join(folder, f"{prefix}_metrics.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"运行指标已保存到 {folder}/{prefix}_metrics.json")
+
+
+# 进程内共享的指标
+metrics = Metrics()
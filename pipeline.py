@@ -0,0 +1,102 @@
+import argparse
+import queue
+import threading
+
+from gov_crawler import GovInfoCrawler
+from baike_crawler import DataProcessor, PersonInfo
+from metrics import metrics
+from profiling import enable_profiling
+from cassette import add_cassette_arguments, cassette, open_from_args
+from warc_archive import add_archive_arguments, archive
+
+
+class StreamingPipeline:
+    """政府网站爬取与百度百科补充的流式流水线
+    gov_crawler 每处理完一个部门就把合并后的领导放入有界队列，百科补充同时从队列中取出处理，
+    两个阶段各自增量写入结果文件，总耗时约等于较慢的一个阶段；
+    两个阶段的指标分别带 component=gov / baike 标签，各自写出的指标文件只含本阶段的指标
+    """
+    _DONE = object()
+
+    def __init__(self, crawler: GovInfoCrawler, processor: DataProcessor, queue_size: int = 100):
+        self.crawler = crawler
+        self.processor = processor
+        # 有界队列：百科补充跟不上时，政府网站爬取在放入时阻塞
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+
+    def _enqueue(self, department_results):
+        for row in department_results:
+            if isinstance(row, dict) and row.get('姓名'):
+                self.queue.put(row)
+
+    def _produce(self):
+        metrics.bind(component='gov')
+        try:
+            self.crawler.main(on_department_results=self._enqueue)
+        except Exception as e:
+            print(f"政府网站爬取出错: {str(e)}")
+            self.error = e
+        finally:
+            self.queue.put(self._DONE)
+
+    def _consume(self):
+        metrics.bind(component='baike')
+        while True:
+            row = self.queue.get()
+            if row is self._DONE:
+                break
+            person = PersonInfo.from_row(row)
+            try:
+                if not self.processor.check_duplicate(person):
+                    print(f"正在爬取 {person.name}...")
+                    self.processor.process_person(person)
+                else:
+                    print(f"{person.name} 已存在，跳过处理")
+            except Exception as e:
+                print(f"处理 {person.name} 时出错: {str(e)}")
+        self.processor.finish()
+
+    def run(self):
+        """生产者在后台线程运行，百科补充在当前线程消费"""
+        producer = threading.Thread(target=self._produce, name='gov-crawler', daemon=True)
+        producer.start()
+        self._consume()
+        producer.join()
+        return self.error is None
+
+
+if __name__ == "__main__":
+    api_key = "your_deepseek_api_key" # 模型api
+    model = "deepseek-v3-241226" # 模型id
+    chunk_size = 50000 # process_large_content的分块大小
+    max_depth = 4 # 递归查找网页深度
+
+    initial_url = "https://www.gov.cn/home/2023-03/29/content_5748954.htm" # 地方政府网站
+    target_provinces = ["内蒙古"] # 目标省份
+    folder = './results' # 存储结果文件夹
+    store_format = 'csv' # 结果存储格式：csv / db（SQLite） / parquet
+    queue_size = 100 # 两个阶段之间的队列长度
+
+    parser = argparse.ArgumentParser(description='政府网站爬取与百度百科补充流水线')
+    parser.add_argument('--profile', action='store_true', help='开启性能分析（cProfile、调用栈采样、内存峰值）')
+    parser.add_argument('--profile-dir', default=None, help='性能分析结果目录，默认 results/profile/<时间>')
+    add_cassette_arguments(parser)
+    add_archive_arguments(parser)
+    args = parser.parse_args()
+
+    open_from_args(args)
+    if args.archive:
+        archive.open(args.archive)
+    profiler = enable_profiling(args.profile_dir) if args.profile else None
+    try:
+        crawler = GovInfoCrawler(api_key, model, chunk_size, max_depth, initial_url, target_provinces, folder, store_format)
+        processor = DataProcessor()
+        StreamingPipeline(crawler, processor, queue_size).run()
+        crawler.close()
+    finally:
+        if profiler:
+            profiler.stop()
+        cassette.close()
+        archive.close()
+    print("爬取完成！")
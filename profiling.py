@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import cProfile
+import heapq
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+
+class Profiler:
+    """可选的性能分析（--profile）
+    - 每个阶段一个 cProfile，输出 pstats/{阶段}.pstats 及按累计耗时排序的文本
+    - 后台线程定时采样各线程调用栈，输出 stacks.collapsed（flamegraph.pl / speedscope 可直接读取）
+    - tracemalloc 记录每次调用的内存峰值，输出最慢的若干个页面及其分配热点；
+      峰值是进程级的（reset_peak 会影响所有线程），只有串行运行（一个 worker、不并发抓取）时才能归到单个页面
+    通过 metrics.timer 的钩子接入，已计时的阶段无需再改代码
+    """
+    def __init__(self, run_dir: Optional[str] = None, sample_interval: float = 0.005, top_pages: int = 20):
+        self.run_dir = run_dir or os.path.join('./results/profile', time.strftime('%Y%m%d-%H%M%S'))
+        self.sample_interval = sample_interval
+        self.top_pages = top_pages
+        self.enabled = False
+        self.profiles = {}  # 阶段 -> cProfile.Profile
+        self.stacks = Counter()  # 折叠后的调用栈 -> 采样次数
+        self.pages = []  # 小顶堆：(耗时, 序号, 记录)
+        self.stages = contextvars.ContextVar('profiler_stages', default=())  # 当前上下文的阶段栈
+        self.active = {}  # 线程id -> 该线程最近进入的阶段栈，供采样线程读取
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self._sampler = None
+
+    def start(self):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        self._sampler.start()
+        print(f"性能分析已开启，结果将保存到 {self.run_dir}")
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        while self.enabled:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stages = self.active.get(thread_id) or ('(无阶段)',)
+                self.stacks[';'.join([stages[-1]] + names[::-1])] += 1
+            time.sleep(self.sample_interval)
+
+    @contextmanager
+    def stage(self, name: str, detail: str = ''):
+        """分析一个阶段；同一线程内嵌套时外层暂停、内层结束后恢复
+        阶段栈保存在 ContextVar 中，同一事件循环里交错执行的协程各自维护自己的栈
+        """
+        if not self.enabled:
+            yield
+            return
+        thread_id = threading.get_ident()
+        stages = self.stages.get() + (name,)
+        token = self.stages.set(stages)
+        self.active[thread_id] = stages
+        # 事件循环线程中的协程会交错执行，只做采样，不做确定性分析
+        try:
+            asyncio.get_running_loop()
+            in_loop = True
+        except RuntimeError:
+            in_loop = False
+        outer = getattr(self.local, 'profile', None)
+        profile = None
+        if not in_loop:
+            with self.lock:
+                profile = self.profiles.setdefault(name, cProfile.Profile())
+            if outer is not None:
+                outer.disable()
+            try:
+                profile.enable()
+                self.local.profile = profile
+            except ValueError:
+                # 同一阶段的分析器已在其他线程中运行：本阶段不单独分析，恢复外层分析器
+                profile = None
+                if outer is not None:
+                    outer.enable()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        if profile is not None:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                self.local.profile = outer
+                if outer is not None:
+                    outer.enable()
+            self.stages.reset(token)
+            self.active[thread_id] = self.stages.get()
+            peak = tracemalloc.get_traced_memory()[1] - traced_before
+            if detail:
+                self._record_page(name, detail, elapsed, peak)
+
+    def _record_page(self, stage: str, detail: str, elapsed: float, peak: int):
+        with self.lock:
+            self.sequence += 1
+            if len(self.pages) >= self.top_pages and elapsed <= self.pages[0][0]:
+                return
+            record = {'stage': stage, 'page': detail, 'seconds': round(elapsed, 3),
+                      'peak_memory_mb': round(max(peak, 0) / 1024 / 1024, 2)}
+            # 只为进入前 N 名的页面抓取内存快照
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+            record['top_allocations'] = [
+                f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size / 1024:.0f} KiB"
+                for stat in snapshot.statistics('lineno')[:10]
+            ]
+            item = (elapsed, self.sequence, record)
+            if len(self.pages) < self.top_pages:
+                heapq.heappush(self.pages, item)
+            else:
+                heapq.heapreplace(self.pages, item)
+
+    def stop(self):
+        """停止采样并写出全部结果"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._sampler:
+            self._sampler.join()
+        pstats_dir = os.path.join(self.run_dir, 'pstats')
+        os.makedirs(pstats_dir, exist_ok=True)
+
+        for name, profile in self.profiles.items():
+            safe = ''.join(ch if ch.isalnum() or ch in '-_' else '_' for ch in name)
+            try:
+                profile.dump_stats(os.path.join(pstats_dir, f"{safe}.pstats"))
+                text = io.StringIO()
+                pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(40)
+            except TypeError:
+                # 该阶段从未成功开启过分析
+                continue
+            with open(os.path.join(pstats_dir, f"{safe}.txt"), 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+
+        with open(os.path.join(self.run_dir, 'stacks.collapsed'), 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        _, peak = tracemalloc.get_traced_memory()
+        slowest = [record for _, _, record in sorted(self.pages, reverse=True)]
+        with open(os.path.join(self.run_dir, 'slowest_pages.json'), 'w', encoding='utf-8') as f:
+            json.dump({'process_peak_memory_mb': round(peak / 1024 / 1024, 2), 'pages': slowest},
+                      f, ensure_ascii=False, indent=2)
+        tracemalloc.stop()
+        print(f"性能分析结果已保存到 {self.run_dir}")
+
+
+def enable_profiling(run_dir: Optional[str] = None) -> Profiler:
+    """开启性能分析，并挂到 metrics.timer 上"""
+    from metrics import metrics
+
+    profiler = Profiler(run_dir)
+    metrics.stage_hooks.append(profiler.stage)
+    profiler.start()
+    return profiler
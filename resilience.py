@@ -0,0 +1,232 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+
+# 视为限流/封禁的状态码：降低并发并退避；其他错误只计入熔断的连续失败次数
+THROTTLE_STATUS = {403, 429, 503}
+
+
+class CircuitOpenError(Exception):
+    """端点熔断中，调用直接失败而不发出请求"""
+
+
+class ThrottledError(Exception):
+    """响应表明被限流（如 HTTP 429），由调用方在拿到响应后抛出"""
+    def __init__(self, status_code: int, message: str = ''):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def status_of(exc: Exception) -> Optional[int]:
+    """从 requests / urllib / Ark SDK 的异常中取出HTTP状态码"""
+    for attr in ('status_code', 'code'):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def check_status(status_code: int):
+    """拿到响应后调用：限流状态码抛出 ThrottledError"""
+    if status_code in THROTTLE_STATUS:
+        raise ThrottledError(status_code)
+
+
+class Endpoint:
+    """单个外部端点的自适应并发与熔断
+    - AIMD：每次成功并发上限加 1/上限（约每轮加1），限流时减半；请求间隔在限流时加倍、成功时逐步恢复到下限
+    - 熔断：连续失败 failure_threshold 次后断开，reset_timeout 秒后放行一个探测请求，成功则恢复
+    - 重试间隔为带抖动的指数退避
+    """
+    def __init__(self, name: str, max_concurrency: int = 4, min_concurrency: int = 1,
+                 min_interval: float = 0.0, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 base_delay: float = 0.5, max_delay: float = 60.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.min_interval = min_interval
+        self.interval = min_interval
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.in_flight = 0
+        self.state = 'closed'  # closed / open / half_open
+        self.failures = 0
+        self.opened_at = 0.0
+        self.next_start = 0.0  # 下一个请求最早的开始时间
+        self.stats = {'success': 0, 'failure': 0, 'throttled': 0, 'rejected': 0}
+        self.cond = threading.Condition()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（full jitter）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _try_acquire(self) -> Optional[float]:
+        """在持有锁时调用：取得名额返回 None，否则返回需要等待的秒数（并发已满时返回 max_delay，由 release 提前唤醒）"""
+        now = time.monotonic()
+        if self.state == 'open':
+            if now - self.opened_at < self.reset_timeout:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(f"{self.name} 熔断中，{self.reset_timeout - (now - self.opened_at):.0f} 秒后重试")
+            self.state = 'half_open'
+        # 半开状态只放行一个探测请求
+        limit = 1 if self.state == 'half_open' else int(self.limit)
+        if self.in_flight < limit and now >= self.next_start:
+            self.in_flight += 1
+            self.next_start = now + self.interval
+            return None
+        return self.next_start - now if self.in_flight < limit else self.max_delay
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                wait = self._try_acquire()
+                if wait is None:
+                    return
+                self.cond.wait(wait)
+
+    async def acquire_async(self):
+        """协程版 acquire：等待时让出事件循环，不占用线程"""
+        while True:
+            with self.cond:
+                wait = self._try_acquire()
+            if wait is None:
+                return
+            await asyncio.sleep(min(wait, 0.05))
+
+    def release(self, outcome: str):
+        """outcome: success / throttled / failure"""
+        with self.cond:
+            self.in_flight -= 1
+            self.stats[outcome] += 1
+            if outcome == 'success':
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.interval = max(self.min_interval, self.interval * 0.9 - 0.01)
+                # 熔断前发出、熔断后才返回的成功请求不解除熔断；只有半开状态的探测成功才恢复
+                if self.state != 'open':
+                    self.failures = 0
+                if self.state == 'half_open':
+                    self.state = 'closed'
+            else:
+                self.failures += 1
+                if outcome == 'throttled':
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.interval = min(self.max_delay, max(self.interval * 2, self.base_delay))
+                    self.next_start = max(self.next_start, time.monotonic() + self.interval)
+                if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                    if self.state != 'open':
+                        print(f"【熔断】{self.name} 连续失败 {self.failures} 次，暂停 {self.reset_timeout:.0f} 秒")
+                    self.state = 'open'
+                    self.opened_at = time.monotonic()
+            self.cond.notify_all()
+
+    @staticmethod
+    def classify(exc: Exception) -> str:
+        if isinstance(exc, ThrottledError):
+            return 'throttled'
+        return 'throttled' if status_of(exc) in THROTTLE_STATUS else 'failure'
+
+    @contextmanager
+    def slot(self):
+        """占用一个并发名额；块内抛出的异常按限流/失败记录，正常结束记为成功"""
+        self.acquire()
+        try:
+            yield
+        except Exception as e:
+            self.release(self.classify(e))
+            raise
+        else:
+            self.release('success')
+
+    @asynccontextmanager
+    async def slot_async(self):
+        await self.acquire_async()
+        try:
+            yield
+        except Exception as e:
+            self.release(self.classify(e))
+            raise
+        else:
+            self.release('success')
+
+    @staticmethod
+    def _should_retry(exc: Exception, attempt: int, retries: int) -> bool:
+        return attempt < retries - 1 and status_of(exc) not in (400, 401, 404)
+
+    async def call_async(self, func: Callable, *args, retries: int = 3, **kwargs):
+        """协程版 call：func 返回 awaitable"""
+        for attempt in range(retries):
+            try:
+                async with self.slot_async():
+                    return await func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not self._should_retry(e, attempt, retries):
+                    raise
+                delay = self.backoff_delay(attempt)
+                print(f"{self.name} 请求失败 (重试 {attempt + 1}/{retries}，{delay:.1f} 秒后): {e}")
+                await asyncio.sleep(delay)
+
+    def call(self, func: Callable, *args, retries: int = 3, **kwargs):
+        """带退避重试地调用 func；熔断时立即抛出 CircuitOpenError，不消耗重试次数"""
+        for attempt in range(retries):
+            try:
+                with self.slot():
+                    return func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not self._should_retry(e, attempt, retries):
+                    raise
+                delay = self.backoff_delay(attempt)
+                print(f"{self.name} 请求失败 (重试 {attempt + 1}/{retries}，{delay:.1f} 秒后): {e}")
+                time.sleep(delay)
+
+
+class EndpointRegistry:
+    """按名称（baike、proxy、bocha、ark）或政府网站域名管理 Endpoint，同一进程内共享"""
+    def __init__(self, settings: Optional[Dict[str, Dict]] = None, default: Optional[Dict] = None):
+        self.settings = settings or {}
+        self.default = default or {}
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def get(self, name: str) -> Endpoint:
+        with self.lock:
+            if name not in self.endpoints:
+                self.endpoints[name] = Endpoint(name, **self.settings.get(name, self.default))
+            return self.endpoints[name]
+
+    def for_url(self, url: str) -> Endpoint:
+        """政府网站按域名区分，各站点独立限流与熔断"""
+        return self.get(urlparse(url).netloc or url)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """各端点当前的并发上限、请求间隔、熔断状态与计数"""
+        return {
+            name: {'limit': round(endpoint.limit, 2), 'interval': round(endpoint.interval, 2),
+                   'state': endpoint.state, **endpoint.stats}
+            for name, endpoint in self.endpoints.items()
+        }
+
+
+# 各端点的初始参数；未列出的（政府网站域名）使用 default
+endpoints = EndpointRegistry(
+    settings={
+        'baike': {'max_concurrency': 4, 'min_interval': 0.2},
+        'proxy': {'max_concurrency': 1, 'min_interval': 1.0, 'failure_threshold': 3},
+        'bocha': {'max_concurrency': 4, 'failure_threshold': 3, 'reset_timeout': 60},
+        'ark': {'max_concurrency': 8, 'base_delay': 1.0, 'reset_timeout': 60},
+    },
+    default={'max_concurrency': 2, 'min_interval': 1.0},
+)
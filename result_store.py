@@ -0,0 +1,299 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional
+
+
+class ResultStore:
+    """结果存储基类
+    写入先缓存在内存中，达到 batch_size 行或调用 flush/close 时批量写入；
+    has() 用于查重，首次调用时为该列建立内存索引
+    """
+    def __init__(self, columns: List[str], batch_size: int = 50):
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.buffer = []
+        self._indexes = {}
+
+    def add(self, row: Dict):
+        row = {column: row.get(column, '') for column in self.columns}
+        self.buffer.append(row)
+        for column, values in self._indexes.items():
+            values.add(str(row.get(column, '')))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def has(self, column: str, value) -> bool:
+        """是否已有该列等于 value 的行（含未写入的缓存）"""
+        if column not in self._indexes:
+            values = {str(row.get(column, '')) for row in self._iter_stored()}
+            values.update(str(row.get(column, '')) for row in self.buffer)
+            self._indexes[column] = values
+        return str(value) in self._indexes[column]
+
+    def query(self, **filters) -> List[Dict]:
+        """按列等值查询（含未写入的缓存），如 query(部门='教育厅')"""
+        self.flush()
+        return [row for row in self._iter_stored()
+                if all(str(row.get(column, '')) == str(value) for column, value in filters.items())]
+
+    def flush(self):
+        if self.buffer:
+            self._write(self.buffer)
+            self.buffer = []
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """逐行返回全部结果（先写入缓存）"""
+        self.flush()
+        return self._iter_stored()
+
+    def export_csv(self, path: str):
+        """导出为CSV（utf-8-sig，可直接用Excel打开）"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction='ignore')
+            writer.writeheader()
+            for row in self.iter_rows():
+                writer.writerow(row)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, rows: List[Dict]):
+        raise NotImplementedError
+
+    def _iter_stored(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+
+class CsvResultStore(ResultStore):
+    """CSV存储：每次 flush 以追加方式写入一批行
+    追加到已有文件时按文件表头的列顺序写入；表头与当前列不一致（如调整了统计年份）时拒绝追加，避免错位
+    """
+    def __init__(self, path: str, columns: List[str], batch_size: int = 50):
+        super().__init__(columns, batch_size)
+        self.path = path
+        header = self._read_header()
+        if header:
+            if set(header) != set(self.columns):
+                missing = [c for c in self.columns if c not in header]
+                extra = [c for c in header if c not in self.columns]
+                raise ValueError(
+                    f"{path} 的表头与当前列不一致（缺少 {missing}，多出 {extra}），"
+                    f"请换一个输出文件或使用 .db 存储（可自动补充新列）"
+                )
+            self.columns = header
+
+    def _read_header(self) -> List[str]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+
+    def _write(self, rows: List[Dict]):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        write_header = not self._read_header()
+        with open(self.path, 'a', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns)
+            if write_header:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def _iter_stored(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+
+
+class SQLiteResultStore(ResultStore):
+    """SQLite存储：WAL模式下多个进程可同时追加；姓名、省份、部门列建索引，查询无需读取全表"""
+    INDEX_COLUMNS = ('姓名', '省份', '部门')
+
+    def __init__(self, path: str, columns: List[str], table: str = 'results', batch_size: int = 200):
+        super().__init__(columns, batch_size)
+        if not self.columns:
+            raise ValueError(f"{path} 中没有表 {table}（已有的表：{', '.join(sqlite_tables(path)) or '无'}）")
+        self.path = path
+        self.table = table
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        column_defs = ', '.join(f'"{column}" TEXT' for column in self.columns)
+        with self.conn:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({column_defs})')
+            existing = {row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')}
+            # 年份范围调整后补充新增的列
+            for column in self.columns:
+                if column not in existing:
+                    self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" TEXT')
+            for column in self.INDEX_COLUMNS:
+                if column in self.columns:
+                    self.conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{table}_{column}" ON "{table}" ("{column}")'
+                    )
+
+    def _write(self, rows: List[Dict]):
+        names = ', '.join(f'"{column}"' for column in self.columns)
+        marks = ', '.join('?' for _ in self.columns)
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT INTO "{self.table}" ({names}) VALUES ({marks})',
+                [tuple(row[column] for column in self.columns) for row in rows]
+            )
+
+    def has(self, column: str, value) -> bool:
+        # 有索引的列直接查询，不在内存中建立全表索引
+        if column not in self.INDEX_COLUMNS:
+            return super().has(column, value)
+        if any(str(row.get(column, '')) == str(value) for row in self.buffer):
+            return True
+        cursor = self.conn.execute(f'SELECT 1 FROM "{self.table}" WHERE "{column}" = ? LIMIT 1', (str(value),))
+        return cursor.fetchone() is not None
+
+    def query(self, **filters) -> List[Dict]:
+        """按列等值查询，如 query(省份='内蒙古', 部门='教育厅')"""
+        self.flush()
+        where = ' AND '.join(f'"{column}" = ?' for column in filters) or '1'
+        cursor = self.conn.execute(f'SELECT * FROM "{self.table}" WHERE {where}', tuple(filters.values()))
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def _iter_stored(self) -> Iterator[Dict]:
+        cursor = self.conn.execute(f'SELECT * FROM "{self.table}"')
+        names = [d[0] for d in cursor.description]
+        for row in cursor:
+            yield {name: ('' if value is None else value) for name, value in zip(names, row)}
+
+    def close(self):
+        super().close()
+        self.conn.close()
+
+
+class ParquetResultStore(ResultStore):
+    """Parquet存储：每次 flush 写入一个分片文件（文件名含进程号，多进程写入互不冲突），读取时合并目录下全部分片"""
+    def __init__(self, path: str, columns: List[str], batch_size: int = 1000):
+        super().__init__(columns, batch_size)
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet存储需要安装 pyarrow: pip install pyarrow")
+        self.path = path
+        self.sequence = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _write(self, rows: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pydict(
+            {column: [str(row[column]) for row in rows] for column in self.columns}
+        )
+        self.sequence += 1
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self.sequence:05d}.parquet"
+        tmp_path = os.path.join(self.path, '.' + name)
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def _iter_stored(self) -> Iterator[Dict]:
+        import pyarrow.parquet as pq
+
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith('.parquet') or name.startswith('.'):
+                continue
+            for batch in pq.ParquetFile(os.path.join(self.path, name)).iter_batches():
+                for row in batch.to_pylist():
+                    yield {column: row.get(column) or '' for column in self.columns}
+
+
+def open_store(path: str, columns: List[str], table: str = 'results',
+               batch_size: Optional[int] = None) -> ResultStore:
+    """按路径后缀选择存储：.db/.sqlite 为SQLite，.parquet 为Parquet目录，其余为CSV"""
+    options = {'batch_size': batch_size} if batch_size else {}
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteResultStore(path, columns, table=table, **options)
+    if ext == '.parquet':
+        return ParquetResultStore(path, columns, **options)
+    return CsvResultStore(path, columns, **options)
+
+
+def is_sqlite(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3')
+
+
+def sqlite_tables(path: str) -> List[str]:
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+    finally:
+        conn.close()
+
+
+def resolve_table(path: str, table: Optional[str] = None) -> Optional[str]:
+    """SQLite存储中要读取的表：未指定时取库中唯一的表；表不存在时抛出 ValueError"""
+    if not is_sqlite(path):
+        return table
+    tables = sqlite_tables(path)
+    if table is None:
+        if len(tables) != 1:
+            raise ValueError(f"{path} 中有 {len(tables)} 个表（{', '.join(tables) or '无'}），请用 --table 指定")
+        return tables[0]
+    if table not in tables:
+        raise ValueError(f"{path} 中没有表 {table}（已有的表：{', '.join(tables) or '无'}）")
+    return table
+
+
+def _read_columns(path: str, table: str) -> List[str]:
+    """读取已有存储的列名（导出时使用）"""
+    if is_sqlite(path):
+        resolve_table(path, table)  # 表不存在时抛出
+        conn = sqlite3.connect(path)
+        try:
+            return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        finally:
+            conn.close()
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        import pyarrow.parquet as pq
+        parts = sorted(n for n in os.listdir(path) if n.endswith('.parquet') and not n.startswith('.'))
+        return pq.read_schema(os.path.join(path, parts[0])).names if parts else []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def iter_store_rows(path: str, table: str = 'results') -> Iterator[Dict]:
+    """逐行读取任意格式的已有结果"""
+    store = open_store(path, _read_columns(path, table), table=table)
+    try:
+        yield from store.iter_rows()
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='将结果存储导出为CSV')
+    parser.add_argument('source', help='结果存储路径（.db/.sqlite、.parquet 目录或 .csv）')
+    parser.add_argument('output', help='导出的CSV路径')
+    parser.add_argument('--table', default=None, help='SQLite表名（gov_leaders / baike_results），库中只有一个表时可省略')
+    args = parser.parse_args()
+
+    table = resolve_table(args.source, args.table) or 'results'
+    store = open_store(args.source, _read_columns(args.source, table), table=table)
+    store.export_csv(args.output)
+    store.close()
+    print(f"已导出到 {args.output}")
@@ -0,0 +1,52 @@
+import pandas as pd
+
+from analytics import CareerMatrix
+
+
+def frame():
+    rows = [
+        # 甲：副厅 -> 正厅（中间缺一年）-> 调往河北
+        {'姓名': '甲', '省份': '内蒙古', '部门': '教育厅',
+         '2016职位': '副厅长', '2016职级': '副厅级', '2016地点': '内蒙古自治区',
+         '2017职位': '', '2017职级': '', '2017地点': '',
+         '2018职位': '厅长', '2018职级': '正厅', '2018地点': '内蒙古自治区',
+         '2019职位': '副省长', '2019职级': '副部级', '2019地点': '河北省'},
+        # 乙：职级不变
+        {'姓名': '乙', '省份': '内蒙古', '部门': '财政厅',
+         '2016职位': '厅长', '2016职级': '正厅级', '2016地点': '内蒙古自治区',
+         '2017职位': '厅长', '2017职级': '正厅级', '2017地点': '内蒙古自治区',
+         '2018职位': '厅长', '2018职级': '正厅级', '2018地点': '内蒙古自治区',
+         '2019职位': '巡视员', '2019职级': '未知', '2019地点': '内蒙古自治区'},
+    ]
+    return CareerMatrix.from_frame(pd.DataFrame(rows))
+
+
+def test_level_codes_normalize_and_skip_unknown():
+    matrix = frame()
+    assert matrix.levels.tolist() == [[5, -1, 4, 3], [4, 4, 4, -1]]
+
+
+def test_level_changes_skip_missing_years():
+    changes = frame().level_changes().set_index('姓名')
+    assert changes.loc['甲', '晋升次数'] == 2
+    assert changes.loc['甲', '降级次数'] == 0
+    assert changes.loc['甲', '跨省调动次数'] == 1
+    assert changes.loc['甲', '最高职级'] == '副部级'
+    assert changes.loc['乙', '晋升次数'] == 0
+    assert changes.loc['乙', '最新职级'] == '正厅级'
+
+
+def test_transitions_and_flows():
+    matrix = frame()
+    by_year = matrix.transitions_by_year()
+    assert by_year[['年份', '原职级', '新职级']].values.tolist() == [
+        [2018, '副厅级', '正厅级'], [2019, '正厅级', '副部级']]
+    assert matrix.transition_matrix().loc['正厅级', '正厅级'] == 2
+    flows = matrix.province_flows()
+    assert flows[['年份', '调出省份', '调入省份', '人数']].values.tolist() == [[2019, '内蒙古', '河北', 1]]
+
+
+def test_rank_spells_mark_censoring():
+    spells = frame().rank_spells()
+    yi = spells[spells['姓名'] == '乙'].iloc[0]
+    assert (yi['职级'], yi['起始年份'], yi['年数'], yi['左删失'], yi['右删失']) == ('正厅级', 2016, 3, True, False)
@@ -0,0 +1,37 @@
+from lxml import etree
+
+from baike_crawler import BaikePageParser
+
+PAGE = """
+<html><body>
+<div class="basicInfo_a1"><dl>
+  <dt class="itemName_x">性别</dt><dd class="itemValue_y"><span class="text_z">男</span></dd>
+  <dt class="itemName_x">民族</dt><dd class="itemValue_y"><span class="text_z">汉族</span></dd>
+</dl></div>
+<div class="paraTitle_b level-1_c"><h2>早年经历</h2></div>
+<div class="para_d"><span class="text_e">1980年出生</span></div>
+<div class="paraTitle_b level-1_c"><h2>人物履历</h2></div>
+<div class="para_d"><span class="text_e">2016.03—2018.05 任教育厅厅长</span></div>
+<!-- 注释 -->
+<div class="paraTitle_b level-2_c"><h3>小标题</h3></div>
+<div class="para_d"><span class="text_e">2018.05— 任副省长</span></div>
+<div class="paraTitle_b level-1_c"><h2>社会任职</h2></div>
+<div class="para_d"><span class="text_e">不应出现</span></div>
+</body></html>
+"""
+
+
+def parse(text):
+    return etree.HTML(text)
+
+
+def test_career_stops_at_next_level1_title():
+    assert BaikePageParser.extract_career(parse(PAGE)) == ['2016.03—2018.05 任教育厅厅长', '2018.05— 任副省长']
+
+
+def test_basic_info_alternates_name_and_value():
+    assert BaikePageParser.extract_basic_info(parse(PAGE)) == ['性别', '男', '民族', '汉族']
+
+
+def test_page_without_career_section():
+    assert BaikePageParser.extract_career(parse('<html><body><p>无</p></body></html>')) == []
@@ -0,0 +1,56 @@
+import json
+import re
+
+from baike_crawler import GPTHelper, PersonInfo, estimate_tokens
+
+
+class FakeGPT(GPTHelper):
+    """按提示词中的人物编号返回结果；omit 中的编号在批量回复里缺失"""
+    def __init__(self, omit=()):
+        self.omit = set(omit)
+        self.prompts = []
+        self.single = []
+
+    def call_gpt(self, prompt, kind='call_gpt'):
+        self.prompts.append(prompt)
+        return json.dumps([{'id': f"P{i}", 'positions': [{'year': 2020, 'position': f"职务{i}"}]}
+                           for i in re.findall(r'【人物 P(\d+)】', prompt) if int(i) not in self.omit])
+
+    def call_gpt_many(self, prompts, kind='call_gpt'):
+        return [self.call_gpt(prompt, kind) for prompt in prompts]
+
+    def extract_info(self, baidu_content, person):
+        self.single.append(person.name)
+        return {'positions': [{'year': 2020, 'position': f"单独{person.name}"}]}
+
+
+def items(count, text='2016.03—2018.05 任教育厅厅长'):
+    return [(text, PersonInfo(f"人物{i}", '厅长', '', '内蒙古', '教育厅')) for i in range(count)]
+
+
+def test_pack_batches_respects_person_limit():
+    batches = GPTHelper.pack_batches(items(7), token_budget=100000, max_persons=3)
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_pack_batches_respects_token_budget():
+    long_items = items(3, text='履' * 3000)
+    preamble_budget = estimate_tokens(long_items[0][0]) * 2
+    batches = GPTHelper.pack_batches(long_items, token_budget=preamble_budget, max_persons=10)
+    # 规则本身已占用部分预算，每人只能独占一组
+    assert batches == [[0], [1], [2]]
+
+
+def test_extract_batch_maps_results_by_id():
+    gpt = FakeGPT()
+    results = gpt.extract_batch(items(3))
+    assert [r['positions'][0]['position'] for r in results] == ['职务0', '职务1', '职务2']
+    assert gpt.single == []
+
+
+def test_extract_batch_retries_missing_ids():
+    gpt = FakeGPT(omit={1})
+    results = gpt.extract_batch(items(3))
+    assert gpt.single == ['人物1']
+    assert results[1]['positions'][0]['position'] == '单独人物1'
+    assert results[0]['positions'][0]['position'] == '职务0'
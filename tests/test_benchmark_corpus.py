@@ -0,0 +1,33 @@
+import os
+import sys
+
+from lxml import etree
+
+from baike_crawler import BaikePageParser, PersonInfo, ResumeParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from corpus import Corpus, baike_url, load_or_generate  # noqa: E402
+
+
+def test_generation_is_repeatable_and_round_trips(tmp_path):
+    corpus = Corpus.generate(leaders=3, noise=10)
+    assert Corpus.generate(leaders=3, noise=10).gov_pages == corpus.gov_pages
+    corpus.save(str(tmp_path))
+    loaded = load_or_generate(str(tmp_path), leaders=5)
+    assert loaded.gov_pages == corpus.gov_pages
+    assert loaded.baike_pages == corpus.baike_pages
+    assert loaded.persons == corpus.persons
+
+
+def test_baike_pages_end_with_the_current_post():
+    corpus = Corpus.generate(leaders=1, noise=0)
+    row = corpus.persons[0]
+    career = BaikePageParser.extract_career(etree.HTML(corpus.baike_pages[baike_url(row['姓名'])]))
+    assert career[-1].startswith('2022.03— 任')
+
+    person = PersonInfo(row['姓名'], row['职务'], row['简历'], row['省份'], row['部门'])
+    result = ResumeParser(years=range(2016, 2025)).parse('\n'.join(career), person)
+    title = '、'.join(row['职务'].split())
+    assert result['positions'][2024]['position'].endswith(title)
+    assert result['positions'][2016]['position'].endswith('副处长')
+    assert result['missing_years'] == []
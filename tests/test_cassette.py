@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from cassette import Cassette, CassetteMissError
+
+
+def test_replay_returns_recorded_responses_without_calling(tmp_path):
+    path = os.path.join(tmp_path, 'cassette.db')
+    recorder = Cassette()
+    recorder.open(path, 'record')
+    assert recorder.through_text('page', 'http://a.gov.cn/', lambda: '<html>领导</html>') == '<html>领导</html>'
+    assert recorder.through_text('page', 'http://a.gov.cn/404', lambda: None) is None
+    assert recorder.through_json('bocha', '张三', lambda: [{'url': 'u'}]) == [{'url': 'u'}]
+    recorder.close()
+
+    player = Cassette()
+    player.open(path, 'replay')
+
+    def offline():
+        raise AssertionError('回放时不应发出请求')
+
+    assert player.through_text('page', 'http://a.gov.cn/', offline) == '<html>领导</html>'
+    assert player.through_text('page', 'http://a.gov.cn/404', offline) is None
+    assert player.through_json('bocha', '张三', offline) == [{'url': 'u'}]
+    with pytest.raises(CassetteMissError):
+        player.through_text('page', 'http://b.gov.cn/', offline)
+    assert player.stats == {'recorded': 0, 'replayed': 3, 'missed': 1}
+    assert player.summary()['page']['records'] == 2
+    player.close()
+
+
+def test_off_mode_passes_through():
+    recorder = Cassette()
+    recorder.open(None, 'off')
+    assert recorder.through_text('page', 'u', lambda: 'x') == 'x'
+    assert recorder.state_path('./results/level_memo.json') == './results/level_memo.json'
+    with pytest.raises(ValueError):
+        recorder.open(None, 'rewind')
+
+
+def test_state_path_is_cleared_once_per_process(tmp_path):
+    path = os.path.join(tmp_path, 'cassette.db')
+    recorder = Cassette()
+    recorder.open(path, 'replay')
+    state = os.path.join(path + '.replay', 'search_cache.db')
+    for name in (state, state + '-wal'):
+        with open(name, 'w') as f:
+            f.write('上次运行')
+    os.makedirs(os.path.join(path + '.replay', 'results'))
+
+    assert recorder.state_path('./results/search_cache.db') == state
+    assert not os.path.exists(state) and not os.path.exists(state + '-wal')
+    assert recorder.state_path('./results/') == os.path.join(path + '.replay', 'results')
+    assert not os.path.exists(os.path.join(path + '.replay', 'results'))
+
+    # 同一进程中再次使用（如流水线的第二阶段）不会清掉前一阶段写入的内容
+    with open(state, 'w') as f:
+        f.write('本次运行')
+    assert recorder.state_path('./results/search_cache.db') == state
+    assert os.path.exists(state)
+    recorder.close()
@@ -0,0 +1,36 @@
+from baike_crawler import Config, ContentValidator, LemmaDisambiguator, PersonInfo
+
+
+def person():
+    return PersonInfo('张三', '自治区教育厅厅长', '', '内蒙古自治区', '内蒙古自治区教育厅')
+
+
+def test_score_weights_province_and_department():
+    disambiguator = LemmaDisambiguator(ContentValidator())
+    assert disambiguator.score('内蒙古自治区教育厅厅长', person()) >= 6
+    assert disambiguator.score('演员，代表作品若干', person()) == 0
+
+
+def test_matches_requires_province_or_department():
+    disambiguator = LemmaDisambiguator(ContentValidator())
+    assert Config.DISAMBIGUATION_MIN_SCORE == 3
+    assert disambiguator.matches('内蒙古自治区官员', person())
+    assert not disambiguator.matches('某公司厅长', person())
+
+
+def test_best_candidate_picks_highest_score():
+    disambiguator = LemmaDisambiguator(ContentValidator())
+    candidates = [
+        {'url': '/item/张三/1', 'description': '中国内地男演员', 'current': True},
+        {'url': '/item/张三/2', 'description': '内蒙古自治区教育厅厅长', 'current': False},
+        {'url': '/item/张三/3', 'description': '内蒙古自治区某县农民', 'current': False},
+    ]
+    best = disambiguator.best_candidate(candidates, person())
+    assert best['url'] == '/item/张三/2'
+    assert candidates[0]['score'] == 0
+
+
+def test_best_candidate_below_threshold():
+    disambiguator = LemmaDisambiguator(ContentValidator())
+    candidates = [{'url': '/item/张三/1', 'description': '中国内地男演员', 'current': True}]
+    assert disambiguator.best_candidate(candidates, person()) is None
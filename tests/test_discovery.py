@@ -0,0 +1,57 @@
+from discovery import LeadershipDiscovery
+
+LEADER_PAGE = '<html><title>领导信息</title><body>姓名：张三 职务：厅长 简历：1970年出生</body></html>'.encode('utf-8')
+EMPTY_PAGE = '<html><title>首页</title><body>新闻</body></html>'.encode('utf-8')
+
+
+class FakeSite:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def __call__(self, url):
+        self.requests.append(url)
+        return self.pages.get(url)
+
+
+def sitemap(*urls):
+    return ('<urlset>' + ''.join(f"<url><loc>{url}</loc></url>" for url in urls) + '</urlset>').encode('utf-8')
+
+
+def test_sitemap_candidates_must_be_under_the_department_path():
+    site = FakeSite({
+        'https://www.nmg.gov.cn/robots.txt': b'Sitemap: https://www.nmg.gov.cn/map.xml\n',
+        'https://www.nmg.gov.cn/map.xml': sitemap('https://www.nmg.gov.cn/fgwxx/ldxx/',
+                                                  'https://www.nmg.gov.cn/fgw/zwgk/ldxx/'),
+        'https://www.nmg.gov.cn/fgwxx/ldxx/': LEADER_PAGE,
+        'https://www.nmg.gov.cn/fgw/zwgk/ldxx/': LEADER_PAGE,
+    })
+    discovery = LeadershipDiscovery(site)
+    found = discovery.discover('https://www.nmg.gov.cn/fgw/')
+    assert [url for url, _ in found] == ['https://www.nmg.gov.cn/fgw/zwgk/ldxx/']
+    assert 'https://www.nmg.gov.cn/fgwxx/ldxx/' not in site.requests
+    # sitemap 命中页相对部门首页的路径在后续部门中优先探测
+    assert discovery.snapshot() == {'zwgk/ldxx/': 1}
+    assert discovery.probe_urls('https://www.nmg.gov.cn/jyt/')[0][0] == 'zwgk/ldxx/'
+
+
+def test_probe_respects_robots_and_rejects_soft_404():
+    site = FakeSite({
+        'https://jyt.nmg.gov.cn/robots.txt': b'User-agent: *\nDisallow: /zfxxgk/\n',
+        'https://jyt.nmg.gov.cn/zwgk/zfxxgk/fdzdgknr/jgxx/ldxx/': EMPTY_PAGE,
+        'https://jyt.nmg.gov.cn/xxgk/fdzdgknr/jgxx/ldxx/': LEADER_PAGE,
+    })
+    discovery = LeadershipDiscovery(site)
+    found = discovery.discover('https://jyt.nmg.gov.cn/')
+    assert [url for url, _ in found] == ['https://jyt.nmg.gov.cn/xxgk/fdzdgknr/jgxx/ldxx/']
+    assert 'https://jyt.nmg.gov.cn/zfxxgk/fdzdgknr/jgxx/ldxx/' not in site.requests
+
+
+def test_hosts_without_hits_are_skipped_after_repeated_misses():
+    site = FakeSite({})
+    discovery = LeadershipDiscovery(site, max_host_misses=2)
+    for name in ('jyt', 'czt'):
+        assert discovery.discover(f"https://www.nmg.gov.cn/{name}/") == []
+    before = len(site.requests)
+    assert discovery.discover('https://www.nmg.gov.cn/sjt/') == []
+    assert len(site.requests) == before
@@ -0,0 +1,47 @@
+import argparse
+import csv
+import os
+
+import pytest
+
+from baike_crawler import DataProcessor, parse_shard
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = os.path.join(tmp_path, 'input.csv')
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=['姓名', '职务', '简历', '省份', '部门'])
+        writer.writeheader()
+        for i in range(10):
+            writer.writerow({'姓名': f"人物{i}", '职务': '厅长', '简历': '', '省份': '内蒙古', '部门': '教育厅'})
+    return path
+
+
+def names(rows):
+    return [row['姓名'] for row in rows]
+
+
+def test_start_and_stop(input_file):
+    assert names(DataProcessor.iter_input_rows(input_file, 3, 6)) == ['人物3', '人物4', '人物5']
+    assert names(DataProcessor.iter_input_rows(input_file, 8)) == ['人物8', '人物9']
+
+
+def test_shards_cover_every_row_once(input_file):
+    shards = [names(DataProcessor.iter_input_rows(input_file, shard=(i, 3))) for i in range(3)]
+    assert shards[1] == ['人物1', '人物4', '人物7']
+    assert sorted(sum(shards, [])) == sorted(names(DataProcessor.iter_input_rows(input_file)))
+
+
+def test_shard_within_range(input_file):
+    assert names(DataProcessor.iter_input_rows(input_file, 2, 8, shard=(0, 2))) == ['人物2', '人物4', '人物6']
+
+
+@pytest.mark.parametrize('value', ['1', '2/2', '-1/3', 'a/b'])
+def test_parse_shard_rejects_bad_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_parse_shard():
+    assert parse_shard('1/4') == (1, 4)
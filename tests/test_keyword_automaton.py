@@ -0,0 +1,26 @@
+from baike_crawler import ContentValidator, KeywordAutomaton, PersonInfo
+
+
+def test_overlapping_patterns():
+    automaton = KeywordAutomaton(['he', 'she', 'his', 'hers'])
+    assert sorted(automaton.iter_matches('ushers')) == [(1, 'she'), (2, 'he'), (2, 'hers')]
+
+
+def test_find_all_chinese_terms():
+    automaton = KeywordAutomaton(['内蒙古', '内蒙古自治区', '教育厅', '厅长', ''])
+    assert automaton.find_all('内蒙古自治区教育厅厅长') == {'内蒙古', '内蒙古自治区', '教育厅', '厅长'}
+    assert automaton.find_all('河北省') == set()
+
+
+def test_segment_keeps_gazetteer_terms_whole():
+    validator = ContentValidator()
+    terms = validator._segment('教育厅厅长')
+    assert terms.get('教育厅') == 'department'
+
+
+def test_validate_by_keywords():
+    validator = ContentValidator()
+    person = PersonInfo('张三', '教育厅厅长', '', '内蒙古自治区', '内蒙古自治区教育厅')
+    assert validator.validate_by_keywords('张三，内蒙古自治区教育厅厅长', person)
+    assert not validator.validate_by_keywords('张三，演员', person)
+    assert not validator.is_plausible('张三，演员', person)
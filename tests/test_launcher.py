@@ -0,0 +1,38 @@
+import os
+
+from gov_crawler import GovInfoCrawler
+from launcher import merge_shards
+from result_store import iter_store_rows, open_store
+
+
+def write_shard(root, name, rows, no_leader=()):
+    folder = os.path.join(root, name)
+    os.makedirs(folder)
+    with open_store(os.path.join(folder, '内蒙古领导爬取.csv'), GovInfoCrawler.HEADERS, table='gov_leaders') as store:
+        store.add_many(rows)
+    if no_leader:
+        with open(os.path.join(folder, 'no_leader_departments.txt'), 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{line}\n" for line in no_leader))
+
+
+def leader(name, department, position='', resume=''):
+    return {'姓名': name, '职务': position, '简历': resume, '省份': '内蒙古', '部门': department}
+
+
+def test_merge_deduplicates_and_fills_empty_fields(tmp_path):
+    shard_root, folder = os.path.join(tmp_path, 'shards'), os.path.join(tmp_path, 'results')
+    write_shard(shard_root, '内蒙古_0', [leader('张三', '教育厅', '厅长'), leader('李四', '财政厅', '厅长')],
+                no_leader=['内蒙古,统计局'])
+    write_shard(shard_root, '内蒙古_1', [leader('张三', '教育厅', '厅长', '1970年出生')],
+                no_leader=['内蒙古,统计局', '内蒙古,审计厅'])
+
+    assert merge_shards(shard_root, folder, 'csv') == {'内蒙古': 2}
+    rows = list(iter_store_rows(os.path.join(folder, '内蒙古领导爬取.csv'), table='gov_leaders'))
+    assert [(row['姓名'], row['简历']) for row in rows] == [('张三', '1970年出生'), ('李四', '')]
+    with open(os.path.join(folder, 'no_leader_departments.txt'), encoding='utf-8') as f:
+        assert f.read().splitlines() == ['内蒙古,统计局', '内蒙古,审计厅']
+
+    # 重复合并不会写入已存在的人员
+    assert merge_shards(shard_root, folder, 'csv') == {'内蒙古': 0}
+    with open(os.path.join(folder, 'no_leader_departments.txt'), encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 2
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from baike_crawler import LevelClassifier
+
+
+class FakeGPT:
+    def __init__(self, answers):
+        self.answers = answers
+        self.asked = []
+
+    def classify_levels(self, titles):
+        self.asked.append(list(titles))
+        return {title: self.answers.get(title, '') for title in titles}
+
+
+@pytest.mark.parametrize('title, level', [
+    ('中共中央政治局常委、国务院总理', '正国级'),
+    ('全国人大常委会副委员长', '副国级'),
+    ('吉林省委书记', '正部级'),
+    ('北京市市长', '正部级'),
+    ('内蒙古自治区副主席', '副部级'),
+    ('新疆维吾尔自治区党委副书记', '副部级'),
+    ('长春市委书记', '副部级'),
+    ('吉林市委书记', '正厅级'),
+    ('吉林市市长', '正厅级'),
+    ('海南藏族自治州州长', '正厅级'),
+    ('内蒙古自治区教育厅厅长', '正厅级'),
+    ('内蒙古自治区教育厅副厅长', '副厅级'),
+    ('呼和浩特市委常委', '副厅级'),
+    ('某县县长', '正处级'),
+    ('内蒙古自治区人民政府副秘书长、办公厅主任', '正厅级'),
+    ('某公司总经理', ''),
+])
+def test_rules(title, level):
+    assert LevelClassifier(FakeGPT({}), memo_file='').classify_by_rules(title) == level
+
+
+def test_prefecture_named_like_a_province_is_not_provincial():
+    classifier = LevelClassifier(FakeGPT({}), memo_file='')
+    assert classifier.normalize('吉林市委书记') == '〈市〉委书记'
+    assert classifier.normalize('吉林省委书记') == '〈省〉委书记'
+
+
+def test_memo_is_keyed_by_normalized_title(tmp_path):
+    memo_file = str(tmp_path / 'memo.json')
+    gpt = FakeGPT({'河北省档案馆馆长': '正厅级'})
+    classifier = LevelClassifier(gpt, memo_file=memo_file)
+    assert classifier.classify(['河北省档案馆馆长', '吉林省委书记']) == {
+        '河北省档案馆馆长': '正厅级', '吉林省委书记': '正部级'}
+    assert gpt.asked == [['河北省档案馆馆长']]
+
+    # 换一个省份的同一职务命中缓存，不再询问GPT
+    reloaded = LevelClassifier(gpt, memo_file=memo_file)
+    assert reloaded.classify(['山西省档案馆馆长']) == {'山西省档案馆馆长': '正厅级'}
+    assert gpt.asked == [['河北省档案馆馆长']]
+    with open(memo_file, encoding='utf-8') as f:
+        assert json.load(f) == {'〈省〉档案馆馆长': '正厅级'}
+
+
+def test_rule_titles_and_invalid_levels_are_not_memoized():
+    classifier = LevelClassifier(FakeGPT({}), memo_file='')
+    classifier.remember('吉林省委书记', '正部级')
+    classifier.remember('某协会会长', '很高')
+    assert classifier.memo == {}
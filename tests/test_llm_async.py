@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from llm_async import AsyncLLM
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.prompts = []
+
+    async def create(self, model, messages, stream=False):
+        prompt = messages[0]['content']
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f" 回复:{prompt} "))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+        self.closed = 0
+
+    async def close(self):
+        self.closed += 1
+
+
+def test_identical_prompts_in_flight_are_coalesced():
+    client = FakeClient()
+    llm = AsyncLLM('', 'model', client=client)
+    replies = asyncio.run(llm.map(['甲', '乙', '甲', '甲']))
+    assert replies == ['回复:甲', '回复:乙', '回复:甲', '回复:甲']
+    assert sorted(client.chat.completions.prompts) == ['乙', '甲']
+    assert llm.stats == {'requests': 2, 'coalesced': 2}
+
+
+def test_sync_calls_share_the_background_loop_and_close_is_idempotent():
+    client = FakeClient()
+    llm = AsyncLLM('', 'model', client=client)
+    assert llm.complete_sync('甲', timeout=5) == '回复:甲'
+    loop = llm.loop
+    assert llm.map_sync(['乙', '丙'], timeout=5) == ['回复:乙', '回复:丙']
+    assert llm.loop is loop
+
+    llm.close()
+    llm.close()
+    assert client.closed == 1
+    assert llm.loop is None
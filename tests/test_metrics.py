@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from metrics import Histogram, Metrics, escape_label
+
+
+def test_escape_label():
+    assert escape_label('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+    assert escape_label(3) == '3'
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    hist = Histogram(buckets=(1, 2, float('inf')))
+    for value in (0.5, 0.5, 1.5, 7):
+        hist.observe(value)
+    assert hist.quantile(0.5) == 1
+    assert hist.quantile(0.75) == 2
+    assert hist.quantile(1) == 7
+
+
+def test_timer_counts_errors_and_prometheus_escapes_labels():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.timer('fetch', host='a"b'):
+            raise ValueError()
+    text = metrics.prometheus_text()
+    assert 'crawler_stage_errors_total{host="a\\"b",stage="fetch"} 1' in text
+    assert 'crawler_stage_seconds_count{host="a\\"b",stage="fetch"} 1' in text
+
+
+def test_summary_tokens_and_cache_hit_rate():
+    metrics = Metrics()
+    metrics.record_usage('extract', {'prompt_tokens': 100, 'completion_tokens': 20})
+    metrics.record_usage('extract', {'prompt_tokens': 50, 'completion_tokens': 10})
+    metrics.record_usage('extract', None)
+    metrics.cache('search', True)
+    metrics.cache('search', False)
+    metrics.cache('search', True)
+    summary = metrics.summary()
+    assert summary['llm_tokens'] == {'extract': {'calls': 2, 'prompt': 150, 'completion': 30}}
+    assert summary['caches']['search'] == {'hit': 2, 'miss': 1, 'hit_rate': 0.6667}
+
+
+def test_bound_labels_separate_pipeline_stages():
+    metrics = Metrics()
+    summaries = {}
+
+    def stage(component, pages):
+        metrics.bind(component=component)
+        for _ in range(pages):
+            metrics.inc('pages')
+        metrics.record_usage('extract', {'prompt_tokens': pages})
+        summaries[component] = metrics.summary()
+
+    threads = [threading.Thread(target=stage, args=args) for args in (('gov', 2), ('baike', 3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert summaries['gov']['counters'] == {'pages,component=gov': 2}
+    assert summaries['baike']['counters'] == {'pages,component=baike': 3}
+    assert summaries['baike']['llm_tokens'] == {'extract': {'calls': 1, 'prompt': 3}}
+    # 未绑定标签的线程看到全部阶段，同一任务的用量相加
+    assert metrics.summary()['llm_tokens'] == {'extract': {'calls': 2, 'prompt': 5}}
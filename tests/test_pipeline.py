@@ -0,0 +1,66 @@
+import csv
+import os
+
+from gov_crawler import GovInfoCrawler
+from pipeline import StreamingPipeline
+
+
+class FakeCrawler:
+    def __init__(self, departments, error=None):
+        self.departments = departments
+        self.error = error
+
+    def main(self, on_department_results=None):
+        for rows in self.departments:
+            on_department_results(rows)
+        if self.error:
+            raise self.error
+
+
+class FakeProcessor:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.processed = []
+        self.finished = False
+
+    def check_duplicate(self, person):
+        return person.name in self.existing
+
+    def process_person(self, person):
+        self.processed.append((person.name, person.department))
+
+    def finish(self):
+        self.finished = True
+
+
+def leader(name, department='教育厅'):
+    return {'姓名': name, '职务': '厅长', '简历': '', '省份': '内蒙古', '部门': department}
+
+
+def test_rows_are_enriched_in_order_and_duplicates_skipped():
+    crawler = FakeCrawler([[leader('甲'), leader('乙')], [{'姓名': ''}, 'bad', leader('丙', '财政厅')]])
+    processor = FakeProcessor(existing={'乙'})
+    assert StreamingPipeline(crawler, processor, queue_size=1).run()
+    assert processor.processed == [('甲', '教育厅'), ('丙', '财政厅')]
+    assert processor.finished
+
+
+def test_crawler_error_still_finishes_the_consumer():
+    crawler = FakeCrawler([[leader('甲')]], error=RuntimeError('网络错误'))
+    processor = FakeProcessor()
+    assert not StreamingPipeline(crawler, processor).run()
+    assert processor.processed == [('甲', '教育厅')]
+    assert processor.finished
+
+
+def test_crawled_department_returns_its_stored_leaders(tmp_path):
+    path = os.path.join(tmp_path, '内蒙古领导爬取.csv')
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=['姓名', '职务', '简历', '省份', '部门'])
+        writer.writeheader()
+        writer.writerows([leader('甲'), leader('乙', '财政厅'), leader('丙')])
+
+    crawler = GovInfoCrawler.__new__(GovInfoCrawler)
+    crawler.folder, crawler.store_format, crawler.stores = str(tmp_path), 'csv', {}
+    rows = crawler.process_department('https://example.gov.cn/jyt/', '内蒙古', '教育厅')
+    assert [row['姓名'] for row in rows] == ['甲', '丙']
@@ -0,0 +1,44 @@
+import asyncio
+import json
+import os
+import time
+
+from profiling import Profiler
+
+
+def test_coroutines_keep_their_own_stage_stack(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    profiler.enabled = True
+    seen = {}
+
+    async def page(name):
+        with profiler.stage(name):
+            await asyncio.sleep(0.01)
+            seen[name] = profiler.stages.get()
+
+    async def main():
+        with profiler.stage('crawl'):
+            await asyncio.gather(page('fetch'), page('parse'))
+        return profiler.stages.get()
+
+    assert asyncio.run(main()) == ()
+    assert seen == {'fetch': ('crawl', 'fetch'), 'parse': ('crawl', 'parse')}
+    # 事件循环中的阶段只采样，不做确定性分析
+    assert profiler.profiles == {}
+
+
+def test_stop_writes_stage_profiles_and_slowest_pages(tmp_path):
+    profiler = Profiler(str(tmp_path), top_pages=2)
+    profiler.start()
+    for i, delay in enumerate((0.02, 0.0, 0.01)):
+        with profiler.stage('fetch', f"http://a.gov.cn/{i}"):
+            with profiler.stage('parse'):
+                time.sleep(delay)
+    profiler.stop()
+
+    assert os.path.exists(os.path.join(tmp_path, 'pstats', 'fetch.pstats'))
+    assert os.path.exists(os.path.join(tmp_path, 'pstats', 'parse.txt'))
+    assert os.path.exists(os.path.join(tmp_path, 'stacks.collapsed'))
+    with open(os.path.join(tmp_path, 'slowest_pages.json'), encoding='utf-8') as f:
+        pages = json.load(f)['pages']
+    assert [page['page'] for page in pages] == ['http://a.gov.cn/0', 'http://a.gov.cn/2']
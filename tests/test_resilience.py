@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from resilience import CircuitOpenError, Endpoint, EndpointRegistry, ThrottledError, check_status, status_of
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_check_status_raises_on_throttle_codes():
+    check_status(200)
+    check_status(404)
+    with pytest.raises(ThrottledError) as info:
+        check_status(429)
+    assert status_of(info.value) == 429
+
+
+def test_throttling_halves_the_limit_and_success_restores_it():
+    endpoint = Endpoint('test', max_concurrency=8, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(ThrottledError):
+        with endpoint.slot():
+            raise ThrottledError(429)
+    assert endpoint.limit == 4
+    assert endpoint.stats['throttled'] == 1
+
+    for _ in range(30):
+        with endpoint.slot():
+            pass
+    assert endpoint.limit == 8
+    assert endpoint.in_flight == 0
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers_on_probe():
+    endpoint = Endpoint('test', failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(HTTPError):
+            with endpoint.slot():
+                raise HTTPError(500)
+    assert endpoint.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        endpoint.acquire()
+
+    time.sleep(0.06)
+    with endpoint.slot():
+        assert endpoint.state == 'half_open'
+    assert endpoint.state == 'closed'
+    assert endpoint.failures == 0
+
+
+def test_failed_probe_reopens_the_circuit():
+    endpoint = Endpoint('test', failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(HTTPError):
+        with endpoint.slot():
+            raise HTTPError(500)
+    time.sleep(0.06)
+    with pytest.raises(HTTPError):
+        with endpoint.slot():
+            raise HTTPError(500)
+    assert endpoint.state == 'open'
+
+
+def test_call_retries_server_errors_but_not_client_errors():
+    endpoint = Endpoint('test', base_delay=0, failure_threshold=10)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise HTTPError(500)
+        return 'ok'
+
+    assert endpoint.call(flaky, retries=3) == 'ok'
+    assert len(calls) == 3
+
+    def missing():
+        calls.append(1)
+        raise HTTPError(404)
+
+    calls.clear()
+    with pytest.raises(HTTPError):
+        endpoint.call(missing, retries=3)
+    assert len(calls) == 1
+
+
+def test_registry_shares_endpoints_per_host():
+    registry = EndpointRegistry(settings={'baike': {'max_concurrency': 3}}, default={'max_concurrency': 1})
+    assert registry.get('baike').max_concurrency == 3
+    assert registry.for_url('http://a.gov.cn/x') is registry.for_url('http://a.gov.cn/y')
+    assert registry.for_url('http://b.gov.cn/').max_concurrency == 1
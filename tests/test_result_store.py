@@ -0,0 +1,88 @@
+import csv
+import os
+import sqlite3
+
+import pytest
+
+from result_store import CsvResultStore, SQLiteResultStore, iter_store_rows, open_store, resolve_table
+
+COLUMNS = ['姓名', '职务', '部门']
+
+
+def rows(*names):
+    return [{'姓名': name, '职务': '厅长', '部门': '教育厅'} for name in names]
+
+
+@pytest.mark.parametrize('name', ['out.csv', 'out.db'])
+def test_buffered_rows_are_written_on_flush(tmp_path, name):
+    path = os.path.join(tmp_path, name)
+    store = open_store(path, COLUMNS, batch_size=10)
+    store.add_many(rows('甲', '乙'))
+    assert store.has('姓名', '甲')
+    assert not os.path.exists(path) or name.endswith('.db')
+    store.close()
+    assert [row['姓名'] for row in iter_store_rows(path, table='results')] == ['甲', '乙']
+
+
+def test_batch_size_triggers_a_write(tmp_path):
+    path = os.path.join(tmp_path, 'out.csv')
+    store = CsvResultStore(path, COLUMNS, batch_size=2)
+    store.add_many(rows('甲', '乙', '丙'))
+    with open(path, encoding='utf-8-sig') as f:
+        assert len(list(csv.DictReader(f))) == 2
+    store.close()
+
+
+def test_csv_appends_in_the_file_column_order(tmp_path):
+    path = os.path.join(tmp_path, 'out.csv')
+    with CsvResultStore(path, ['部门', '姓名', '职务']) as store:
+        store.add_many(rows('甲'))
+    with CsvResultStore(path, COLUMNS) as store:
+        assert store.columns == ['部门', '姓名', '职务']
+        store.add_many(rows('乙'))
+        assert store.has('姓名', '甲')
+    with open(path, encoding='utf-8-sig') as f:
+        assert next(csv.reader(f)) == ['部门', '姓名', '职务']
+
+
+def test_csv_rejects_a_different_header(tmp_path):
+    path = os.path.join(tmp_path, 'out.csv')
+    with CsvResultStore(path, COLUMNS) as store:
+        store.add_many(rows('甲'))
+    with pytest.raises(ValueError, match='表头'):
+        CsvResultStore(path, COLUMNS + ['2025职位'])
+
+
+def test_sqlite_adds_new_columns_and_queries(tmp_path):
+    path = os.path.join(tmp_path, 'out.db')
+    with SQLiteResultStore(path, COLUMNS) as store:
+        store.add_many(rows('甲', '乙'))
+    with SQLiteResultStore(path, COLUMNS + ['省份']) as store:
+        store.add({'姓名': '丙', '部门': '财政厅', '省份': '内蒙古'})
+        assert [row['姓名'] for row in store.query(部门='教育厅')] == ['甲', '乙']
+        assert store.query(省份='内蒙古')[0]['姓名'] == '丙'
+
+
+def test_csv_query_includes_buffered_rows(tmp_path):
+    with CsvResultStore(os.path.join(tmp_path, 'out.csv'), COLUMNS) as store:
+        store.add_many(rows('甲'))
+        store.add({'姓名': '乙', '部门': '财政厅'})
+        assert [row['姓名'] for row in store.query(部门='财政厅')] == ['乙']
+
+
+def test_resolve_table(tmp_path):
+    path = os.path.join(tmp_path, 'out.db')
+    with SQLiteResultStore(path, COLUMNS, table='gov_leaders') as store:
+        store.add_many(rows('甲'))
+    assert resolve_table(path) == 'gov_leaders'
+    with pytest.raises(ValueError, match='没有表 results'):
+        resolve_table(path, 'results')
+    with pytest.raises(ValueError, match='没有表 results'):
+        list(iter_store_rows(path, table='results'))
+
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE other (x TEXT)')
+    conn.close()
+    with pytest.raises(ValueError, match='2 个表'):
+        resolve_table(path)
+    assert resolve_table(os.path.join(tmp_path, 'out.csv')) is None
@@ -0,0 +1,52 @@
+from baike_crawler import DataProcessor, LevelClassifier, PersonInfo, ResumeParser
+
+
+class FakeGPT:
+    def classify_levels(self, titles):
+        return {}
+
+    def extract_info(self, content, person):
+        return {}
+
+
+class Processor(DataProcessor):
+    """只保留简历解析需要的部分，保存的人物记录在 saved 中"""
+    def __init__(self):
+        self.gpt = FakeGPT()
+        self.resume_parser = ResumeParser()
+        self.level_classifier = LevelClassifier(self.gpt, memo_file='')
+        self.saved = []
+
+    def save_person(self, person):
+        self.saved.append(person.name)
+
+
+def person(resume):
+    return PersonInfo('张三', '内蒙古自治区教育厅厅长', resume, '内蒙古自治区', '内蒙古自治区教育厅')
+
+
+def test_complete_resume_is_saved_without_baike():
+    processor = Processor()
+    p = person('2015.01— 任内蒙古自治区教育厅厅长')
+    assert processor.enrich_from_resume(p)
+    assert processor.saved == ['张三']
+    assert p.positions['2021']['position'] == '内蒙古自治区教育厅厅长'
+    assert p.positions['2021']['level'] == '正厅级'
+
+
+def test_partial_resume_locks_the_parsed_years():
+    processor = Processor()
+    p = person('2023.01— 任内蒙古自治区教育厅厅长')
+    assert not processor.enrich_from_resume(p)
+    assert processor.saved == []
+    assert p.locked_years == {'2023', '2024'}
+
+    # 百科提取结果不覆盖简历已确定的年份
+    p.update_positions([{'year': 2023, 'position': '百科职务'}, {'year': 2016, 'position': '某县县长'}])
+    assert p.positions['2023']['position'] == '内蒙古自治区教育厅厅长'
+    assert p.positions['2016']['position'] == '某县县长'
+
+
+def test_empty_resume_falls_through():
+    processor = Processor()
+    assert not processor.enrich_from_resume(person(''))
@@ -0,0 +1,62 @@
+from baike_crawler import PersonInfo, ResumeParser
+
+RESUME = (
+    "男，汉族，1968年3月生，河北唐山人，大学本科学历。\n"
+    "2010.03—2015.05 任内蒙古自治区教育厅副厅长\n"
+    "2015.05—2019.12 任内蒙古自治区教育厅厅长（其间：2016.09—2017.01 在中央党校学习）\n"
+    "2020.01— 内蒙古自治区副主席"
+)
+
+
+def person(position='自治区副主席'):
+    return PersonInfo('张三', position, '', '内蒙古自治区', '内蒙古自治区人民政府')
+
+
+def positions(result):
+    return {year: value['position'] for year, value in result['positions'].items()}
+
+
+def test_ranges_fill_every_covered_year():
+    result = ResumeParser(years=range(2014, 2025)).parse(RESUME, person())
+    years = positions(result)
+    assert years[2014] == '内蒙古自治区教育厅副厅长'
+    # 同一年有两条任职时取开始时间最新的一条
+    assert years[2015] == '内蒙古自治区教育厅厅长'
+    assert years[2019] == '内蒙古自治区教育厅厅长'
+    assert result['missing_years'] == []
+    assert result['unresolved'] == []
+
+
+def test_study_does_not_replace_the_job():
+    years = positions(ResumeParser(years=range(2016, 2018)).parse(RESUME, person()))
+    assert years == {2016: '内蒙古自治区教育厅厅长', 2017: '内蒙古自治区教育厅厅长'}
+
+
+def test_open_ended_entry_runs_to_the_last_year():
+    years = positions(ResumeParser(years=range(2020, 2025)).parse(RESUME, person()))
+    assert set(years.values()) == {'内蒙古自治区副主席'}
+
+
+def test_start_only_entry_ends_at_the_next_entry():
+    text = "2012年 任某县县长\n2018年3月起 任某市副市长"
+    years = positions(ResumeParser(years=range(2016, 2021)).parse(text, person('某市副市长')))
+    assert years[2017] == '某县县长'
+    assert years[2018] == '某市副市长'
+    assert years[2020] == '某市副市长'
+
+
+def test_basic_info_from_government_resume():
+    basic = ResumeParser(years=range(2016, 2025)).parse(RESUME, person())['basic']
+    assert basic == {'gender': '男', 'ethnicity': '汉族', 'birth_date': '1968年3月',
+                     'native_place': '河北唐山', 'education': '大学本科学历'}
+
+
+def test_location_completes_province_prefix():
+    assert ResumeParser.location_of('自治区教育厅厅长', '内蒙古自治区') == '内蒙古自治区'
+    assert ResumeParser.location_of('呼和浩特市委书记', '内蒙古自治区') == '呼和浩特市'
+
+
+def test_unparsed_year_lines_are_reported():
+    text = "2016年在某地工作多年；2010.03—2015.05 任某县县长"
+    result = ResumeParser(years=range(2016, 2025)).parse(text, person())
+    assert result['unresolved'] == ['2016年在某地工作多年']
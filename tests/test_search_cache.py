@@ -0,0 +1,57 @@
+import os
+
+from baike_crawler import ContentValidator, PersonInfo, SearchCache, WebSearcher
+
+
+def baike(name, summary, suffix='1'):
+    return {'name': f"{name}_百度百科", 'url': f"https://baike.baidu.com/item/{name}/{suffix}", 'summary': summary}
+
+
+class FakeSearcher(WebSearcher):
+    def __init__(self, cache, responses):
+        super().__init__(api_key='', validator=ContentValidator(), cache=cache)
+        self.responses = responses
+        self.queries = []
+
+    def request(self, query):
+        self.queries.append(query)
+        return self.responses.get(query, [])
+
+
+def test_queries_are_normalized(tmp_path):
+    cache = SearchCache(os.path.join(tmp_path, 'cache.db'))
+    cache.put('内蒙古  教育厅 ＡＢＣ', [{'url': 'u'}])
+    assert cache.get('内蒙古 教育厅 abc') == [{'url': 'u'}]
+    assert cache.get('内蒙古 财政厅') is None
+
+
+def test_expired_results_are_ignored(tmp_path):
+    cache = SearchCache(os.path.join(tmp_path, 'cache.db'), ttl=-1)
+    cache.put('查询', [{'url': 'u'}], '内蒙古', '教育厅')
+    assert cache.get('查询') is None
+    assert cache.department_results('内蒙古', '教育厅') == []
+
+
+def test_search_uses_the_cache(tmp_path):
+    searcher = FakeSearcher(SearchCache(os.path.join(tmp_path, 'cache.db')), {'张三': [baike('张三', '')]})
+    assert searcher.search('张三') == searcher.search(' 张三 ')
+    assert searcher.queries == ['张三']
+
+
+def test_department_results_are_reused_only_for_the_same_person(tmp_path):
+    cache = SearchCache(os.path.join(tmp_path, 'cache.db'))
+    cache.put('内蒙古 教育厅 李四 百度百科', [
+        baike('李四', '内蒙古自治区教育厅副厅长'),
+        baike('张三', '内蒙古自治区教育厅厅长'),
+        baike('王五', '演员'),
+    ], '内蒙古自治区', '内蒙古自治区教育厅')
+    searcher = FakeSearcher(cache, {})
+
+    zhang = PersonInfo('张三', '教育厅厅长', '', '内蒙古自治区', '内蒙古自治区教育厅')
+    assert searcher.search_baidu_pages(zhang) == ['https://baike.baidu.com/item/张三/1']
+    assert searcher.queries == []
+
+    # 缓存中的同名结果摘要不相关时仍然发起搜索
+    wang = PersonInfo('王五', '教育厅副厅长', '', '内蒙古自治区', '内蒙古自治区教育厅')
+    searcher.search_baidu_pages(wang)
+    assert searcher.queries == ['内蒙古自治区 内蒙古自治区教育厅 王五 百度百科']
@@ -0,0 +1,46 @@
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from synthetic_site import DISCLOSURE_PATH, SyntheticServer, SyntheticSite  # noqa: E402
+
+
+def test_leaders_appear_only_at_the_department_depth():
+    site = SyntheticSite(provinces=2, departments=5, noise=0)
+    for department in site.iter_departments():
+        paths = [''] + [path for path, _ in DISCLOSURE_PATH]
+        for level, sub in enumerate(paths):
+            page = site.page(department['path'] + sub, 'gov.local')
+            assert (department['leaders'][0]['姓名'] in page) == (level == department['depth'])
+        # 每一层都链接到下一层
+        for sub, (next_path, _) in zip(paths, DISCLOSURE_PATH):
+            assert f"http://gov.local{department['path']}{next_path}" in site.page(department['path'] + sub, 'gov.local')
+
+
+def test_pages_are_deterministic_and_unknown_paths_missing():
+    site = SyntheticSite(provinces=2, departments=3)
+    assert site.page('/p1/d2/zwgk/', 'a') == SyntheticSite(provinces=2, departments=3).page('/p1/d2/zwgk/', 'a')
+    assert site.page('/p2/', 'a') is None
+    assert site.page('/p0/d3/', 'a') is None
+    assert site.page('/p0/d0/unknown/', 'a') is None
+    assert '教育厅' in site.page('/p0/', 'a')
+
+
+def test_server_counts_requests_and_injects_errors():
+    site = SyntheticSite(provinces=1, departments=2, noise=0)
+    with SyntheticServer(site) as server:
+        with urllib.request.urlopen(server.url + 'p0/d1/') as response:
+            assert response.status == 200
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(server.url + 'p0/d1/missing/')
+        assert info.value.code == 404
+        assert server.department_requests(site.department(0, 1)) == 2
+
+    with SyntheticServer(site, error_rate=1.0) as server:
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(server.url)
+        assert info.value.code in (500, 503)
@@ -0,0 +1,33 @@
+import pytest
+
+from baike_crawler import GPTHelper, PersonInfo
+
+
+class FakeGPT(GPTHelper):
+    def __init__(self, response):
+        self.response = response
+
+    def call_gpt(self, prompt, kind='call_gpt'):
+        return self.response
+
+
+PERSON = PersonInfo('张三', '教育厅厅长', '', '内蒙古', '教育厅')
+
+
+def test_match_returns_extracted_fields():
+    gpt = FakeGPT('{"match": true, "gender": "男", "positions": []}')
+    assert gpt.validate_and_extract('履历', PERSON) == {'gender': '男', 'positions': []}
+
+
+def test_string_match_flag():
+    assert FakeGPT('{"match": "True", "positions": []}').validate_and_extract('履历', PERSON) == {'positions': []}
+
+
+def test_different_person_returns_none():
+    assert FakeGPT('{"match": false}').validate_and_extract('履历', PERSON) is None
+
+
+@pytest.mark.parametrize('response', ['无法判断', '{"gender": "男"}', {}])
+def test_unparseable_reply_raises(response):
+    with pytest.raises(ValueError):
+        FakeGPT(response).validate_and_extract('履历', PERSON)
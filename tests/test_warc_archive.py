@@ -0,0 +1,57 @@
+import gzip
+import os
+import time
+
+from warc_archive import WarcArchive
+
+
+def test_pages_are_stored_and_read_back_by_time(tmp_path):
+    archive = WarcArchive()
+    archive.open(str(tmp_path))
+    url = 'https://www.nmg.gov.cn/jyt/ldxx/'
+    archive.add('http', url, '<html>张三 厅长</html>'.encode('utf-8'))
+    first = archive.lookup(url)['fetched']
+    time.sleep(0.01)
+    archive.add('http', url, '<html>李四 厅长</html>'.encode('utf-8'))
+    archive.add('selenium', url, '<html>展开后</html>'.encode('utf-8'))
+
+    assert archive.get(url, source='http').decode('utf-8') == '<html>李四 厅长</html>'
+    assert archive.get(url, at=first).decode('utf-8') == '<html>张三 厅长</html>'
+    assert archive.get(url, at=first - 1) is None
+    assert archive.get('https://www.nmg.gov.cn/') is None
+
+    headers, _ = archive.read(archive.lookup(url, source='selenium'))
+    assert headers['WARC-Target-URI'] == url and headers['WARC-Source'] == 'selenium'
+    assert archive.summary()['sources'] == {'http': {'fetches': 2, 'urls': 1}, 'selenium': {'fetches': 1, 'urls': 1}}
+    archive.close()
+
+
+def test_unchanged_pages_reuse_the_previous_record(tmp_path):
+    archive = WarcArchive()
+    archive.open(str(tmp_path))
+    url = 'https://www.nmg.gov.cn/jyt/ldxx/'
+    for _ in range(3):
+        archive.add('http', url, b'<html></html>')
+    archive.add('http', url, None)
+
+    history = archive.history(url)
+    assert len(history) == 3
+    assert len({(record['file'], record['offset']) for record in history}) == 1
+    assert archive.stats['records'] == 1 and archive.stats['duplicates'] == 2
+    archive.close()
+
+
+def test_files_rotate_and_each_record_is_a_gzip_member(tmp_path):
+    archive = WarcArchive()
+    archive.open(str(tmp_path), max_size=1)
+    archive.add('http', 'https://a.gov.cn/', b'a')
+    archive.add('http', 'https://b.gov.cn/', b'b')
+    files = sorted(name for name in os.listdir(tmp_path) if name.endswith('.warc.gz'))
+    assert len(files) == 2
+
+    record = archive.lookup('https://b.gov.cn/')
+    with open(os.path.join(tmp_path, record['file']), 'rb') as f:
+        members = gzip.decompress(f.read())
+    # 每个文件以 warcinfo 开头，后面是 resource 记录
+    assert members.index(b'WARC-Type: warcinfo') < members.index(b'WARC-Type: resource')
+    archive.close()
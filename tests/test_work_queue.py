@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from gov_crawler import DepartmentFetchError, GovInfoCrawler
+from work_queue import WorkQueue, run_worker
+
+
+def department(name):
+    return {'province': '内蒙古', 'department': name, 'url': f"https://www.nmg.gov.cn/{name}/"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(os.path.join(tmp_path, 'queue.db'), visibility_timeout=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_enqueue_skips_existing_departments(queue):
+    assert queue.enqueue([department('教育厅'), department('财政厅')]) == 2
+    assert queue.enqueue([department('教育厅'), department('审计厅')]) == 1
+    assert queue.counts()['pending'] == 3
+
+
+def test_leases_are_exclusive_until_they_expire(queue):
+    queue.enqueue([department('教育厅')])
+    task = queue.lease('a')
+    assert task['department'] == '教育厅' and task['attempt'] == 1
+    assert queue.lease('b') is None
+
+    queue.visibility_timeout = -1
+    assert queue.heartbeat(task['id'], 'a')
+    taken = queue.lease('b')
+    assert taken['id'] == task['id'] and taken['attempt'] == 2
+    # 原租约已被接管，旧的工作进程不能再完成或续约
+    assert not queue.complete(task['id'], 'a', 3)
+    assert not queue.heartbeat(task['id'], 'a')
+
+    # 重试次数用完后过期的任务标记为失败
+    assert queue.lease('c') is None
+    assert queue.counts()['failed'] == 1
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.enqueue([department('教育厅')])
+    task = queue.lease('a')
+    assert queue.fail(task['id'], 'a', '首页请求失败')
+    assert queue.counts()['pending'] == 1
+    task = queue.lease('a')
+    assert queue.fail(task['id'], 'a', '首页请求失败')
+    status = queue.status()
+    assert status['counts']['failed'] == 1
+    assert status['failed'][0] == {'task': '内蒙古-教育厅', 'attempts': 2, 'error': '首页请求失败'}
+
+    assert queue.retry_failed() == 1
+    assert queue.lease('a')['attempt'] == 1
+
+
+def test_run_worker_completes_and_fails_tasks(queue):
+    queue.enqueue([department('教育厅'), department('财政厅')])
+
+    def process(task):
+        if task['department'] == '财政厅':
+            raise DepartmentFetchError('首页请求失败')
+        return 3
+
+    assert run_worker(queue, process, owner='a', poll_interval=0) == 1
+    status = queue.status()
+    assert status['counts'] == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+    assert status['leaders'] == 3
+
+
+class UnreachableCrawler(GovInfoCrawler):
+    def __init__(self, folder):
+        self.folder, self.store_format, self.stores = folder, 'csv', {}
+        self.discovery, self.max_depth = None, 1
+
+    def get_leadership_info(self, url, province_name, department_name, visited_urls=None, max_depth=1,
+                            all_leadership_info=None):
+        # 首页请求失败：不记录访问，也没有结果
+        return
+
+
+def test_unreachable_department_raises_instead_of_recording_no_leader(tmp_path):
+    crawler = UnreachableCrawler(str(tmp_path))
+    with pytest.raises(DepartmentFetchError):
+        crawler.process_department('https://www.nmg.gov.cn/jyt/', '内蒙古', '教育厅')
+    assert not os.path.exists(os.path.join(tmp_path, 'no_leader_departments.txt'))
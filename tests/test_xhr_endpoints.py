@@ -0,0 +1,78 @@
+import json
+import os
+
+from xhr_endpoints import (XhrEndpointStore, endpoint_template, json_to_html, looks_like_leadership, parse_json,
+                           parse_performance_log)
+
+LEADERS = {'data': {'list': [
+    {'xm': '张三', 'zw': '厅长', 'jl': '<p>1970年出生</p>'},
+    {'xm': '李四', 'zw': '副厅长', 'jl': ''},
+]}}
+
+
+def test_parse_json_accepts_jsonp_and_rejects_html():
+    assert parse_json('cb({"a": 1});') == {'a': 1}
+    assert parse_json(' [1, 2] ') == [1, 2]
+    assert parse_json('<html></html>') is None
+    assert parse_json('{bad') is None
+
+
+def test_leadership_lists_are_recognized_and_labelled():
+    assert looks_like_leadership(LEADERS)
+    assert not looks_like_leadership({'list': [{'title': '通知', 'date': '2024-01-01'}]})
+    assert json_to_html(LEADERS) == ('<html><body><p>姓名：张三；职务：厅长；简历：1970年出生</p>'
+                                     '<p>姓名：李四；职务：副厅长</p></body></html>')
+
+
+def test_endpoint_template_drops_volatile_parameters():
+    template = endpoint_template({
+        'url': 'https://www.nmg.gov.cn/api/leaders?dept=jyt&_=1700000000&callback=cb#top',
+        'method': 'POST',
+        'headers': {'Content-Type': 'application/x-www-form-urlencoded'},
+        'postData': 'page=1&timestamp=1700000000',
+    })
+    assert template == {'method': 'POST', 'url': 'https://www.nmg.gov.cn/api/leaders?dept=jyt', 'body': 'page=1',
+                        'content_type': 'application/x-www-form-urlencoded'}
+
+
+def log_entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def test_performance_log_keeps_xhr_from_the_first_page_only():
+    entries = [
+        log_entry('Network.requestWillBeSent', requestId='1', type='Document', loaderId='a', request={'url': 'page'}),
+        log_entry('Network.requestWillBeSent', requestId='2', type='XHR', loaderId='a', request={'url': 'api'}),
+        log_entry('Network.responseReceived', requestId='2', type='XHR', response={'status': 200}),
+        log_entry('Network.requestWillBeSent', requestId='3', type='XHR', loaderId='b', request={'url': 'other'}),
+        log_entry('Network.responseReceived', requestId='3', type='XHR', response={'status': 200}),
+        log_entry('Network.requestWillBeSent', requestId='4', type='Fetch', loaderId='a', request={'url': 'error'}),
+        log_entry('Network.responseReceived', requestId='4', type='Fetch', response={'status': 500}),
+    ]
+    assert parse_performance_log(entries) == [('2', {'url': 'api'})]
+
+
+def test_store_applies_path_templates_to_other_departments(tmp_path):
+    path = os.path.join(tmp_path, 'xhr_endpoints.json')
+    store = XhrEndpointStore(path)
+    template = {'method': 'GET', 'url': 'https://www.nmg.gov.cn/api/leaders?dept=jyt', 'body': '', 'content_type': ''}
+    assert store.add('https://www.nmg.gov.cn/bm/jyt/ldxx/', template)
+    assert not store.add('https://www.nmg.gov.cn/bm/jyt/ldxx/', template)
+
+    found = XhrEndpointStore(path).get('https://www.nmg.gov.cn/bm/czt/ldxx/')
+    assert [(key, filled['url']) for key, _, filled in found] == [
+        ('/bm/*/ldxx/', 'https://www.nmg.gov.cn/api/leaders?dept=czt')]
+    assert store.get('https://www.nmg.gov.cn/bm/czt/xwzx/') == []
+
+
+def test_failing_templates_are_removed(tmp_path):
+    store = XhrEndpointStore(os.path.join(tmp_path, 'xhr_endpoints.json'), max_failures=2)
+    page = 'https://jyt.nmg.gov.cn/ldxx/'
+    store.add(page, {'method': 'GET', 'url': 'https://jyt.nmg.gov.cn/api/list', 'body': '', 'content_type': ''})
+    key, saved, _ = store.get(page)[0]
+    store.mark(page, key, saved, ok=False)
+    store.mark(page, key, saved, ok=True)
+    store.mark(page, key, saved, ok=False)
+    assert len(store.get(page)) == 1
+    store.mark(page, key, saved, ok=False)
+    assert store.get(page) == []
@@ -0,0 +1,202 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+
+class WarcArchive:
+    """把抓取到的原始页面写入 WARC 存档（.warc.gz，每条记录单独一个 gzip 成员）
+    - 政府网站页面、Selenium 展开后的页面、数据接口返回的JSON、百科页面均写为 resource 记录，WARC-Source 标明来源
+    - 文件超过 max_size 后轮换；文件名带进程号，多个进程可写同一目录
+    - SQLite 索引 (URL, 抓取时间) -> (文件, 偏移, 长度)，读取时只需 seek 并解压这一条记录
+    - 与该 URL 上一次内容相同（摘要一致）时不再写入正文，索引指向已有记录
+    """
+    def __init__(self):
+        self.folder = None
+        self.max_size = 0
+        self.conn = None
+        self.file = None
+        self.filename = None
+        self.sequence = 0
+        self.lock = threading.Lock()
+        self.stats = {'records': 0, 'duplicates': 0, 'bytes': 0}
+
+    def open(self, folder: str, max_size: int = 1024 ** 3):
+        self.close()
+        os.makedirs(folder, exist_ok=True)
+        self.folder, self.max_size = folder, max_size
+        self.conn = sqlite3.connect(os.path.join(folder, 'warc_index.db'), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS records ('
+                'url TEXT, fetched REAL, source TEXT, file TEXT, offset INTEGER, length INTEGER, digest TEXT)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_records_url ON records (url, fetched)')
+        print(f"原始页面存档: {folder}")
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+        self.sequence += 1
+        self.filename = f"pages-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{self.sequence:05d}.warc.gz"
+        self.file = open(os.path.join(self.folder, self.filename), 'ab')
+        info = b'software: Government-Officials-Career-Path-Crawler\r\nformat: WARC File Format 1.1\r\n'
+        self._write(self._record('warcinfo', info, {'WARC-Filename': self.filename,
+                                                    'Content-Type': 'application/warc-fields'}))
+
+    @staticmethod
+    def _record(warc_type: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        lines = [
+            'WARC/1.1',
+            f"WARC-Type: {warc_type}",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        ]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body + b'\r\n\r\n'
+
+    def _write(self, record: bytes) -> Tuple[int, int]:
+        offset = self.file.tell()
+        data = gzip.compress(record, compresslevel=6)
+        self.file.write(data)
+        self.file.flush()
+        self.stats['bytes'] += len(data)
+        return offset, len(data)
+
+    def add(self, source: str, url: str, body: Optional[bytes], content_type: str = 'text/html'):
+        """存档一个页面（source：http / selenium / xhr / baike）；未开启存档或内容为空时不做处理"""
+        if self.conn is None or not body:
+            return
+        digest = 'sha1:' + base64.b32encode(hashlib.sha1(body).digest()).decode('ascii')
+        now = time.time()
+        with self.lock:
+            last = self.conn.execute(
+                'SELECT file, offset, length, digest FROM records WHERE url = ? AND source = ? '
+                'ORDER BY fetched DESC LIMIT 1', (url, source)
+            ).fetchone()
+            if last is not None and last[3] == digest:
+                location = last[:3]
+                self.stats['duplicates'] += 1
+            else:
+                if self.file is None or self.file.tell() >= self.max_size:
+                    self._rotate()
+                offset, length = self._write(self._record('resource', body, {
+                    'WARC-Target-URI': url,
+                    'WARC-Source': source,
+                    'WARC-Payload-Digest': digest,
+                    'Content-Type': content_type,
+                }))
+                location = (self.filename, offset, length)
+                self.stats['records'] += 1
+            with self.conn:
+                self.conn.execute('INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                  (url, now, source, *location, digest))
+
+    def history(self, url: str) -> List[Dict]:
+        """该 URL 的所有存档记录，按抓取时间排序"""
+        rows = self.conn.execute(
+            'SELECT fetched, source, file, offset, length, digest FROM records WHERE url = ? ORDER BY fetched',
+            (url,)
+        ).fetchall()
+        return [dict(zip(('fetched', 'source', 'file', 'offset', 'length', 'digest'), row)) for row in rows]
+
+    def lookup(self, url: str, at: Optional[float] = None, source: Optional[str] = None) -> Optional[Dict]:
+        """在 at 时刻（默认现在）或之前最近一次存档的记录"""
+        sql = 'SELECT fetched, source, file, offset, length, digest FROM records WHERE url = ? AND fetched <= ?'
+        params = [url, time.time() if at is None else at]
+        if source is not None:
+            sql += ' AND source = ?'
+            params.append(source)
+        row = self.conn.execute(sql + ' ORDER BY fetched DESC LIMIT 1', params).fetchone()
+        return None if row is None else dict(zip(('fetched', 'source', 'file', 'offset', 'length', 'digest'), row))
+
+    def read(self, record: Dict) -> Tuple[Dict[str, str], bytes]:
+        """按索引中的偏移读取一条记录，返回 (WARC 头, 页面内容)"""
+        with open(os.path.join(self.folder, record['file']), 'rb') as f:
+            f.seek(record['offset'])
+            data = gzip.decompress(f.read(record['length']))
+        head, _, rest = data.partition(b'\r\n\r\n')
+        headers = dict(line.split(': ', 1) for line in head.decode('utf-8').split('\r\n')[1:])
+        return headers, rest[:int(headers['Content-Length'])]
+
+    def get(self, url: str, at: Optional[float] = None, source: Optional[str] = None) -> Optional[bytes]:
+        record = self.lookup(url, at, source)
+        return None if record is None else self.read(record)[1]
+
+    def summary(self) -> Dict:
+        sources = self.conn.execute(
+            'SELECT source, COUNT(*), COUNT(DISTINCT url) FROM records GROUP BY source ORDER BY source'
+        ).fetchall()
+        files = [name for name in os.listdir(self.folder) if name.endswith('.warc.gz')]
+        return {
+            'sources': {source: {'fetches': count, 'urls': urls} for source, count, urls in sources},
+            'files': len(files),
+            'bytes': sum(os.path.getsize(os.path.join(self.folder, name)) for name in files),
+        }
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def add_archive_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--archive', metavar='DIR', default=None, help='把抓取到的原始页面写入该目录的 WARC 存档')
+
+
+def parse_time(value: str) -> float:
+    """2024-05-01 或 2024-05-01T12:00:00（本地时间）"""
+    return datetime.fromisoformat(value).timestamp()
+
+
+# 进程内共享的存档
+archive = WarcArchive()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='查看与读取 WARC 页面存档')
+    parser.add_argument('folder')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('summary', help='各来源的抓取次数、文件数与大小')
+    history_parser = sub.add_parser('history', help='某个 URL 的所有存档时间')
+    history_parser.add_argument('url')
+    get_parser = sub.add_parser('get', help='读取某个 URL 在指定时间或之前最近一次的页面')
+    get_parser.add_argument('url')
+    get_parser.add_argument('--at', type=parse_time, default=None, help='时间，如 2024-05-01T12:00:00')
+    get_parser.add_argument('--source', choices=['http', 'selenium', 'baike', 'xhr'], default=None)
+    get_parser.add_argument('--output', default=None, help='保存到文件，默认输出到终端')
+    args = parser.parse_args()
+
+    archive.open(args.folder)
+    if args.command == 'summary':
+        summary = archive.summary()
+        for source, info in summary['sources'].items():
+            print(f"{source:<10} {info['fetches']:>8} 次抓取 {info['urls']:>8} 个URL")
+        print(f"{summary['files']} 个文件，共 {summary['bytes'] / 1024 / 1024:.2f} MB")
+    elif args.command == 'history':
+        for record in archive.history(args.url):
+            fetched = datetime.fromtimestamp(record['fetched']).isoformat(timespec='seconds')
+            print(f"{fetched} {record['source']:<8} {record['file']}@{record['offset']} {record['digest']}")
+    else:
+        body = archive.get(args.url, args.at, args.source)
+        if body is None:
+            print("没有存档记录")
+        elif args.output:
+            with open(args.output, 'wb') as f:
+                f.write(body)
+        else:
+            print(body.decode('utf-8', errors='replace'))
+    archive.close()
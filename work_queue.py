@@ -0,0 +1,282 @@
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from launcher import merge_shards, new_crawler
+
+
+class WorkQueue:
+    """基于SQLite的部门任务队列，可放在多台机器共享的目录中（该文件系统须支持 POSIX 文件锁，如 NFSv4）
+    - 工作进程租用任务，租约在 visibility_timeout 秒后过期；处理期间定时续约（heartbeat）
+    - 进程崩溃后租约过期，任务自动重新分配；超过 max_attempts 次的任务标记为失败
+    任务状态：pending / leased / done / failed
+    """
+    def __init__(self, path: str, visibility_timeout: float = 600, max_attempts: int = 3):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # 手动管理事务（BEGIN IMMEDIATE），多个进程同时租用时不会拿到同一个任务
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        # 使用默认的回滚日志：WAL 依赖共享内存，在网络文件系统上多台机器之间不可靠
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.lock = threading.Lock()
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            'id INTEGER PRIMARY KEY, province TEXT, department TEXT, url TEXT, '
+            "state TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0, owner TEXT, lease_expires REAL, "
+            'results INTEGER, error TEXT, created REAL, updated REAL, UNIQUE (province, department))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_expires)')
+
+    def _transaction(self, func: Callable):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func()
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+
+    def enqueue(self, tasks: Iterable[Dict]) -> int:
+        """加入 {province, department, url} 任务，已存在的部门跳过；返回新增数量"""
+        now = time.time()
+
+        def insert():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO tasks (province, department, url, created, updated) VALUES (?, ?, ?, ?, ?)',
+                [(t['province'], t['department'], t['url'], now, now) for t in tasks]
+            )
+            return self.conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def lease(self, owner: str) -> Optional[Dict]:
+        """租用一个待处理或租约已过期的任务，没有可用任务时返回 None"""
+        def take():
+            now = time.time()
+            # 租约过期且重试次数已用完的任务（处理过程中崩溃）不再分配
+            self.conn.execute(
+                "UPDATE tasks SET state = 'failed', error = '租约过期次数过多', updated = ? "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT id, province, department, url, attempts FROM tasks "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET state = 'leased', owner = ?, attempts = attempts + 1, lease_expires = ?, updated = ? "
+                "WHERE id = ?",
+                (owner, now + self.visibility_timeout, now, row[0])
+            )
+            return {'id': row[0], 'province': row[1], 'department': row[2], 'url': row[3], 'attempt': row[4] + 1}
+
+        return self._transaction(take)
+
+    def heartbeat(self, task_id: int, owner: str) -> bool:
+        """续约；租约已被他人接管时返回 False"""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                (now + self.visibility_timeout, now, task_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: int, owner: str, results: int) -> bool:
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = 'done', results = ?, error = NULL, updated = ? "
+                "WHERE id = ? AND owner = ? AND state = 'leased'",
+                (results, time.time(), task_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: int, owner: str, error: str) -> bool:
+        """报告失败：未超过重试次数时放回队列，否则标记为失败"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, error = ?, updated = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                (self.max_attempts, error[:1000], time.time(), task_id, owner)
+            )
+        return cursor.rowcount == 1
+
+    def retry_failed(self) -> int:
+        """把失败的任务重新放回队列（重置重试次数）"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET state = 'pending', attempts = 0, owner = NULL, updated = ? WHERE state = 'failed'",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def unfinished(self) -> bool:
+        counts = self.counts()
+        return counts['pending'] + counts['leased'] > 0
+
+    def status(self) -> Dict:
+        now = time.time()
+        with self.lock:
+            leased = self.conn.execute(
+                "SELECT province, department, owner, attempts, lease_expires FROM tasks WHERE state = 'leased'"
+            ).fetchall()
+            failed = self.conn.execute(
+                "SELECT province, department, attempts, error FROM tasks WHERE state = 'failed'"
+            ).fetchall()
+            results = self.conn.execute("SELECT COALESCE(SUM(results), 0) FROM tasks WHERE state = 'done'").fetchone()
+        return {
+            'counts': self.counts(),
+            'leaders': results[0],
+            'leased': [{'task': f"{p}-{d}", 'owner': owner, 'attempts': attempts,
+                        'expires_in': round(expires - now, 1)} for p, d, owner, attempts, expires in leased],
+            'failed': [{'task': f"{p}-{d}", 'attempts': attempts, 'error': error}
+                       for p, d, attempts, error in failed],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def run_worker(queue: WorkQueue, process: Callable[[Dict], int], owner: Optional[str] = None,
+               poll_interval: float = 5.0, heartbeat_interval: Optional[float] = None) -> int:
+    """循环租用并处理任务，队列中没有待处理与处理中的任务时退出
+    Args:
+        process: 处理一个任务，返回找到的领导人数；抛出异常视为失败
+    Returns:
+        本进程完成的任务数
+    """
+    owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+    heartbeat_interval = heartbeat_interval or queue.visibility_timeout / 3
+    finished = 0
+    while True:
+        task = queue.lease(owner)
+        if task is None:
+            if not queue.unfinished():
+                break
+            # 其他进程的任务仍在处理中，其租约过期后可能需要接手
+            time.sleep(poll_interval)
+            continue
+
+        print(f"[{owner}] 处理 {task['province']} {task['department']}（第{task['attempt']}次）")
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(heartbeat_interval):
+                if not queue.heartbeat(task['id'], owner):
+                    print(f"[{owner}] 租约已失效: {task['department']}")
+                    return
+
+        beater = threading.Thread(target=beat, name='queue-heartbeat', daemon=True)
+        beater.start()
+        try:
+            results = process(task)
+        except Exception as e:
+            print(f"[{owner}] 处理 {task['department']} 出错: {str(e)}")
+            queue.fail(task['id'], owner, str(e))
+        else:
+            queue.complete(task['id'], owner, results)
+            finished += 1
+        finally:
+            stop.set()
+            beater.join()
+    print(f"[{owner}] 队列已处理完，本进程完成 {finished} 个任务")
+    return finished
+
+
+def department_processor(settings: Dict, folder: str):
+    """返回处理部门任务的函数；结果写入本工作进程自己的分片目录
+    部门首页请求失败时 process_department 抛出 DepartmentFetchError，run_worker 据此调用 fail，未超过重试次数时任务放回队列
+    """
+    crawler = new_crawler(settings, [], folder)
+
+    def process(task: Dict) -> int:
+        return len(crawler.process_department(task['url'], task['province'], task['department']))
+
+    return crawler, process
+
+
+def enqueue_departments(queue: WorkQueue, settings: Dict, target_provinces) -> int:
+    """协调者：获取各省的部门链接并加入队列"""
+    crawler = new_crawler(settings, target_provinces, settings['shard_root'])
+    added = 0
+    try:
+        for province, province_url in crawler.get_province_links(settings['initial_url']).items():
+            departments = crawler.get_department_links(province_url, province)
+            count = queue.enqueue({'province': province, 'department': name, 'url': url}
+                                  for name, url in departments.items())
+            print(f"{province}: {len(departments)} 个部门，新增 {count} 个任务")
+            added += count
+    finally:
+        crawler.close()
+    return added
+
+
+if __name__ == "__main__":
+    api_key = "your_deepseek_api_key" # 模型api
+    model = "deepseek-v3-241226" # 模型id
+    chunk_size = 50000 # process_large_content的分块大小
+    max_depth = 4 # 递归查找网页深度
+
+    initial_url = "https://www.gov.cn/home/2023-03/29/content_5748954.htm" # 地方政府网站
+    target_provinces = ["内蒙古"] # 目标省份
+    folder = './results' # 合并后的结果文件夹
+    shard_root = './results/shards' # 各工作进程的输出分片
+    store_format = 'csv' # 结果存储格式：csv / db（SQLite） / parquet
+    queue_file = './results/work_queue.db' # 任务队列（多台机器时放在共享目录）
+    visibility_timeout = 900 # 租约时长（秒），处理中每 1/3 时长续约一次
+    max_attempts = 3 # 单个任务的最多尝试次数
+
+    parser = argparse.ArgumentParser(description='分布式部门爬取任务队列')
+    parser.add_argument('command', choices=['coordinator', 'worker', 'status', 'retry-failed', 'merge'])
+    parser.add_argument('--queue', default=queue_file, help='任务队列文件')
+    parser.add_argument('--id', default=None, help='工作进程标识，默认 主机名-进程号')
+    args = parser.parse_args()
+
+    settings = {
+        'api_key': api_key, 'model': model, 'chunk_size': chunk_size, 'max_depth': max_depth,
+        'initial_url': initial_url, 'store_format': store_format, 'shard_root': shard_root,
+    }
+    queue = WorkQueue(args.queue, visibility_timeout, max_attempts)
+    if args.command == 'coordinator':
+        print(f"新增 {enqueue_departments(queue, settings, target_provinces)} 个任务")
+    elif args.command == 'worker':
+        owner = args.id or f"{socket.gethostname()}-{os.getpid()}"
+        crawler, process = department_processor(settings, os.path.join(shard_root, owner))
+        try:
+            run_worker(queue, process, owner)
+        finally:
+            crawler.close_stores()
+            crawler.write_metrics()
+            crawler.close()
+    elif args.command == 'status':
+        status = queue.status()
+        print(' '.join(f"{state}: {count}" for state, count in status['counts'].items()) + f"，领导 {status['leaders']} 人")
+        for item in status['leased']:
+            print(f"  处理中 {item['task']} [{item['owner']}] 第{item['attempts']}次，租约剩余 {item['expires_in']} 秒")
+        for item in status['failed']:
+            print(f"  失败 {item['task']}（{item['attempts']}次）: {item['error']}")
+    elif args.command == 'retry-failed':
+        print(f"已重新加入 {queue.retry_failed()} 个失败任务")
+    elif args.command == 'merge':
+        merge_shards(shard_root, folder, store_format)
+    queue.close()
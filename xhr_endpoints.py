@@ -0,0 +1,238 @@
+import html
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from discovery import LeadershipDiscovery
+
+
+# 请求中随时间变化的参数（防缓存时间戳、JSONP回调等），生成模板时去掉
+VOLATILE_PARAMS = {'_', 't', 'ts', 'timestamp', 'time', 'random', 'rnd', 'r', 'nocache', 'callback', 'jsoncallback'}
+# 路径模板中页面路径段的占位符
+SEGMENT_PLACEHOLDER = '{{path:%d}}'
+# 常见的英文/拼音字段名 -> 中文标签（清洗时只保留中文，转换后大模型仍能看出字段含义）
+FIELD_LABELS = [
+    (re.compile(r'^(name|xm|xingming|leadername|realname|username)$', re.I), '姓名'),
+    (re.compile(r'(title|zw|zhiwu|position|post|duty|job)', re.I), '职务'),
+    (re.compile(r'(resume|jl|jianli|intro|profile|experience|cv)', re.I), '简历'),
+    (re.compile(r'(fg|fengong|division|work)', re.I), '分工'),
+]
+
+
+def parse_json(text: str) -> Optional[Any]:
+    """解析 JSON 或 JSONP（callback(...)），失败返回 None"""
+    text = text.strip()
+    match = re.match(r'^[\w$.]+\s*\((.*)\)\s*;?$', text, re.S)
+    if match:
+        text = match.group(1)
+    if not text or text[0] not in '[{':
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _label(key: str) -> str:
+    return next((label for pattern, label in FIELD_LABELS if pattern.search(key)), key)
+
+
+def _records(data: Any) -> List[Dict]:
+    """JSON 中所有由字典组成的列表里的字典"""
+    records = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            records.extend(item for item in node if isinstance(item, dict))
+            stack.extend(node)
+    return records
+
+
+def json_to_html(data: Any) -> str:
+    """把接口返回的领导列表转为逐人一段的“字段：值”文本，值中的HTML标签去掉"""
+    paragraphs = []
+    for record in _records(data):
+        fields = []
+        for key, value in record.items():
+            if isinstance(value, (str, int, float)) and str(value).strip():
+                text = re.sub(r'<[^>]+>', ' ', html.unescape(str(value)))
+                fields.append(f"{_label(key)}：{text.strip()}")
+        if fields:
+            paragraphs.append(f"<p>{'；'.join(fields)}</p>")
+    return f"<html><body>{''.join(paragraphs)}</body></html>"
+
+
+def looks_like_leadership(data: Any) -> bool:
+    """接口数据是否像领导列表：至少两条记录同时有姓名与职务类字段，或文本中出现两种以上领导信息关键词"""
+    records = _records(data)
+    labelled = [{_label(key) for key in record} for record in records]
+    if sum(1 for labels in labelled if {'姓名', '职务'} <= labels) >= 2:
+        return True
+    text = re.sub(r'<[^>]+>', '', json_to_html(data))
+    return bool(records) and sum(keyword in text for keyword in LeadershipDiscovery.PAGE_KEYWORDS) >= 2
+
+
+def _strip_volatile(query: str) -> str:
+    return urlencode([(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k.lower() not in VOLATILE_PARAMS])
+
+
+def endpoint_template(request: Dict) -> Dict:
+    """由 CDP 记录的请求生成可重放的接口模板"""
+    parsed = urlparse(request['url'])
+    url = urlunparse(parsed._replace(query=_strip_volatile(parsed.query), fragment=''))
+    headers = {k.lower(): v for k, v in request.get('headers', {}).items()}
+    content_type = headers.get('content-type', '')
+    body = request.get('postData') or ''
+    if body and 'application/x-www-form-urlencoded' in content_type:
+        body = _strip_volatile(body)
+    return {'method': request.get('method', 'GET'), 'url': url, 'body': body, 'content_type': content_type}
+
+
+def parse_performance_log(entries: List[Dict]) -> List[Tuple[str, Dict]]:
+    """从 Chrome performance 日志中取出成功返回的 XHR/Fetch 请求：[(requestId, 请求)]
+    只保留第一个页面（展开前打开的页面）发出的请求；展开时点击链接跳转到的其他页面的请求不算
+    """
+    sent, received = {}, []
+    page_loader = None
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        params = message.get('params', {})
+        if message.get('method') == 'Network.requestWillBeSent':
+            if params.get('type') == 'Document' and page_loader is None:
+                page_loader = params.get('loaderId')
+            sent[params['requestId']] = params
+        elif message.get('method') == 'Network.responseReceived':
+            response = params.get('response', {})
+            if params.get('type') in ('XHR', 'Fetch') and response.get('status') == 200:
+                received.append(params['requestId'])
+    return [(request_id, sent[request_id]['request']) for request_id in received
+            if request_id in sent and (page_loader is None or sent[request_id].get('loaderId') == page_loader)]
+
+
+def _segment_regex(segment: str) -> re.Pattern:
+    """URL或请求体中作为完整参数值/路径段出现的页面路径段"""
+    return re.compile(r'(?<![\w.-])' + re.escape(segment) + r'(?![\w.-])')
+
+
+def path_template(page_url: str, template: Dict) -> Optional[Tuple[str, Dict]]:
+    """接口URL或请求体中出现页面路径段（部门标识等）时，把这些段换成占位符：
+    返回 (页面路径模式, 通用模板)，路径模式中对应的段为 *，同一站点模板下的其他部门页面可以套用；
+    没有出现页面路径段时返回 None（接口参数来自页面内容，不能用于其他页面）
+    """
+    page_path = urlparse(page_url).path
+    segments = page_path.split('/')
+    api = urlparse(template['url'])
+    # 接口位于页面目录下（页面自己的数据文件）时，接口路径与页面路径本来就相同，只看查询参数
+    api_text = api.query if api.path.startswith(page_path.rsplit('/', 1)[0] + '/') else api.path + '?' + api.query
+    generic = dict(template)
+    pattern = list(segments)
+    for i, segment in enumerate(segments):
+        if len(segment) < 2 or '.' in segment:
+            continue
+        regex = _segment_regex(segment)
+        if regex.search(api_text) or regex.search(template['body']):
+            pattern[i] = '*'
+            for field in ('url', 'body'):
+                generic[field] = regex.sub(SEGMENT_PLACEHOLDER % i, generic[field])
+    if '*' not in pattern:
+        return None
+    return '/'.join(pattern), generic
+
+
+def apply_path_template(pattern: str, template: Dict, page_url: str) -> Optional[Dict]:
+    """页面路径与模式一致时，用页面的路径段填充通用模板，否则返回 None"""
+    segments = urlparse(page_url).path.split('/')
+    fixed = pattern.split('/')
+    if len(segments) != len(fixed) or any(f != '*' and f != s for f, s in zip(fixed, segments)):
+        return None
+    filled = dict(template)
+    for i, segment in enumerate(segments):
+        if fixed[i] == '*':
+            for field in ('url', 'body'):
+                filled[field] = filled[field].replace(SEGMENT_PLACEHOLDER % i, segment)
+    return filled
+
+
+class XhrEndpointStore:
+    """按站点保存的领导信息数据接口：{域名: {页面URL或路径模式: [接口模板]}}，写入 JSON 文件
+    - 页面URL下保存抓取到的原始模板
+    - 接口中含有页面路径段时，另以路径模式（如 /zwgk/bmld/*/ldxx/）保存通用模板，同一站点其他部门的页面直接套用
+    直接请求连续失败 max_failures 次的模板会被删除，下次深度展开时重新抓取
+    """
+    def __init__(self, path: str, max_failures: int = 3):
+        self.path = path
+        self.max_failures = max_failures
+        self.lock = threading.Lock()
+        self.sites = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.sites = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"读取数据接口文件 {path} 失败，重新记录: {str(e)}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp = self.path + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(self.sites, f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.path)
+
+    @staticmethod
+    def _same(a: Dict, b: Dict) -> bool:
+        return (a['method'], a['url'], a['body']) == (b['method'], b['url'], b['body'])
+
+    def get(self, page_url: str) -> List[Tuple[str, Dict, Dict]]:
+        """页面可用的接口：[(保存的键, 保存的模板, 可直接请求的模板)]，先是该页面自己的，再是路径模式匹配的"""
+        with self.lock:
+            site = self.sites.get(urlparse(page_url).netloc, {})
+            found = [(page_url, item, item) for item in site.get(page_url, [])]
+            for key, templates in site.items():
+                if key.startswith('/'):
+                    for item in templates:
+                        filled = apply_path_template(key, item, page_url)
+                        if filled is not None and not any(self._same(filled, f) for _, _, f in found):
+                            found.append((key, item, filled))
+            return found
+
+    def _add(self, site: Dict, key: str, template: Dict) -> bool:
+        templates = site.setdefault(key, [])
+        if any(self._same(item, template) for item in templates):
+            return False
+        templates.append({**template, 'found': time.strftime('%Y-%m-%d %H:%M:%S'), 'failures': 0})
+        return True
+
+    def add(self, page_url: str, template: Dict) -> bool:
+        """保存接口模板（以及可套用到同一站点其他页面的通用模板），已存在时返回 False"""
+        with self.lock:
+            site = self.sites.setdefault(urlparse(page_url).netloc, {})
+            added = self._add(site, page_url, template)
+            generic = path_template(page_url, template)
+            if generic is not None:
+                added = self._add(site, *generic) or added
+            if added:
+                self._save()
+            return added
+
+    def mark(self, page_url: str, key: str, template: Dict, ok: bool):
+        """记录 get 返回的接口 (key, 保存的模板) 这次请求是否成功"""
+        with self.lock:
+            site = self.sites.get(urlparse(page_url).netloc, {})
+            templates = site.get(key, [])
+            for item in templates:
+                if self._same(item, template):
+                    item['failures'] = 0 if ok else item.get('failures', 0) + 1
+            site[key] = [item for item in templates if item['failures'] < self.max_failures]
+            if not site[key]:
+                site.pop(key, None)
+            self._save()